@@ -0,0 +1,98 @@
+"""
+Accuracy and throughput of src.filename_parser on the release-name corpus.
+
+Usage (from the repository root):
+    python benchmarks/filename_parser_bench.py [--rounds N] [--verbose]
+
+Accuracy is reported per field (title, year, season, episode, resolution)
+against benchmarks/filename_corpus.json; a case's optional "context" holds
+the parse_name() keyword arguments the scanner would pass for it. Throughput is measured over the
+whole corpus, next to the regex sequence the scanner used before (four
+episode patterns tried in turn plus five uncompiled title/year passes).
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.filename_parser import parse_name  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'filename_corpus.json')
+
+LEGACY_EPISODE_PATTERNS = [
+    re.compile(r"[sS](\d{1,2})[\W_]*[eE](\d{1,2})"),
+    re.compile(r"(\d{1,2})\s*[xX]\s*(\d{1,2})"),
+    re.compile(r"season\s*(\d{1,2})\D*episode\s*(\d{1,2})", re.IGNORECASE),
+    re.compile(r"\b(\d{1,2})\s*\.\s*(\d{1,2})\b"),
+]
+
+
+def legacy_parse(name, **_context):
+    """Previous scanner behaviour (episode info, title and year), for comparison."""
+    season = episode = None
+    for pattern in LEGACY_EPISODE_PATTERNS:
+        m = pattern.search(name)
+        if m:
+            season, episode = int(m.group(1)), int(m.group(2))
+            break
+    year_match = re.search(r'\((\d{4})\)|\s(\d{4})(?:\s|$)', name)
+    if year_match:
+        year = year_match.group(1) or year_match.group(2)
+        title = re.sub(r'\s*\(?\d{4}\)?', '', name).strip()
+    else:
+        title, year = name, None
+    title = re.sub(r'\[.*?\]', '', title)
+    title = re.sub(r'\(.*?\)', '', title)
+    title = re.sub(r'\s+', ' ', title).strip()
+    return {'title': title, 'year': year, 'season': season, 'episode': episode}
+
+
+def accuracy(parse, corpus, verbose=False):
+    hits, totals = {}, {}
+    for case in corpus:
+        result = parse(case['name'], **case.get('context', {}))
+        for field, expected in case['expected'].items():
+            if field not in result:
+                continue
+            totals[field] = totals.get(field, 0) + 1
+            if result.get(field) == expected:
+                hits[field] = hits.get(field, 0) + 1
+            elif verbose:
+                print(f"  {case['name']!r}: {field} = {result.get(field)!r}, expected {expected!r}")
+    return {field: hits.get(field, 0) / totals[field] for field in totals}
+
+
+def throughput(parse, corpus, rounds):
+    cases = [(case['name'], case.get('context', {})) for case in corpus]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name, context in cases:
+            parse(name, **context)
+    elapsed = time.perf_counter() - start
+    return len(cases) * rounds / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=200, help='passes over the corpus for throughput')
+    parser.add_argument('--verbose', action='store_true', help='list mismatches of the new parser')
+    args = parser.parse_args()
+
+    with open(CORPUS, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    print(f"Corpus: {len(corpus)} names")
+    for label, parse, verbose in (('filename_parser', parse_name, args.verbose), ('legacy', legacy_parse, False)):
+        scores = accuracy(parse, corpus, verbose)
+        rate = throughput(parse, corpus, args.rounds)
+        fields = ', '.join(f"{field} {score:.0%}" for field, score in scores.items())
+        print(f"{label:16} {rate:10.0f} names/s   {fields}")
+
+
+if __name__ == '__main__':
+    main()
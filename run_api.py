@@ -16,7 +16,6 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.api import CustomAPI
-from src.media_database import MediaDatabase
 
 def main():
     parser = argparse.ArgumentParser(description='Streamlet Connector API Server')
@@ -25,11 +24,9 @@ def main():
     
     args = parser.parse_args()
     
-    # Initialize database
-    database = MediaDatabase()
-    
-    # Create and run API
-    api = CustomAPI(host=args.host, port=args.port, database=database)
+    # Create API (initializes database with the configured storage backend)
+    api = CustomAPI(host=args.host, port=args.port)
+    database = api.database
     
     print(f"\n{'='*60}")
     print(f"Streamlet Connector API Server")
@@ -44,8 +41,14 @@ def main():
     try:
         api.run()
     except KeyboardInterrupt:
+        pass
+    finally:
+        # Werkzeug handles Ctrl+C itself and returns from run(), so shut down here
         print("\n\nShutting down API server...")
-        sys.exit(0)
+        if api.watcher:
+            api.watcher.stop()
+        api.scan_jobs.stop()
+        database.close()
 
 if __name__ == '__main__':
     main()
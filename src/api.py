@@ -1,13 +1,24 @@
-from flask import Flask, request, jsonify, send_file, render_template_string, send_from_directory, Response
+from flask import Flask, request, jsonify, send_file, render_template_string, send_from_directory, Response, make_response
+import base64
+import copy
 import json
 import os
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from src.image_resizer import ImageResizer
 from src.media_database import MediaDatabase
 from src.scanner import MediaScanner
 from src.tmdb_client import TMDBClient
+from src.tmdb_cache import TMDBCache
+from src.memory_cache import MemoryCache
 from src.progress_tracker import ProgressTracker
+from src.watcher import MediaWatcher
+from src.scan_jobs import ScanJobRunner
 import mimetypes
+import threading
+from collections import OrderedDict
+from werkzeug.security import safe_join
 
 # Ensure common video mime types are known (Windows mimetypes may miss some)
 mimetypes.add_type('video/mp4', '.mp4')
@@ -26,14 +37,59 @@ class CustomAPI:
         self.app = Flask(__name__)
         self.host = host
         self.port = port
-        self.database = database or MediaDatabase()
         self.config = self._load_config()
-        self.scanner = MediaScanner(self.config.get('folders_to_scan', []))
+        self.database = database or MediaDatabase(
+            backend=self.config.get('database_backend', 'json'),
+            save_interval=self.config.get('save_interval', 5),
+            save_batch_size=self.config.get('save_batch_size', 100),
+            compact_json=self.config.get('compact_json', False),
+            image_workers=self.config.get('image_workers', 8)
+        )
+        self.scanner = self._create_scanner()
+        self.tmdb_cache = None
+        if self.config.get('tmdb_cache_enabled', True):
+            self.tmdb_cache = TMDBCache(
+                self.database.db_path.parent / 'tmdb_cache.sqlite3',
+                max_bytes=int(self.config.get('tmdb_cache_max_mb', 256)) * 1024 * 1024
+            )
         self.tmdb_client = TMDBClient(
             self.config.get('tmdb_api_key', ''),
-            self.config.get('tmdb_language', 'cs-CZ')
+            self.config.get('tmdb_language', 'cs-CZ'),
+            cache=self.tmdb_cache,
+            pool_size=max(16, 2 * int(self.config.get('tmdb_workers', 4)), int(self.config.get('image_workers', 8))),
+            rate_limit=float(self.config.get('tmdb_rate_limit', 40))
+        )
+        self.database.set_http_session(self.tmdb_client.session)
+        # Summaries served by the list endpoints, maintained by the database on every change
+        self.database.register_projection('items', self._item_entry)
+        self.database.register_projection('movies', lambda item: self._summary_entry(item, 'movie', 'title'))
+        self.database.register_projection('tv_shows', lambda item: self._summary_entry(item, 'tv_show', 'name'))
+        # Serialized catalog responses of the current database generation (URL -> body, headers)
+        self._response_cache: 'OrderedDict[Tuple, Tuple[bytes, Dict]]' = OrderedDict()
+        self._response_cache_bytes = 0
+        self._response_cache_generation = None
+        self._response_cache_lock = threading.Lock()
+        # Resized / WebP variants of stored images for /api/images?w=&fmt=
+        self.image_resizer = ImageResizer(
+            self.database.db_path.parent / 'image_cache',
+            max_bytes=int(self.config.get('image_cache_max_mb', 512)) * 1024 * 1024,
+            workers=self.config.get('image_resize_workers', 2)
+        )
+        # Hot cache for live season/episode lookups made by API clients
+        self.tmdb_memory_cache = MemoryCache(
+            max_entries=self.config.get('tmdb_memory_cache_size', 1000),
+            ttl=self.config.get('tmdb_memory_cache_ttl', 600)
         )
         self.progress = ProgressTracker()
+        self.watcher = None
+        self._start_watcher()
+        # Scans run in a background worker; periodic scans every scan_interval seconds
+        self.scan_jobs = ScanJobRunner(
+            self._run_scan_job,
+            interval=float(self.config.get('scan_interval', 0) or 0),
+            scheduled_policy=lambda: self.config.get('scan_policy', MediaScanner.DEFAULT_SCAN_POLICY)
+        )
+        self.scan_jobs.start()
         self._setup_routes()
     
     def _load_config(self) -> Dict:
@@ -48,9 +104,81 @@ class CustomAPI:
                 'tmdb_api_key': '',
                 'tmdb_language': 'cs-CZ',
                 'custom_api_url': '',
-                'scan_interval': 3600
+                'scan_interval': 3600,
+                'database_backend': 'json',
+                'save_interval': 5,
+                'save_batch_size': 100,
+                'compact_json': False,
+                'tmdb_workers': 4,
+                'tmdb_cache_enabled': True,
+                'tmdb_cache_max_mb': 256,
+                'tmdb_memory_cache_size': 1000,
+                'tmdb_memory_cache_ttl': 600,
+                'tmdb_rate_limit': 40,
+                'image_workers': 8,
+                'image_gc_after_scan': True,
+                'image_resize_workers': 2,
+                'image_cache_max_mb': 512,
+                'search_limit': 10,
+                'incremental_scan': True,
+                'scan_workers': 4,
+                'scan_max_depth': 0,
+                'scan_policy': 'missing_metadata',
+                'watch_folders': False,
+                'watch_polling': False,
+                'watch_debounce': 5,
+                'watch_poll_interval': 30
             }
     
+    def _create_scanner(self) -> MediaScanner:
+        """Create media scanner from current configuration."""
+        return MediaScanner(
+            manifest_path=self.database.db_path.parent / 'scan_manifest.json',
+            **self._scanner_settings()
+        )
+
+    def _scanner_settings(self) -> Dict:
+        """MediaScanner settings from the current configuration (see MediaScanner.configure)."""
+        return {
+            'folders': self.config.get('folders_to_scan', []),
+            'enrich_workers': self.config.get('tmdb_workers', 4),
+            'scan_workers': self.config.get('scan_workers', 4),
+            'max_depth': self.config.get('scan_max_depth', 0),
+        }
+
+    def _run_scan_job(self, job) -> Dict:
+        """Execute a scan job on the scan worker thread."""
+        summary = self.scanner.update_library(
+            self.database, self.tmdb_client, job.policy,
+            relist=job.relist or not self.config.get('incremental_scan', True),
+            cancel=job.cancel_event
+        )
+        summary['message'] = (f"Found {summary['total_found']} items, added {summary['new_items']} new, "
+                              f"{summary['changed_items']} changed, removed {summary['removed_items']} missing")
+        if self.config.get('image_gc_after_scan', True) and not job.cancel_event.is_set():
+            # Images of removed or re-matched items are no longer referenced
+            summary['images_removed'] = self.database.collect_images()['removed']
+        return summary
+
+    def _start_watcher(self):
+        """(Re)start the filesystem watcher for the current scanner if enabled in config."""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if not self.config.get('watch_folders', False) or not self.scanner.folders:
+            return
+        self.watcher = MediaWatcher(
+            self.scanner,
+            self.database,
+            self.tmdb_client,
+            policy=lambda: self.config.get('scan_policy', MediaScanner.DEFAULT_SCAN_POLICY),
+            debounce=float(self.config.get('watch_debounce', 5)),
+            polling=bool(self.config.get('watch_polling', False)),
+            poll_interval=float(self.config.get('watch_poll_interval', 30))
+        )
+        if not self.watcher.start():
+            self.watcher = None
+
     def _save_config(self, config: Dict) -> bool:
         """Save configuration to file."""
         config_path = Path(__file__).parent.parent / 'config' / 'config.json'
@@ -63,6 +191,20 @@ class CustomAPI:
             print(f"[API] Error saving config: {e}")
             return False
 
+    def _cached_season_episodes(self, tmdb_id: int, season_number: int) -> List[Dict]:
+        """TMDB season episodes via the in-memory cache (returns a private copy)."""
+        key = ('season', tmdb_id, season_number, self.tmdb_client.language)
+        episodes = self.tmdb_memory_cache.get_or_load(
+            key, lambda: self.tmdb_client.get_tv_season_episodes(tmdb_id, season_number))
+        return copy.deepcopy(episodes) if episodes else []
+
+    def _cached_episode_details(self, tmdb_id: int, season_number: int, episode_number: int) -> Optional[Dict]:
+        """TMDB episode details via the in-memory cache (returns a private copy)."""
+        key = ('episode', tmdb_id, season_number, episode_number, self.tmdb_client.language)
+        episode = self.tmdb_memory_cache.get_or_load(
+            key, lambda: self.tmdb_client.get_tv_episode_details(tmdb_id, season_number, episode_number))
+        return copy.deepcopy(episode) if episode else None
+
     def _get_image_url(self, local_path: str) -> Optional[str]:
         """Convert local image filename to URL path."""
         if not local_path:
@@ -73,8 +215,264 @@ class CustomAPI:
             return None
         
         # Extract just the filename from absolute path (legacy compatibility)
-        filename = os.path.basename(local_path)
-        return filename
+        if os.path.isabs(local_path):
+            return os.path.basename(local_path)
+        # Image store path ("ab/abcd....jpg") or legacy flat filename
+        return local_path
+
+    # Images are addressed by their TMDB source (and variant), so a URL never changes content
+    IMAGE_MAX_AGE = 365 * 24 * 3600
+
+    # Upper bound of the serialized catalog responses kept for the current generation
+    RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    CACHED_HEADERS = ('X-Total-Count', 'X-Next-Cursor')
+
+    def _catalog_response(self, build: Callable):
+        """
+        Serve a response built from the database with a strong ETag.
+
+        The ETag is the database generation, read once before building so
+        a change during the build can only cause an extra download later.
+        A matching If-None-Match returns 304 without building the body.
+        Clients must revalidate (no-cache) since the catalog changes.
+
+        Successful bodies are cached per URL until the generation changes,
+        so repeated requests only copy bytes.
+        """
+        with self.database.lock:
+            generation = self.database.generation
+            etag = self.database.etag
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            cached = self._cached_body(key, generation)
+            if cached is not None:
+                body, headers = cached
+                response = Response(body, mimetype='application/json', headers=headers)
+            else:
+                response = make_response(build())
+                if response.status_code != 200:
+                    return response
+                self._store_body(key, generation, response)
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
+
+    def _cached_body(self, key: Tuple, generation: int) -> Optional[Tuple[bytes, Dict]]:
+        with self._response_cache_lock:
+            current = self._response_cache_generation
+            if current is not None and current > generation:
+                # A newer request already moved the cache on; never move it back
+                return None
+            if current != generation:
+                self._response_cache.clear()
+                self._response_cache_bytes = 0
+                self._response_cache_generation = generation
+                return None
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                self._response_cache.move_to_end(key)
+            return cached
+
+    def _store_body(self, key: Tuple, generation: int, response: Response):
+        body = response.get_data()
+        if len(body) > self.RESPONSE_CACHE_MAX_BYTES // 2:
+            return
+        headers = {name: response.headers[name] for name in self.CACHED_HEADERS if name in response.headers}
+        # The database lock makes sure no change is half applied while the
+        # generation is compared; if a writer holds it, just skip caching
+        if not self.database.lock.acquire(blocking=False):
+            return
+        try:
+            with self._response_cache_lock:
+                # The items changed while the body was built, or the cache moved on: don't keep it
+                if (self.database.generation != generation or self._response_cache_generation != generation
+                        or key in self._response_cache):
+                    return
+                self._response_cache[key] = (body, headers)
+                self._response_cache_bytes += len(body)
+                while self._response_cache_bytes > self.RESPONSE_CACHE_MAX_BYTES:
+                    _key, (old_body, _headers) = self._response_cache.popitem(last=False)
+                    self._response_cache_bytes -= len(old_body)
+        finally:
+            self.database.lock.release()
+
+    # Largest page a listing endpoint returns for ?limit=
+    MAX_PAGE_SIZE = 1000
+    # Most results /api/search returns for ?limit=
+    MAX_SEARCH_LIMIT = 100
+
+    def _list_response(self, entry: Callable, base_filters: Dict = None):
+        """
+        Serve one page of a listing endpoint as a JSON array.
+
+        Query parameters:
+            limit, offset   page size (max MAX_PAGE_SIZE) and items to skip; no limit = everything
+            cursor          X-Next-Cursor of the previous page
+            sort, order     title | year | rating | added, asc | desc (default: internal_id order)
+            type, genre     filter values (comma separated = any of them)
+            has_metadata, missing   true | false
+            q               substring of the title or path
+            fields          comma separated fields of each entry to return
+
+        X-Total-Count carries the number of matching items and
+        X-Next-Cursor (if more follow) the cursor of the next page.
+        """
+        args = request.args
+        try:
+            filters = {}
+            for name in ('type', 'genre'):
+                if args.get(name):
+                    filters[name] = [v.strip().casefold() if name == 'genre' else v.strip()
+                                     for v in args[name].split(',') if v.strip()]
+            for name in ('has_metadata', 'missing'):
+                if args.get(name):
+                    filters[name] = [self._parse_bool(args[name], name)]
+            filters.update(base_filters or {})
+
+            sort = args.get('sort') or None
+            if sort is not None and sort not in MediaDatabase.SORT_KEYS:
+                raise ValueError(f"sort must be one of {', '.join(MediaDatabase.SORT_KEYS)}")
+            order = args.get('order', 'asc').lower()
+            if order not in ('asc', 'desc'):
+                raise ValueError('order must be asc or desc')
+            limit = self._parse_int(args.get('limit'), 'limit', 1)
+            if limit is not None:
+                limit = min(limit, self.MAX_PAGE_SIZE)
+            offset = self._parse_int(args.get('offset'), 'offset', 0) or 0
+            after = self._decode_cursor(args['cursor'], sort, order) if args.get('cursor') else None
+
+            match = None
+            needle = args.get('q', '').strip().casefold()
+            if needle:
+                match = lambda item: (needle in self._display_title(item).casefold()
+                                      or needle in (item.get('path') or '').casefold())
+
+            items, total, last = self.database.query(filters, sort, order == 'desc', offset, limit, after, match)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()]
+        page = []
+        for item in items:
+            data = entry(item)
+            if data is None:
+                continue
+            page.append({f: data[f] for f in fields if f in data} if fields else data)
+
+        response = jsonify(page)
+        response.headers['X-Total-Count'] = str(total)
+        if last is not None:
+            response.headers['X-Next-Cursor'] = self._encode_cursor(last, sort, order)
+        return response
+
+    @staticmethod
+    def _parse_bool(value: str, name: str) -> bool:
+        value = value.lower()
+        if value in ('1', 'true', 'yes'):
+            return True
+        if value in ('0', 'false', 'no'):
+            return False
+        raise ValueError(f"{name} must be true or false")
+
+    @staticmethod
+    def _parse_int(value: Optional[str], name: str, minimum: int) -> Optional[int]:
+        if value is None or value == '':
+            return None
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer")
+        if number < minimum:
+            raise ValueError(f"{name} must be at least {minimum}")
+        return number
+
+    @staticmethod
+    def _encode_cursor(last, sort: Optional[str], order: str) -> str:
+        """Opaque cursor: the sort value and path of the last item, tied to the sort order."""
+        raw = json.dumps({'s': sort, 'o': order, 'k': list(last)}, ensure_ascii=False, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort: Optional[str], order: str):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            data = json.loads(raw.decode('utf-8'))
+            value, key = data['k']
+        except (ValueError, KeyError, TypeError):
+            raise ValueError('Invalid cursor')
+        if data.get('s') != sort or data.get('o') != order:
+            raise ValueError('Cursor does not match the sort order')
+        return value, key
+
+    @staticmethod
+    def _display_title(item: Dict) -> str:
+        metadata = item.get('metadata') or {}
+        return metadata.get('title') or metadata.get('name') or item.get('title', 'Unknown')
+
+    def _item_entry(self, item: Dict) -> Dict:
+        """Entry of /api/items (materialized as the 'items' projection, without internal_id)."""
+        item_data = {
+            'path': item.get('path'),
+            'title': item.get('title', 'Unknown'),
+            'type': item.get('type'),
+            'has_metadata': 'metadata' in item and item['metadata'] is not None,
+            'added_at': item.get('added_at')
+        }
+
+        if item_data['has_metadata']:
+            metadata = item['metadata']
+            item_data.update({
+                'tmdb_id': metadata.get('id'),
+                'display_title': metadata.get('title') or metadata.get('name', item_data['title']),
+                'poster_path': self._get_image_url(metadata.get('poster_path')),
+                'backdrop_path': self._get_image_url(metadata.get('backdrop_path')),
+                'rating': metadata.get('vote_average', 0),
+                'year': (metadata.get('release_date') or metadata.get('first_air_date', ''))[:4],
+                'overview': metadata.get('overview', '')
+            })
+        else:
+            item_data['display_title'] = item_data['title']
+        return item_data
+
+    def _listed_item(self, item: Dict) -> Optional[Dict]:
+        """Materialized /api/items entry with the item's current internal_id."""
+        summary = self.database.projection('items', item)
+        if summary is None:
+            return None
+        return dict(summary, internal_id=self.database.get_internal_id(item))
+
+    def _summary_entry(self, item: Dict, media_type: str, title_field: str) -> Optional[Dict]:
+        """Entry of /api/movies and /api/tv-shows (materialized as the 'movies'/'tv_shows' projections)."""
+        if item.get('type') != media_type or 'metadata' not in item:
+            return None
+        metadata = item['metadata']
+        return {
+            'id': metadata.get('id'),
+            'title': metadata.get(title_field, item.get('title', 'Unknown')),
+            'poster_path': self._get_image_url(metadata.get('poster_path')),
+            'rating': metadata.get('vote_average', 0)
+        }
+
+    @staticmethod
+    def _stream_entry(item: Dict) -> Optional[Dict]:
+        """Entry of /api/streams (None if the file is gone or has no TMDB id)."""
+        file_path = item.get('path')
+        metadata = item['metadata']
+        tmdb_id = metadata.get('id')
+        if not file_path or not tmdb_id or not os.path.exists(file_path):
+            return None
+        file_stat = os.stat(file_path)
+        file_ext = os.path.splitext(file_path)[1].lower()
+        return {
+            'id': tmdb_id,  # TMDB ID
+            'name': os.path.basename(file_path),
+            'type': file_ext.replace('.', ''),
+            'size': file_stat.st_size,
+            'title': metadata.get('title') or metadata.get('name', 'Unknown'),
+            'media_type': item.get('type')
+        }
 
     def _setup_routes(self):
         """Setup all API routes."""
@@ -89,76 +487,90 @@ class CustomAPI:
         # ========== API: DATABASE ==========
         @self.app.route('/api/items', methods=['GET'])
         def get_all_items():
-            """Get all items including those without metadata."""
-            items = []
-            for idx, item in enumerate(self.database.get_all_items()):
-                item_data = {
-                    'internal_id': idx,
-                    'path': item.get('path'),
-                    'title': item.get('title', 'Unknown'),
-                    'type': item.get('type'),
-                    'has_metadata': 'metadata' in item and item['metadata'] is not None
-                }
-                
-                if item_data['has_metadata']:
+            """Get all items including those without metadata (paginated, see _list_response)."""
+            return self._catalog_response(lambda: self._list_response(self._listed_item))
+        
+        # ========== API: LOCAL SEARCH ==========
+        @self.app.route('/api/search', methods=['GET'])
+        def search_local():
+            """Full-text search of the local database, best matches first."""
+            query = request.args.get('query', '').strip()
+            media_type = request.args.get('type', 'movie')  # 'movie', 'tv' or 'all'
+
+            if not query:
+                return jsonify({'error': 'Query parameter required'}), 400
+
+            if media_type not in ['movie', 'tv', 'all']:
+                return jsonify({'error': 'Type must be movie, tv or all'}), 400
+
+            try:
+                limit = self._parse_int(request.args.get('limit'), 'limit', 1)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if limit is None:
+                limit = int(self.config.get('search_limit', 10))
+            limit = min(limit, self.MAX_SEARCH_LIMIT)
+
+            try:
+                target_type = {'movie': 'movie', 'tv': 'tv_show'}.get(media_type)
+                results = []
+                for item, score in self.database.search(query, limit, target_type, require_metadata=True):
                     metadata = item['metadata']
-                    item_data.update({
-                        'tmdb_id': metadata.get('id'),
-                        'display_title': metadata.get('title') or metadata.get('name', item_data['title']),
+                    results.append({
+                        'id': metadata.get('id'),
+                        'type': 'movie' if item.get('type') == 'movie' else 'tv',
+                        'title': metadata.get('title') or metadata.get('name'),
+                        'year': (metadata.get('release_date') or metadata.get('first_air_date') or '')[:4],
+                        'overview': metadata.get('overview', ''),
                         'poster_path': self._get_image_url(metadata.get('poster_path')),
-                        'backdrop_path': self._get_image_url(metadata.get('backdrop_path')),
                         'rating': metadata.get('vote_average', 0),
-                        'year': (metadata.get('release_date') or metadata.get('first_air_date', ''))[:4],
-                        'overview': metadata.get('overview', '')
+                        'score': round(score, 3)
                     })
-                else:
-                    item_data['display_title'] = item_data['title']
-                
-                items.append(item_data)
-            
-            return jsonify(items), 200
+                return jsonify(results), 200
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
         
-        # ========== API: LOCAL SEARCH ==========
-        @self.app.route('/api/search', methods=['GET'])
-        def search_local():
-            """Search local database for movies or TV shows."""
-            query = request.args.get('query', '').strip().lower()
+        # ========== API: TMDB SEARCH ==========
+        @self.app.route('/api/tmdb/search', methods=['GET'])
+        def search_tmdb():
+            """Search TMDB for movies or TV shows (used by the metadata assignment dialog)."""
+            query = request.args.get('query', '').strip()
             media_type = request.args.get('type', 'movie')  # 'movie' or 'tv'
-            
+            limit = min(max(request.args.get('limit', 10, type=int), 1), 20)
+            details = request.args.get('details', '').lower() in ('1', 'true', 'yes')
+
             if not query:
                 return jsonify({'error': 'Query parameter required'}), 400
-            
+
             if media_type not in ['movie', 'tv']:
                 return jsonify({'error': 'Type must be movie or tv'}), 400
-            
+
+            if not self.tmdb_client.api_key:
+                return jsonify({'error': 'TMDB API key not configured'}), 400
+
             try:
+                if media_type == 'movie':
+                    found = self.tmdb_client.search_movies(query, limit=limit, details=details)
+                else:
+                    found = self.tmdb_client.search_tv_shows(query, limit=limit, details=details)
+
                 results = []
-                target_type = 'movie' if media_type == 'movie' else 'tv_show'
-                
-                for item in self.database.get_all_items():
-                    if item.get('type') != target_type or 'metadata' not in item:
-                        continue
-                    
-                    metadata = item['metadata']
-                    title = (metadata.get('title') or metadata.get('name', '')).lower()
-                    overview = (metadata.get('overview', '')).lower()
-                    
-                    # Search in title and overview
-                    if query in title or query in overview:
-                        results.append({
-                            'id': metadata.get('id'),
-                            'title': metadata.get('title') or metadata.get('name'),
-                            'year': (metadata.get('release_date') or metadata.get('first_air_date', ''))[:4],
-                            'overview': metadata.get('overview', ''),
-                            'poster_path': self._get_image_url(metadata.get('poster_path')),
-                            'rating': metadata.get('vote_average', 0)
-                        })
-                
-                # Limit to 10 results
-                return jsonify(results[:10]), 200
+                for entry in found:
+                    results.append({
+                        'tmdb_id': entry.get('id'),
+                        'title': entry.get('title') or entry.get('name'),
+                        'year': (entry.get('release_date') or entry.get('first_air_date') or '')[:4],
+                        'overview': entry.get('overview', ''),
+                        'poster_path': entry.get('poster_path'),
+                        'rating': entry.get('vote_average', 0),
+                        'genres': entry.get('genres', []),
+                        'runtime': entry.get('runtime'),
+                        'number_of_seasons': entry.get('number_of_seasons')
+                    })
+                return jsonify(results), 200
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
-        
+
         # ========== API: ASSIGN METADATA ==========
         @self.app.route('/api/assign-metadata', methods=['POST'])
         def assign_metadata():
@@ -178,10 +590,11 @@ class CustomAPI:
                 # Get item reference
                 item = self.database.media_items[internal_id]
                 
-                # Remove old images if replacing metadata
+                # Forget old images if replacing metadata (deleted below unless shared)
+                old_images = []
                 if item.get('metadata'):
                     print(f"[API] Replacing metadata for: {item.get('title', 'Unknown')}")
-                    self.database.remove_old_images(item)
+                    old_images = self.database.remove_old_images(item)
                 
                 # Fetch metadata from TMDB
                 if media_type == 'movie':
@@ -191,15 +604,19 @@ class CustomAPI:
                 else:
                     return jsonify({'error': 'Invalid type'}), 400
                 
-                # Update item with new metadata
+                # Update item with new metadata (marked manual so scans never re-search it)
                 item['metadata'] = metadata
                 item['type'] = 'movie' if media_type == 'movie' else 'tv_show'
+                item['metadata_source'] = 'manual'
+                item['metadata_updated'] = int(time.time())
                 
                 # Download new images
                 self.database.enrich_with_images(item)
                 
-                # Save to database
+                # Re-index under the new TMDB id and save to database
+                self.database.add_or_update(item)
                 self.database.save()
+                self.database.release_images(old_images)
                 
                 return jsonify({'success': True, 'message': 'Metadata assigned successfully'}), 200
             except Exception as e:
@@ -217,6 +634,10 @@ class CustomAPI:
         def save_settings():
             """Save settings."""
             data = request.get_json()
+
+            scanner_keys = ('folders_to_scan', 'tmdb_workers', 'scan_workers', 'scan_max_depth')
+            if any(key in data for key in scanner_keys) and self.scanner.scan_lock.locked():
+                return jsonify({'error': 'A scan is running, try again after it finishes'}), 409
             
             # Update config
             if 'folders_to_scan' in data:
@@ -224,6 +645,7 @@ class CustomAPI:
             if 'tmdb_api_key' in data:
                 self.config['tmdb_api_key'] = data['tmdb_api_key']
                 self.tmdb_client.api_key = data['tmdb_api_key']
+                self.tmdb_memory_cache.invalidate()
             if 'tmdb_language' in data:
                 self.config['tmdb_language'] = data['tmdb_language']
                 self.tmdb_client.language = data['tmdb_language']
@@ -231,11 +653,35 @@ class CustomAPI:
                 self.config['custom_api_url'] = data['custom_api_url']
             if 'scan_interval' in data:
                 self.config['scan_interval'] = data['scan_interval']
+                self.scan_jobs.set_interval(float(data['scan_interval'] or 0))
+            if 'tmdb_workers' in data:
+                self.config['tmdb_workers'] = data['tmdb_workers']
+            if 'incremental_scan' in data:
+                self.config['incremental_scan'] = bool(data['incremental_scan'])
+            if 'scan_workers' in data:
+                self.config['scan_workers'] = data['scan_workers']
+            if 'scan_max_depth' in data:
+                self.config['scan_max_depth'] = data['scan_max_depth']
+            if 'scan_policy' in data:
+                try:
+                    MediaScanner.parse_policy(data['scan_policy'])
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+                self.config['scan_policy'] = data['scan_policy']
+            if 'watch_folders' in data:
+                self.config['watch_folders'] = bool(data['watch_folders'])
+            if 'watch_polling' in data:
+                self.config['watch_polling'] = bool(data['watch_polling'])
+            if 'database_backend' in data:
+                # Takes effect after restart (existing JSON data is migrated on first SQLite start)
+                self.config['database_backend'] = data['database_backend']
             
             # Save to file
             if self._save_config(self.config):
-                # Update scanner with new folders
-                self.scanner = MediaScanner(self.config.get('folders_to_scan', []))
+                # Reconfigure the scanner in place: it keeps its scan lock and manifest,
+                # so scans started before and after the change stay serialized
+                self.scanner.configure(**self._scanner_settings())
+                self._start_watcher()
                 return jsonify({'success': True, 'message': 'Settings saved'}), 200
             else:
                 return jsonify({'error': 'Failed to save settings'}), 500
@@ -243,44 +689,89 @@ class CustomAPI:
         # ========== API: SCAN ==========
         @self.app.route('/api/scan', methods=['POST'])
         def start_scan():
-            """Start media scan, enrich with TMDB, and remove missing files."""
+            """Queue a media scan (enrich with TMDB, remove missing files) on the scan worker.
+
+            Which items get TMDB requests is decided by the scan policy
+            (?policy=..., default from scan_policy config); ?full=1 is
+            shorthand for policy=full. Returns 202 with the job id; a request
+            while a scan with the same policy is active returns that job,
+            a different policy is rejected with 409.
+            """
+            policy = request.args.get('policy') or self.config.get('scan_policy', MediaScanner.DEFAULT_SCAN_POLICY)
+            if request.args.get('full', '').lower() in ('1', 'true', 'yes'):
+                policy = 'full'
             try:
-                # Scan folders with metadata enrichment and immediate save
-                if self.tmdb_client and self.tmdb_client.movie_api and self.tmdb_client.tv_api:
-                    # Pass database to scanner for immediate saves
-                    items = self.scanner.scan_with_metadata(self.tmdb_client, self.database)
-                else:
-                    items = self.scanner.scan()
-                
-                # Remove files that no longer exist
-                removed_count = self.database.remove_missing_files()
-                
-                # Count new vs updated items
-                existing_paths = {item['path'] for item in self.database.get_all_items()}
-                new_count = sum(1 for item in items if item['path'] not in existing_paths)
-                enriched_count = sum(1 for item in items if item.get('metadata'))
-                
-                # Items without metadata still need to be added
-                for item in items:
-                    if item['path'] not in existing_paths and not item.get('metadata'):
-                        self.database.add_or_update(item)
-                
-                # Final save
-                self.database.save()
-                
-                return jsonify({
-                    'success': True,
-                    'total_found': len(items),
-                    'new_items': new_count,
-                    'removed_items': removed_count,
-                    'enriched_with_metadata': enriched_count,
-                    'message': f'Found {len(items)} items, added {new_count} new, removed {removed_count} missing'
-                }), 200
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-                return jsonify({'error': str(e)}), 500
-        
+                MediaScanner.parse_policy(policy)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            job, created = self.scan_jobs.submit(policy)
+            if not created and job.policy != policy:
+                return jsonify({'error': 'Another scan is already running', 'job': job.to_dict()}), 409
+            response = jsonify(dict(job.to_dict(), success=True, job_id=job.id, coalesced=not created))
+            response.headers['Location'] = f'/api/scan/jobs/{job.id}'
+            return response, 202
+
+        @self.app.route('/api/scan/jobs', methods=['GET'])
+        def list_scan_jobs():
+            """List recent scan jobs and the periodic scan schedule."""
+            active = self.scan_jobs.active_job
+            return jsonify({
+                'jobs': self.scan_jobs.list_jobs(),
+                'active_job': active.id if active else None,
+                'scan_interval': self.scan_jobs.interval,
+                'next_scheduled_in': self.scan_jobs.next_scheduled_in()
+            }), 200
+
+        @self.app.route('/api/scan/jobs/<job_id>', methods=['GET'])
+        def get_scan_job(job_id):
+            """Get status of one scan job (with live progress while it runs)."""
+            job = self.scan_jobs.get(job_id)
+            if job is None:
+                return jsonify({'error': 'Job not found'}), 404
+            data = job.to_dict()
+            if job.status == 'running':
+                data['progress'] = self.progress.get_progress()
+            return jsonify(data), 200
+
+        @self.app.route('/api/scan/jobs/<job_id>/cancel', methods=['POST'])
+        def cancel_scan_job(job_id):
+            """Cancel a queued or running scan job."""
+            job = self.scan_jobs.cancel(job_id)
+            if job is None:
+                return jsonify({'error': 'Job not found'}), 404
+            if not job.active and job.status != 'cancelled':
+                return jsonify({'error': f'Job already {job.status}', 'job': job.to_dict()}), 409
+            return jsonify(dict(job.to_dict(), success=True)), 202
+
+        # ========== API: WATCHER ==========
+        @self.app.route('/api/watcher', methods=['GET'])
+        def get_watcher_status():
+            """Get filesystem watcher state."""
+            if self.watcher is None:
+                return jsonify({'running': False, 'enabled': bool(self.config.get('watch_folders', False))}), 200
+            return jsonify(dict(self.watcher.status(), enabled=True)), 200
+
+        # ========== API: TMDB CACHE ==========
+        @self.app.route('/api/tmdb/cache', methods=['GET'])
+        def get_tmdb_cache_stats():
+            """Get TMDB response cache statistics."""
+            memory = self.tmdb_memory_cache.stats()
+            if not self.tmdb_cache:
+                return jsonify({'enabled': False, 'memory': memory}), 200
+            return jsonify(dict(self.tmdb_cache.stats(), enabled=True, memory=memory)), 200
+
+        @self.app.route('/api/tmdb/cache/invalidate/<int:tmdb_id>', methods=['POST'])
+        def invalidate_tmdb_cache(tmdb_id):
+            """Drop cached TMDB responses for one id (optional ?type=movie|tv)."""
+            media_type = request.args.get('type')
+            if media_type not in (None, 'movie', 'tv'):
+                return jsonify({'error': 'Type must be movie or tv'}), 400
+            removed = self.tmdb_client.invalidate(tmdb_id, media_type)
+            if media_type != 'movie':
+                self.tmdb_memory_cache.invalidate(lambda key: key[1] == tmdb_id)
+            return jsonify({'success': True, 'removed': removed}), 200
+
         # ========== API: PROGRESS ==========
         @self.app.route('/api/progress', methods=['GET'])
         def get_progress():
@@ -293,6 +784,7 @@ class CustomAPI:
             """Clear entire database and all images."""
             try:
                 if self.database.clear_all():
+                    self.image_resizer.clear()
                     return jsonify({'success': True, 'message': 'Database and images cleared'}), 200
                 else:
                     return jsonify({'error': 'Failed to clear database'}), 500
@@ -315,93 +807,133 @@ class CustomAPI:
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         
+        @self.app.route('/api/database/images', methods=['GET'])
+        def get_image_store_report():
+            """Disk use of the image store per image type."""
+            return jsonify(self.database.image_report()), 200
+
+        @self.app.route('/api/database/images/cache', methods=['GET'])
+        def get_image_cache_stats():
+            """Get statistics of the resized image cache."""
+            return jsonify(self.image_resizer.stats()), 200
+
+        @self.app.route('/api/database/images/gc', methods=['POST'])
+        def collect_images():
+            """Delete images no item refers to (?dry_run=1 only counts them)."""
+            dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+            try:
+                return jsonify(dict(self.database.collect_images(dry_run=dry_run), success=True)), 200
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+
         # ========== API: IMAGES ==========
         @self.app.route('/api/images/<path:filename>', methods=['GET'])
         def get_image(filename):
-            """Serve local images."""
-            images_dir = Path(__file__).parent.parent / 'data' / 'images'
-            try:
-                return send_from_directory(images_dir, filename)
-            except Exception as e:
-                return jsonify({'error': 'Image not found'}), 404
+            """Serve local images.
+
+            ?w=<px> returns a variant scaled down to the next standard width
+            and ?fmt=webp|avif|jpeg|png re-encodes it. Without fmt, a resized
+            image is sent as AVIF/WebP when the Accept header allows it.
+            """
+            images_dir = self.database.images_dir
+            if not (images_dir / filename).exists():
+                # Recorded during a scan but still downloading: wait for it briefly
+                self.database.images.wait_for(filename, timeout=10)
+
+            width = request.args.get('w', type=int)
+            fmt = request.args.get('fmt')
+            negotiated = resize = False
+            if (width is not None or fmt) and self.image_resizer.available:
+                try:
+                    width = ImageResizer.snap_width(width)
+                    fmt, negotiated = self.image_resizer.negotiate(fmt, request.headers.get('Accept', ''))
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+                source = safe_join(str(images_dir), filename)
+                if source is None:
+                    return jsonify({'error': 'Image not found'}), 404
+                # fmt=auto without a usable Accept at full width is just the stored file
+                resize = width is not None or fmt is not None
+
+            if resize:
+                try:
+                    path, mimetype = self.image_resizer.get(Path(source), filename, width, fmt)
+                except FileNotFoundError:
+                    return jsonify({'error': 'Image not found'}), 404
+                except Exception as e:
+                    print(f"[API] Error resizing image {filename}: {e}")
+                    return jsonify({'error': 'Image could not be processed'}), 500
+                response = send_file(path, mimetype=mimetype)
+            else:
+                try:
+                    response = send_from_directory(images_dir, filename)
+                except Exception as e:
+                    return jsonify({'error': 'Image not found'}), 404
+            if negotiated:
+                response.vary.add('Accept')
+            # send_file defaults to no-cache; stored images and variants never change under a URL
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = self.IMAGE_MAX_AGE
+            response.cache_control.immutable = True
+            return response
         
         # ========== API: MOVIES ==========
         @self.app.route('/api/movies', methods=['GET'])
         def get_movies():
             """Get all movies with basic info: id, title, poster, rating."""
-            movies = []
-            for item in self.database.get_all_items():
-                if item.get('type') == 'movie' and 'metadata' in item:
-                    metadata = item['metadata']
-                    movies.append({
-                        'id': metadata.get('id'),
-                        'title': metadata.get('title', item.get('title', 'Unknown')),
-                        'poster_path': self._get_image_url(metadata.get('poster_path')),
-                        'rating': metadata.get('vote_average', 0)
-                    })
-            return jsonify(movies), 200
+            return self._catalog_response(lambda: self._list_response(
+                lambda item: self.database.projection('movies', item), {'type': ['movie'], 'has_metadata': [True]}))
 
         # ========== API: TV SHOWS ==========
         @self.app.route('/api/tv-shows', methods=['GET'])
         def get_tv_shows():
             """Get all TV shows with basic info: id, title, poster, rating."""
-            tv_shows = []
-            for item in self.database.get_all_items():
-                if item.get('type') == 'tv_show' and 'metadata' in item:
-                    metadata = item['metadata']
-                    tv_shows.append({
-                        'id': metadata.get('id'),
-                        'title': metadata.get('name', item.get('title', 'Unknown')),
-                        'poster_path': self._get_image_url(metadata.get('poster_path')),
-                        'rating': metadata.get('vote_average', 0)
-                    })
-            return jsonify(tv_shows), 200
+            return self._catalog_response(lambda: self._list_response(
+                lambda item: self.database.projection('tv_shows', item), {'type': ['tv_show'], 'has_metadata': [True]}))
 
         # ========== API: MOVIE DETAIL ==========
         @self.app.route('/api/movie/<int:tmdb_id>', methods=['GET'])
         def get_movie_details(tmdb_id):
             """Get complete movie details by TMDB ID."""
-            for item in self.database.get_all_items():
-                if item.get('type') == 'movie' and 'metadata' in item:
-                    if item['metadata'].get('id') == tmdb_id:
-                        result = item['metadata'].copy()
-                        # Add file info
-                        result['file_path'] = item.get('path')
-                        result['year'] = item.get('year')
-                        # Add internal ID for stream access
-                        result['internal_id'] = self._get_item_internal_id(item)
-                        return jsonify(result), 200
-            return jsonify({'error': 'Movie not found'}), 404
+            def build():
+                item = self.database.find_by_tmdb_id(tmdb_id, 'movie')
+                if item:
+                    result = item['metadata'].copy()
+                    # Add file info
+                    result['file_path'] = item.get('path')
+                    result['year'] = item.get('year')
+                    # Add internal ID for stream access
+                    result['internal_id'] = self._get_item_internal_id(item)
+                    return jsonify(result), 200
+                return jsonify({'error': 'Movie not found'}), 404
+
+            return self._catalog_response(build)
 
         # ========== API: SERIES DETAIL ==========
         @self.app.route('/api/tv-show/<int:tmdb_id>', methods=['GET'])
         def get_tv_show_details(tmdb_id):
             """Get complete TV show details by TMDB ID."""
-            for item in self.database.get_all_items():
-                if item.get('type') == 'tv_show' and 'metadata' in item:
-                    if item['metadata'].get('id') == tmdb_id:
-                        result = item['metadata'].copy()
-                        # Add file info
-                        result['file_path'] = item.get('path')
-                        result['seasons'] = item.get('seasons', [])
-                        # Add internal ID for stream access
-                        result['internal_id'] = self._get_item_internal_id(item)
-                        return jsonify(result), 200
-            return jsonify({'error': 'TV show not found'}), 404
+            def build():
+                item = self.database.find_by_tmdb_id(tmdb_id, 'tv_show')
+                if item:
+                    result = item['metadata'].copy()
+                    # Add file info
+                    result['file_path'] = item.get('path')
+                    result['seasons'] = item.get('seasons', [])
+                    # Add internal ID for stream access
+                    result['internal_id'] = self._get_item_internal_id(item)
+                    return jsonify(result), 200
+                return jsonify({'error': 'TV show not found'}), 404
+
+            return self._catalog_response(build)
 
         # ========== API: SERIES EPISODE DETAIL ==========
         @self.app.route('/api/tv-show/<int:tmdb_id>/season/<int:season_number>/episode/<int:episode_number>', methods=['GET'])
         def get_tv_episode_details(tmdb_id, season_number, episode_number):
             """Get details about a specific TV episode (mirrors TMDB style), augmented with local file info if available."""
-            # Try to locate the TV show in local DB to enrich with local episode path
-            local_item = None
-            for item in self.database.get_all_items():
-                if item.get('type') == 'tv_show' and 'metadata' in item and item['metadata'].get('id') == tmdb_id:
-                    local_item = item
-                    break
-
             # Fetch TMDB episode details if possible
-            episode_meta = self.tmdb_client.get_tv_episode_details(tmdb_id, season_number, episode_number)
+            episode_meta = self._cached_episode_details(tmdb_id, season_number, episode_number)
 
             response_data = episode_meta or {}
             response_data.setdefault('season_number', int(season_number))
@@ -409,18 +941,12 @@ class CustomAPI:
             response_data['tmdb_show_id'] = tmdb_id
 
             # Attach local file info when present
-            found_local = False
-            if local_item:
-                for season in local_item.get('seasons', []):
-                    if int(season.get('season')) == int(season_number):
-                        for ep in season.get('episodes', []):
-                            if int(ep.get('episode')) == int(episode_number):
-                                response_data['local_path'] = ep.get('path')
-                                response_data['filename'] = ep.get('filename')
-                                response_data['stream_available'] = os.path.exists(ep.get('path')) if ep.get('path') else False
-                                found_local = True
-                                break
-            if not episode_meta and not found_local:
+            local_ep = self.database.find_episode(tmdb_id, season_number, episode_number)
+            if local_ep:
+                response_data['local_path'] = local_ep.get('path')
+                response_data['filename'] = local_ep.get('filename')
+                response_data['stream_available'] = os.path.exists(local_ep.get('path')) if local_ep.get('path') else False
+            if not episode_meta and not local_ep:
                 return jsonify({'error': 'Episode not found'}), 404
             return jsonify(response_data), 200
 
@@ -430,38 +956,23 @@ class CustomAPI:
         def get_tv_season(tmdb_id, season_number):
             """Get all episodes for a TV season with normalized fields and local stream info where available."""
             try:
-                episodes = self.tmdb_client.get_tv_season_episodes(tmdb_id, season_number) if self.tmdb_client else []
-
-                # Merge local info if show exists in DB
-                local_item = None
-                for item in self.database.get_all_items():
-                    if item.get('type') == 'tv_show' and 'metadata' in item and item['metadata'].get('id') == tmdb_id:
-                        local_item = item
-                        break
+                episodes = self._cached_season_episodes(tmdb_id, season_number) if self.tmdb_client else []
 
-                if local_item:
-                    local_lookup = {}
-                    for season in local_item.get('seasons', []):
-                        if int(season.get('season')) == int(season_number):
-                            for ep in season.get('episodes', []):
-                                key = int(ep.get('episode')) if ep.get('episode') is not None else None
-                                if key is not None:
-                                    local_lookup[key] = ep
-                    # Attach local info to matching episode numbers
-                    for ep in episodes:
-                        ep_no = int(ep.get('episode_number')) if ep.get('episode_number') is not None else None
-                        if ep_no in local_lookup:
-                            lep = local_lookup[ep_no]
-                            ep['local_path'] = lep.get('path')
-                            ep['filename'] = lep.get('filename')
-                            ep['stream_available'] = os.path.exists(lep.get('path')) if lep.get('path') else False
-                            # Prefer local stored metadata name if present
-                            name_local = (lep.get('metadata') or {}).get('name') or lep.get('name')
-                            if name_local:
-                                ep['name'] = name_local
-                            # Attach local still if available
-                            if lep.get('still_path'):
-                                ep['still_path'] = lep.get('still_path')
+                # Merge local info for episodes present in DB
+                for ep in episodes:
+                    ep_no = int(ep.get('episode_number')) if ep.get('episode_number') is not None else None
+                    lep = self.database.find_episode(tmdb_id, season_number, ep_no) if ep_no is not None else None
+                    if lep:
+                        ep['local_path'] = lep.get('path')
+                        ep['filename'] = lep.get('filename')
+                        ep['stream_available'] = os.path.exists(lep.get('path')) if lep.get('path') else False
+                        # Prefer local stored metadata name if present
+                        name_local = (lep.get('metadata') or {}).get('name') or lep.get('name')
+                        if name_local:
+                            ep['name'] = name_local
+                        # Attach local still if available
+                        if lep.get('still_path'):
+                            ep['still_path'] = lep.get('still_path')
 
                 return jsonify({ 'episodes': episodes }), 200
             except Exception as e:
@@ -473,16 +984,12 @@ class CustomAPI:
         def stream_tv_episode(tmdb_id, season_number, episode_number):
             """Stream a local episode file if available."""
             try:
-                for item in self.database.get_all_items():
-                    if item.get('type') == 'tv_show' and 'metadata' in item and item['metadata'].get('id') == tmdb_id:
-                        for season in item.get('seasons', []):
-                            if int(season.get('season')) == int(season_number):
-                                for ep in season.get('episodes', []):
-                                    if int(ep.get('episode')) == int(episode_number):
-                                        path = ep.get('path')
-                                        if path and os.path.exists(path):
-                                            return self._send_partial_file(path)
-                                        return jsonify({'error': 'File not found'}), 404
+                ep = self.database.find_episode(tmdb_id, season_number, episode_number)
+                if ep:
+                    path = ep.get('path')
+                    if path and os.path.exists(path):
+                        return self._send_partial_file(path)
+                    return jsonify({'error': 'File not found'}), 404
                 return jsonify({'error': 'Episode not found'}), 404
             except Exception as e:
                 return jsonify({'error': f'Failed to send file: {str(e)}'}), 500
@@ -490,42 +997,29 @@ class CustomAPI:
         # ========== API: STREAMS ==========
         @self.app.route('/api/streams', methods=['GET'])
         def get_streams():
-            """Get list of all video files (streams) with TMDB ID, name, type, size."""
-            streams = []
-            for item in self.database.get_all_items():
-                file_path = item.get('path')
-                if file_path and os.path.exists(file_path) and 'metadata' in item:
-                    metadata = item['metadata']
-                    tmdb_id = metadata.get('id')
-                    if tmdb_id:
-                        file_stat = os.stat(file_path)
-                        file_ext = os.path.splitext(file_path)[1].lower()
-                        streams.append({
-                            'id': tmdb_id,  # TMDB ID
-                            'name': os.path.basename(file_path),
-                            'type': file_ext.replace('.', ''),
-                            'size': file_stat.st_size,
-                            'title': metadata.get('title') or metadata.get('name', 'Unknown'),
-                            'media_type': item.get('type')
-                        })
-            return jsonify(streams), 200
+            """Get list of all video files (streams) with TMDB ID, name, type, size.
+
+            Files missing on disk are left out of the page, so a page can be
+            shorter than the limit; X-Total-Count counts indexed items.
+            """
+            return self._list_response(self._stream_entry, {'has_metadata': [True]})
 
         # ========== API: STREAM BY TMDB ID ==========
         @self.app.route('/api/stream/<int:tmdb_id>', methods=['GET'])
         def get_stream_file(tmdb_id):
             """Get direct link/file for stream by TMDB ID."""
-            for item in self.database.get_all_items():
-                if 'metadata' in item and item['metadata'].get('id') == tmdb_id:
-                    file_path = item.get('path')
-                    
-                    if not file_path or not os.path.exists(file_path):
-                        return jsonify({'error': 'File not found'}), 404
-                    
-                    try:
-                        # Return the actual file for streaming with Range support
-                        return self._send_partial_file(file_path)
-                    except Exception as e:
-                        return jsonify({'error': f'Failed to send file: {str(e)}'}), 500
+            item = self.database.find_by_tmdb_id(tmdb_id)
+            if item:
+                file_path = item.get('path')
+                
+                if not file_path or not os.path.exists(file_path):
+                    return jsonify({'error': 'File not found'}), 404
+                
+                try:
+                    # Return the actual file for streaming with Range support
+                    return self._send_partial_file(file_path)
+                except Exception as e:
+                    return jsonify({'error': f'Failed to send file: {str(e)}'}), 500
             
             return jsonify({'error': 'Stream not found'}), 404
 
@@ -533,22 +1027,22 @@ class CustomAPI:
         @self.app.route('/api/stream/<int:tmdb_id>/info', methods=['GET'])
         def get_stream_info(tmdb_id):
             """Get stream file information by TMDB ID without downloading."""
-            for item in self.database.get_all_items():
-                if 'metadata' in item and item['metadata'].get('id') == tmdb_id:
-                    file_path = item.get('path')
-                    
-                    if not file_path or not os.path.exists(file_path):
-                        return jsonify({'error': 'File not found'}), 404
-                    
-                    file_stat = os.stat(file_path)
-                    return jsonify({
-                        'id': tmdb_id,
-                        'path': file_path,
-                        'name': os.path.basename(file_path),
-                        'type': os.path.splitext(file_path)[1].replace('.', ''),
-                        'size': file_stat.st_size,
-                        'url': f'{self.config['custom_api_url']}/api/stream/{tmdb_id}'
-                    }), 200
+            item = self.database.find_by_tmdb_id(tmdb_id)
+            if item:
+                file_path = item.get('path')
+                
+                if not file_path or not os.path.exists(file_path):
+                    return jsonify({'error': 'File not found'}), 404
+                
+                file_stat = os.stat(file_path)
+                return jsonify({
+                    'id': tmdb_id,
+                    'path': file_path,
+                    'name': os.path.basename(file_path),
+                    'type': os.path.splitext(file_path)[1].replace('.', ''),
+                    'size': file_stat.st_size,
+                    'url': f"{self.config.get('custom_api_url', '')}/api/stream/{tmdb_id}"
+                }), 200
             
             return jsonify({'error': 'Stream not found'}), 404
 
@@ -557,18 +1051,14 @@ class CustomAPI:
             """Health check endpoint."""
             return jsonify({
                 'status': 'ok',
-                'total_items': len(self.database.get_all_items()),
-                'movies': len([i for i in self.database.get_all_items() if i.get('type') == 'movie']),
-                'tv_shows': len([i for i in self.database.get_all_items() if i.get('type') == 'tv_show'])
+                'total_items': self.database.count(),
+                'movies': self.database.count('movie'),
+                'tv_shows': self.database.count('tv_show')
             }), 200
 
     def _get_item_internal_id(self, item: Dict) -> Optional[int]:
         """Get internal ID (index) of item in database."""
-        items = self.database.get_all_items()
-        try:
-            return items.index(item)
-        except ValueError:
-            return None
+        return self.database.get_internal_id(item)
 
     def send_media_data(self, media_data: Dict, target_url: str):
         """Send media data to external API."""
@@ -0,0 +1,256 @@
+"""Single-pass parser for movie and episode file/folder names."""
+
+import datetime
+import re
+from typing import Dict, List, Optional
+
+# Later "years" cannot be release years ("Blade Runner 2049"); they stay in the title
+_LATEST_YEAR = datetime.date.today().year + 1
+
+# Characters that may surround a token ('_' counts as a separator, unlike in \b)
+_L = r'(?<![^\W_])'
+_R = r'(?![^\W_])'
+
+
+def _word_alternation(words) -> str:
+    """
+    Regex matching any of the literal words, factored into a prefix tree.
+
+    A flat "a|b|c" alternation retries every word at every position; the
+    tree, behind a class of the possible first characters, rejects a
+    position after one check.
+    """
+    tree: Dict = {}
+    for word in words:
+        node = tree
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ''
+        if '' not in node and len(alternatives) == 1:
+            return alternatives[0]
+        return '(?:' + '|'.join(alternatives) + ')' + ('?' if '' in node else '')
+
+    # A leading one-character class rejects most positions before any branch is tried
+    first = ''.join(re.escape(ch) for ch in sorted(tree))
+    return f'(?=[{first}])' + build(tree)
+
+
+# Release tags: source, codec, HDR, audio and Czech audio/subtitle markers
+_TAGS = _word_alternation([
+    'bluray', 'blu-ray', 'bdrip', 'bd-rip', 'brrip', 'br-rip', 'bdremux', 'remux', 'web-dl', 'webdl',
+    'webrip', 'web-rip', 'hdtv', 'hdrip', 'dvdrip', 'dvd-rip', 'dvdscr', 'dvd-scr', 'hdcam', 'hd-cam',
+    'x264', 'x265', 'h264', 'h265', 'h.264', 'h.265', 'hevc', 'xvid', 'divx', '10bit', '10-bit',
+    'hdr10+', 'hdr10', 'hdr', 'dovi', 'dts', 'dts-hd', 'dtshd', 'truehd', 'atmos', 'ac3', 'ac-3',
+    'eac3', 'eac-3', 'aac', 'ddp', 'flac', 'repack', 'czdab', 'czdabing', 'cztit', 'cztitulky',
+    'dabing', 'titulky',
+])
+# Tags that are also ordinary title words; recorded only after another marker
+_WEAK_TAGS = _word_alternation([
+    'web', 'dvd', 'cam', 'ts', 'avc', 'av1', 'dv', 'sdr', 'dd', 'mp3', 'proper', 'extended', 'unrated',
+    'uncut', 'remastered', 'imax', 'internal', 'limited', 'multi', 'dual', 'cz', 'sk',
+])
+
+# One alternation, tried left to right at every position. Group names are the token kinds;
+# earlier alternatives win at the same position (e.g. S01E02 before a plain season pack S01).
+# Alternatives are grouped by their first character behind a lookahead, so a word start only
+# tries the ones that can match it; kinds in different groups never match at the same position.
+_TOKEN_PATTERN = (
+    # Tokens only start at a word boundary; checking it once up front keeps the scan fast
+    rf'{_L}(?:'
+    rf'(?=\d)(?:'
+    rf'(?P<x_s>\d{{1,2}})\s*x\s*(?P<x_e>\d{{1,3}})(?!\d)(?P<x_more>(?:[-x]\d{{1,3}}{_R})*)'
+    # Absolute numbering: "[Group] Show - 105 [1080p]", "Show - 01-02"
+    rf'|(?<=\s-\s)(?!(?:19|20)\d\d{_R})(?P<abs>\d{{2,4}})(?:-(?P<abs_to>\d{{2,4}}))?(?:v\d)?(?![^\W_])'
+    rf'|(?P<year>(?:19|20)\d{{2}}){_R}'
+    rf'|(?<!\.)(?P<dot_s>\d{{1,2}})\s*\.\s*(?P<dot_e>\d{{1,2}})(?![\w.])'
+    rf')'
+    rf'|(?=s)(?:'
+    rf's(?P<se_s>\d{{1,2}})[\W_]*e(?P<se_e>\d{{1,4}})(?P<se_more>(?:[-_.]?e\d{{1,4}}|-\d{{1,4}}{_R})*)'
+    rf'|(?:season|s[eé]rie|sez[oó]na)[\W_]*(?P<sw_s>\d{{1,2}})\D*?(?:episode|epizoda|d[ií]l)[\W_]*(?P<sw_e>\d{{1,4}})'
+    rf'|s(?P<pack>\d{{1,2}}){_R}'
+    rf')'
+    # Absolute numbering: "E105", "Ep 12"
+    rf'|ep?[\W_]*(?P<abs_e>\d{{2,4}}){_R}'
+    rf'|(?P<res>\d{{3,4}}[pi]|4k|uhd){_R}'
+    rf'|(?P<tag>{_TAGS}){_R}'
+    rf'|(?P<weak>{_WEAK_TAGS}){_R}'
+    rf')'
+)
+# Matched against the lowercased name: case-sensitive matching is cheaper than IGNORECASE
+_TOKEN_RE = re.compile(_TOKEN_PATTERN)
+# For the rare names whose length changes when lowercased (positions must map back to the name)
+_TOKEN_RE_IGNORECASE = re.compile(_TOKEN_PATTERN, re.IGNORECASE)
+
+# Season folder names (multi-language): "Season 1", "S01", "Série 2", "Sezóna 3", ...
+SEASON_DIR_PATTERN = re.compile(r"^(?:s(?:eason)?\s*|sez(?:ona|óna)\s*|serie\s*|series\s*|saison\s*)(\d{1,3})$",
+                                re.IGNORECASE)
+
+# Token kinds reported by Match.lastgroup for the episode alternatives
+_EPISODE_GROUPS = {'se_e': 'se', 'se_more': 'se', 'sw_e': 'sw', 'x_e': 'x', 'x_more': 'x', 'dot_e': 'dot'}
+_EPISODE_RANK = {'se': 0, 'sw': 1, 'x': 2, 'dot': 3}
+_ABSOLUTE_GROUPS = ('abs_e', 'abs', 'abs_to')
+# Further episode numbers after the first one: "E02", "-E03", "-03", "x03"
+_MORE_RE = re.compile(r'(-)?[_.]?[ex]?(\d+)', re.IGNORECASE)
+# Longest episode range accepted from a name (guards against reading e.g. "E01-1999" as a range)
+MAX_EPISODE_RANGE = 30
+_BRACKETS_RE = re.compile(r'\[[^\]]*\]?|\([^)]*\)?|\{[^}]*\}?')
+_SPACES_RE = re.compile(r'\s+')
+_RESOLUTIONS = {'4k': '2160p', 'uhd': '2160p'}
+
+
+def parse_name(name: str, has_extension: bool = False, episodic: bool = False) -> Dict:
+    """
+    Parse a release name (file name without extension, or a folder name).
+
+    Returns a dict with title, year (str or None), season and episode (int
+    or None; season alone for season packs), episodes (all episode numbers
+    for multi-episode files like S01E01E02 or S01E01-E03, else [episode]),
+    absolute (absolute episode numbers of anime-style names like
+    "Show - 105" when there is no season/episode marker), resolution (e.g.
+    '1080p' or None), tags (lowercase release tags in order of appearance)
+    and ambiguous_episode (an "N.M" marker was left out for lack of
+    episode context, see below).
+
+    The title is the text before the first marker token (episode, year,
+    resolution or tag), with bracketed parts removed and dots/underscores
+    turned into spaces. A year at the very start is part of the title
+    ("2001 A Space Odyssey"); with several years before the other markers
+    the last one is the release year ("Blade Runner 2049 (2017)"). A lone
+    bare year ending a name without extension is part of the title too
+    ("Blade Runner 2049"), unless has_extension says the name is a file
+    name stem ("Inception.2010.mkv").
+
+    "1.02" is only read as season 1, episode 2 with episodic=True (a file
+    in a season or show folder), since in other names such numbers are
+    usually part of the title ("Les Miserables 10.5").
+    """
+    season = episode = resolution = None
+    episodes = []
+    absolute = []
+    episode_rank = 99
+    tags = []
+    years = []
+    title_end = None
+    # Position of the first quality marker; "5.1" after it is audio, not an episode
+    quality_start = None
+    ambiguous_episode = False
+
+    lowered = name.lower()
+    if len(lowered) == len(name):
+        tokens = _TOKEN_RE.finditer(lowered)
+    else:
+        tokens = _TOKEN_RE_IGNORECASE.finditer(name)
+
+    # Branches ordered by how often the token kinds occur in release names
+    for m in tokens:
+        kind = m.lastgroup
+        if kind == 'tag':
+            tags.append(m[0].lower())
+            if quality_start is None:
+                quality_start = m.start()
+                if title_end is None:
+                    title_end = quality_start
+            continue
+        if kind == 'weak':
+            if title_end is not None or years:
+                tags.append(m[0].lower())
+            continue
+        if kind == 'year':
+            if m.start() > 0 and int(m[0]) <= _LATEST_YEAR:
+                years.append(m)
+            continue
+        if kind == 'res':
+            if resolution is None:
+                value = m[0].lower()
+                resolution = _RESOLUTIONS.get(value, value)
+            if quality_start is None:
+                quality_start = m.start()
+        elif kind == 'pack':
+            if season is None:
+                season = int(m.group('pack'))
+        elif kind in _ABSOLUTE_GROUPS:
+            if not absolute:
+                first = int(m.group('abs_e') or m.group('abs'))
+                last = m.group('abs_to')
+                absolute = _episode_range(first, '-' + last) if last else [first]
+        else:
+            # Episode markers; the stronger notation wins, ties go to the first occurrence
+            prefix = _EPISODE_GROUPS[kind]
+            if prefix == 'dot':
+                if quality_start is not None:
+                    continue
+                if not episodic:
+                    ambiguous_episode = True
+                    continue
+            rank = _EPISODE_RANK[prefix]
+            if rank < episode_rank:
+                episode_rank = rank
+                season, episode = int(m.group(prefix + '_s')), int(m.group(prefix + '_e'))
+                more = m.group(prefix + '_more') if prefix in ('se', 'x') else ''
+                episodes = _episode_range(episode, more) if more else [episode]
+        if title_end is None:
+            title_end = m.start()
+
+    # Release year: the last year before the first non-year marker
+    year = None
+    for m in years:
+        if title_end is not None and m.start() > title_end:
+            break
+        year = m
+    if (year is not None and title_end is None and len(years) == 1 and not has_extension
+            and name[year.start() - 1] not in '([' and not name[year.end():].strip(' ._-')):
+        # Only number, at the end of a folder name: part of the title
+        year = None
+    if year is not None:
+        year_start = year.start()
+        if name[year_start - 1] == '(':
+            year_start -= 1
+        title_end = year_start if title_end is None else min(title_end, year_start)
+        year = year[0]
+
+    title = name if title_end is None else name[:title_end]
+    if '[' in title or '(' in title or '{' in title:
+        title = _BRACKETS_RE.sub(' ', title)
+    if ' ' not in title.strip():
+        title = title.replace('.', ' ')
+    title = ' '.join(title.replace('_', ' ').split()).strip(' -–.,')
+    if not title:
+        # Names like "[Group] S01E02" or "(2019)": fall back to the name without brackets
+        title = _SPACES_RE.sub(' ', _BRACKETS_RE.sub(' ', name)).strip(' -–.,') or name
+
+    return {
+        'title': title,
+        'year': year,
+        'season': season,
+        'episode': episode,
+        'episodes': episodes,
+        'absolute': [] if episodes else absolute,
+        'resolution': resolution,
+        'tags': tags,
+        'ambiguous_episode': ambiguous_episode,
+    }
+
+
+def _episode_range(first: int, more: str) -> List[int]:
+    """Episode numbers from the first number and the rest of a multi-episode marker."""
+    numbers = [first]
+    for m in _MORE_RE.finditer(more or ''):
+        number = int(m.group(2))
+        last = numbers[-1]
+        if m.group(1):
+            if last < number <= last + MAX_EPISODE_RANGE:
+                numbers.extend(range(last + 1, number + 1))
+        elif last < number <= last + MAX_EPISODE_RANGE:
+            numbers.append(number)
+    return numbers
+
+
+def parse_season_dir(name: str) -> Optional[int]:
+    """Season number of a season folder name, or None."""
+    m = SEASON_DIR_PATTERN.match(name)
+    return int(m.group(1)) if m else None
@@ -0,0 +1,84 @@
+"""Shared HTTP session with connection pooling, retries and client-side rate limiting."""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_size: int = 16, retries: int = 3, backoff: float = 0.5) -> requests.Session:
+    """
+    Create a requests.Session with a keep-alive connection pool and retries.
+
+    Connection errors and 5xx responses are retried with exponential backoff
+    (backoff * 2^n seconds). 429 is not retried here - callers handle it
+    through RateLimiter so every thread backs off, not just the one that hit it.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # Content-type headers stay per request: the session also downloads images
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    acquire() blocks until a token is available. pause() stops all callers
+    until the given time has passed (used for 429 Retry-After).
+    """
+
+    def __init__(self, rate: float = 40.0, burst: int = 40):
+        self.rate = max(0.1, rate)
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping as needed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Block all callers for `seconds` and drain the bucket."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+            self._updated = self._paused_until
+
+
+def retry_after_seconds(response: requests.Response, default: float) -> float:
+    """Parse a Retry-After header given in seconds, falling back to default."""
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', default)))
+    except (TypeError, ValueError):
+        return default
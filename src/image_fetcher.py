@@ -0,0 +1,154 @@
+"""Background image download queue for TMDB images."""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import requests
+
+
+class ImageFetcher:
+    """
+    Downloads images on a worker pool into a local directory.
+
+    Each download streams into a temporary file next to its destination and
+    is renamed into place once complete, so a partially written image is
+    never served. Requests for a destination that is already queued or
+    downloading share the same future instead of fetching it twice.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    TIMEOUT = 10
+
+    def __init__(self, images_dir: Path, http=None, workers: int = 8):
+        """
+        Args:
+            images_dir: Directory the images are stored in
+            http: requests module or a pooled requests.Session
+            workers: Number of concurrent downloads
+        """
+        self.images_dir = Path(images_dir)
+        self.http = http or requests
+        self.workers = max(1, int(workers or 1))
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='images')
+        # filename -> future of the download in flight
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.downloaded = 0
+        self.failed = 0
+
+    def fetch(self, url: str, filename: str, on_failure: Callable[[], None] = None) -> Future:
+        """
+        Queue a download of `url` to `filename` in the images directory.
+
+        Returns a future resolving to the filename (None if the download
+        failed). An existing file resolves immediately. `on_failure` runs
+        on a worker thread when the download fails, never on the caller's
+        thread, so callers may queue downloads while holding locks that
+        `on_failure` takes.
+        """
+        with self._lock:
+            future = self._in_flight.get(filename)
+            if future is None:
+                if (self.images_dir / filename).exists():
+                    future = Future()
+                    future.set_result(filename)
+                    return future
+                future = self._pool.submit(self._download, url, filename)
+                self._in_flight[filename] = future
+                future.add_done_callback(lambda _f, name=filename: self._done(name))
+        if on_failure is not None:
+            future.add_done_callback(lambda f: self._check_failed(f, on_failure))
+        return future
+
+    def _check_failed(self, future: Future, on_failure: Callable[[], None]):
+        """
+        Done callback: schedule on_failure if the download produced no file.
+
+        A future that is already done runs its callbacks right away on the
+        registering thread, so on_failure is handed to the pool instead of
+        being called here.
+        """
+        if not future.cancelled() and future.exception() is None and future.result():
+            return
+        try:
+            self._pool.submit(self._run_failure_callback, on_failure)
+        except RuntimeError:
+            # Pool already shut down (queued download cancelled); nothing else holds locks now
+            self._run_failure_callback(on_failure)
+
+    @staticmethod
+    def _run_failure_callback(on_failure: Callable[[], None]):
+        try:
+            on_failure()
+        except Exception as e:
+            print(f"[Images] Error in download failure handler: {e}")
+
+    def _done(self, filename: str):
+        with self._lock:
+            self._in_flight.pop(filename, None)
+
+    def _download(self, url: str, filename: str) -> Optional[str]:
+        """Stream one image to a temporary file and rename it into place."""
+        local_path = self.images_dir / filename
+        tmp_path = None
+        try:
+            print(f"[Images] Downloading {url}")
+            with self.http.get(url, timeout=self.TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                local_path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=local_path.parent, prefix=f".{local_path.name}.", suffix='.part')
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in response.iter_content(self.CHUNK_SIZE):
+                        f.write(chunk)
+            os.replace(tmp_path, local_path)
+            tmp_path = None
+            with self._lock:
+                self.downloaded += 1
+            return filename
+        except Exception as e:
+            print(f"[Images] Error downloading {url}: {e}")
+            with self._lock:
+                self.failed += 1
+            return None
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def wait_for(self, filename: str, timeout: float = None) -> bool:
+        """Wait for an in-flight download of `filename`. Returns False if none is in flight."""
+        with self._lock:
+            future = self._in_flight.get(filename)
+        if future is None:
+            return False
+        wait([future], timeout=timeout)
+        return True
+
+    def wait_all(self, timeout: float = None):
+        """Wait until the downloads queued so far have finished."""
+        with self._lock:
+            futures = list(self._in_flight.values())
+        wait(futures, timeout=timeout)
+
+    def pending_for(self, filename: str) -> bool:
+        """True while a download of `filename` is queued or running."""
+        with self._lock:
+            return filename in self._in_flight
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'pending': len(self._in_flight), 'downloaded': self.downloaded, 'failed': self.failed}
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool (queued downloads finish first when wait=True)."""
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,261 @@
+"""Resized and re-encoded image variants with a size-bounded disk cache."""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional at runtime; images are then served as stored
+    Image = None
+
+# Widths variants are generated in (TMDB's sizes); requests are rounded up to the next one
+WIDTHS = (92, 154, 185, 342, 500, 780, 1280)
+
+# fmt parameter -> (Pillow format, file extension, MIME type)
+FORMATS = {
+    'avif': ('AVIF', 'avif', 'image/avif'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'jpg': ('JPEG', 'jpg', 'image/jpeg'),
+    'png': ('PNG', 'png', 'image/png'),
+}
+# Formats offered to clients via Accept, best first
+NEGOTIATED_FORMATS = ('avif', 'webp')
+SAVE_OPTIONS = {
+    'AVIF': {'quality': 60},
+    'WEBP': {'quality': 80, 'method': 4},
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+}
+
+
+class ImageResizer:
+    """
+    Generates resized/re-encoded variants of stored images on a worker pool.
+
+    Variants are cached on disk in their own directory (sharded like the
+    image store) and evicted least recently used first once the cache
+    exceeds `max_bytes`. Concurrent requests for the same variant share one
+    generation.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 512 * 1024 * 1024, workers: int = 2):
+        """
+        Args:
+            cache_dir: Directory the variants are stored in
+            max_bytes: Size limit of the variant cache
+            workers: Number of concurrent resize jobs
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max(0, int(max_bytes))
+        self.workers = max(1, int(workers or 1))
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='resize')
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # path -> size, least recently used first
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._total = 0
+        self.hits = 0
+        self.generated = 0
+        self.evicted = 0
+        self._load()
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    @staticmethod
+    def supported_formats() -> Tuple[str, ...]:
+        """fmt values Pillow can encode here (AVIF needs a Pillow build or plugin with AVIF support)."""
+        if Image is None:
+            return ()
+        Image.init()
+        return tuple(name for name, (pil_format, _ext, _mime) in FORMATS.items() if pil_format in Image.SAVE)
+
+    def negotiate(self, fmt: Optional[str], accept: str) -> Tuple[Optional[str], bool]:
+        """
+        Output format for a request: explicit `fmt` wins, otherwise the best of
+        AVIF/WebP the client lists in Accept. Returns (fmt or None for the
+        stored format, negotiated) and raises ValueError for an unknown or
+        unsupported fmt.
+        """
+        supported = self.supported_formats()
+        if fmt and fmt != 'auto':
+            fmt = fmt.lower()
+            if fmt not in supported:
+                raise ValueError(f"Unsupported format '{fmt}' (supported: {', '.join(supported)})")
+            return fmt, False
+        accept = (accept or '').lower()
+        for candidate in NEGOTIATED_FORMATS:
+            if candidate in supported and FORMATS[candidate][2] in accept:
+                return candidate, True
+        return None, True
+
+    @staticmethod
+    def snap_width(width: Optional[int]) -> Optional[int]:
+        """Round a requested width up to the next generated width (None = original width)."""
+        if width is None:
+            return None
+        if width <= 0:
+            raise ValueError('Width must be positive')
+        for candidate in WIDTHS:
+            if candidate >= width:
+                return candidate
+        return WIDTHS[-1]
+
+    def variant_path(self, ref: str, width: Optional[int], fmt: Optional[str]) -> Path:
+        digest = hashlib.sha1(ref.encode('utf-8')).hexdigest()
+        ext = FORMATS[fmt][1] if fmt else (os.path.splitext(ref)[1].lstrip('.').lower() or 'jpg')
+        return self.cache_dir / digest[:2] / f"{digest}_{width or 0}.{ext}"
+
+    def get(self, source: Path, ref: str, width: Optional[int], fmt: Optional[str]) -> Tuple[Path, str]:
+        """
+        Path and MIME type of the variant of `source` (generated if not cached).
+
+        Blocks until the variant is ready. Raises FileNotFoundError if the
+        source image does not exist.
+        """
+        path = self.variant_path(ref, width, fmt)
+        mimetype = FORMATS[fmt][2] if fmt else self._mimetype(path)
+        key = str(path)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                future = None
+            else:
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = self._pool.submit(self._generate, source, path, width, fmt)
+                    self._in_flight[key] = future
+                    future.add_done_callback(lambda _f: self._done(key))
+        if future is None:
+            try:
+                os.utime(path)  # recency survives restarts
+                return path, mimetype
+            except FileNotFoundError:
+                # Deleted behind our back: forget it and generate again
+                self._forget(key)
+                return self.get(source, ref, width, fmt)
+        future.result()
+        return path, mimetype
+
+    def _done(self, key: str):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def _generate(self, source: Path, path: Path, width: Optional[int], fmt: Optional[str]):
+        """Resize/re-encode one image into the cache (temporary file + atomic rename)."""
+        with Image.open(source) as im:
+            pil_format = FORMATS[fmt][0] if fmt else im.format
+            if width and width < im.width:
+                height = max(1, round(im.height * width / im.width))
+                # JPEG decoders can scale down while decoding, much cheaper than a full decode
+                im.draft('RGB', (width, height))
+                out = im.resize((width, height), Image.LANCZOS)
+            else:
+                out = im.copy()
+        if pil_format == 'JPEG' and out.mode not in ('RGB', 'L'):
+            out = out.convert('RGB')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                out.save(f, format=pil_format, **SAVE_OPTIONS.get(pil_format, {}))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        size = path.stat().st_size
+        with self._lock:
+            self.generated += 1
+            self._entries[str(path)] = size
+            self._total += size
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used variants until the cache fits (called with the lock held)."""
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            self.evicted += 1
+            try:
+                os.unlink(key)
+            except OSError:
+                pass
+
+    def _forget(self, key: str):
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is not None:
+                self._total -= size
+
+    def _load(self):
+        """Index existing variants, oldest access first."""
+        entries = []
+        try:
+            shards = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return
+        for shard in shards:
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            with os.scandir(shard.path) as it:
+                for entry in it:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    if entry.name.startswith('.'):
+                        # Leftover of an interrupted resize
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+                        continue
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.path, st.st_size))
+        for _mtime, path, size in sorted(entries):
+            self._entries[path] = size
+            self._total += size
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def _mimetype(path: Path) -> str:
+        fmt = FORMATS.get(path.suffix.lstrip('.').lower())
+        return fmt[2] if fmt else 'application/octet-stream'
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.available,
+                'formats': list(self.supported_formats()),
+                'entries': len(self._entries),
+                'size_bytes': self._total,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'generated': self.generated,
+                'evicted': self.evicted,
+            }
+
+    def clear(self):
+        """Delete all cached variants."""
+        with self._lock:
+            for key in self._entries:
+                try:
+                    os.unlink(key)
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total = 0
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,169 @@
+"""Hash-sharded image store with reference-based garbage collection."""
+
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+# TMDB rendition downloaded for each image type
+IMAGE_SIZES = {'poster': 'w500', 'backdrop': 'w1280', 'still': 'w342'}
+
+# Flat filenames written before the store existed
+_LEGACY_IMAGE_RE = re.compile(r'^\d+_(poster|backdrop)_(.+)$')
+_LEGACY_STILL_RE = re.compile(r'^\d+_S\d+E\d+_still_(.+)$')
+_SHARD_RE = re.compile(r'^[0-9a-f]{2}$')
+
+
+class ImageStore:
+    """
+    Image files addressed by a hash of their TMDB source, sharded by prefix.
+
+    A reference such as "3f/3fa1...c2.jpg" names the file relative to the
+    store root. TMDB image paths are unique per uploaded image, so the same
+    picture used by several items (duplicate files of a movie, a show split
+    over folders, an episode still shared by a multi-episode file) maps to
+    one file. The first two hex digits pick one of 256 subdirectories, which
+    keeps every directory small however large the library grows.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    @staticmethod
+    def reference(tmdb_path: str, image_type: str) -> str:
+        """Store reference of a TMDB image path (e.g. '/abc.jpg') in the size used for image_type."""
+        size = IMAGE_SIZES.get(image_type, 'original')
+        digest = hashlib.sha1(f"{size}{tmdb_path}".encode('utf-8')).hexdigest()
+        ext = os.path.splitext(tmdb_path)[1].lower() or '.jpg'
+        return f"{digest[:2]}/{digest}{ext}"
+
+    @staticmethod
+    def is_reference(path: Optional[str]) -> bool:
+        """True for a local image (store reference or legacy filename), False for TMDB paths."""
+        return bool(path) and not path.startswith('/') and not os.path.isabs(path)
+
+    @classmethod
+    def legacy_reference(cls, filename: str) -> Optional[str]:
+        """Store reference for a flat legacy filename, or None if it is not one."""
+        if '/' in filename:
+            return None
+        m = _LEGACY_IMAGE_RE.match(filename)
+        if m:
+            return cls.reference('/' + m.group(2), m.group(1))
+        m = _LEGACY_STILL_RE.match(filename)
+        if m:
+            return cls.reference('/' + m.group(1), 'still')
+        return None
+
+    def path(self, ref: str) -> Path:
+        """Absolute path of a reference."""
+        return self.root / ref
+
+    def adopt(self, filename: str, ref: str) -> bool:
+        """
+        Move a legacy flat file to its store reference.
+
+        If the reference already exists the legacy file is a duplicate and is
+        deleted. Returns True if the reference exists afterwards.
+        """
+        source, target = self.root / filename, self.path(ref)
+        try:
+            if target.exists():
+                source.unlink(missing_ok=True)
+                return True
+            target.parent.mkdir(exist_ok=True)
+            os.replace(source, target)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"[Images] Error moving {filename} into the store: {e}")
+            return False
+
+    def iter_files(self) -> Iterator[Tuple[str, os.DirEntry]]:
+        """(reference, DirEntry) of every file in the store, including legacy flat files."""
+        try:
+            top = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return
+        for entry in top:
+            if entry.is_file(follow_symlinks=False):
+                yield entry.name, entry
+            elif _SHARD_RE.match(entry.name) and entry.is_dir(follow_symlinks=False):
+                with os.scandir(entry.path) as shard:
+                    for child in shard:
+                        if child.is_file(follow_symlinks=False):
+                            yield f"{entry.name}/{child.name}", child
+
+    def collect(self, referenced: Set[str], in_flight: Callable[[str], bool] = None,
+                grace: float = 3600, dry_run: bool = False) -> Dict:
+        """
+        Delete files that no reference points to.
+
+        Files modified within `grace` seconds and downloads still in flight
+        are kept, so an image fetched just before its reference is recorded
+        is never lost. Leftover temporary download files are removed as well.
+        Returns counts and bytes of deleted (or, with dry_run, deletable) files.
+        """
+        cutoff = time.time() - grace
+        removed = freed = kept = 0
+        for ref, entry in self.iter_files():
+            if ref in referenced or (in_flight is not None and in_flight(ref)):
+                kept += 1
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if st.st_mtime > cutoff:
+                kept += 1
+                continue
+            if not dry_run:
+                try:
+                    os.unlink(entry.path)
+                except OSError as e:
+                    print(f"[Images] Error deleting {ref}: {e}")
+                    continue
+            removed += 1
+            freed += st.st_size
+        if not dry_run:
+            self._remove_empty_shards()
+        print(f"[Images] GC {'found' if dry_run else 'removed'} {removed} unreferenced files ({freed} bytes)")
+        return {'removed': removed, 'bytes': freed, 'kept': kept, 'dry_run': dry_run}
+
+    def _remove_empty_shards(self):
+        try:
+            top = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return
+        for entry in top:
+            if _SHARD_RE.match(entry.name) and entry.is_dir(follow_symlinks=False):
+                try:
+                    os.rmdir(entry.path)
+                except OSError:
+                    pass  # not empty
+
+    def report(self, types: Dict[str, str]) -> Dict:
+        """
+        Disk use per image type.
+
+        `types` maps each referenced file to its image type; files nothing
+        refers to are reported as 'unreferenced'.
+        """
+        by_type: Dict[str, Dict[str, int]] = {}
+        total = {'files': 0, 'bytes': 0}
+        seen = set()
+        for ref, entry in self.iter_files():
+            try:
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            seen.add(ref)
+            bucket = by_type.setdefault(types.get(ref, 'unreferenced'), {'files': 0, 'bytes': 0})
+            bucket['files'] += 1
+            bucket['bytes'] += size
+            total['files'] += 1
+            total['bytes'] += size
+        return {'types': by_type, 'total': total, 'references': len(types), 'missing': len(types.keys() - seen)}
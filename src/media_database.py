@@ -1,45 +1,297 @@
+import atexit
+import bisect
 import json
 import os
+import threading
+import time
 import requests
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 import hashlib
+from src.image_fetcher import ImageFetcher
+from src.image_store import IMAGE_SIZES, ImageStore
+from src.search_index import SearchIndex
+from src.storage import JSONStorage, SQLiteStorage, WriteBehindSaver
+
+
+def _normalize_key(path: str) -> str:
+    """Normalized path used as the index key for media items."""
+    return os.path.normpath(path or '')
+
 
 class MediaDatabase:
     """Manages persistent storage of scanned media with metadata and images."""
 
-    def __init__(self, db_path: str = None):
+    BACKENDS = ('json', 'sqlite')
+    # Fields query() can filter on (each backed by _filter_index) and sort by
+    FILTERS = ('type', 'has_metadata', 'missing', 'genre')
+    SORT_KEYS = ('title', 'year', 'rating', 'added')
+
+    def __init__(self, db_path: str = None, backend: str = 'json', save_interval: float = 5.0,
+                 save_batch_size: int = 100, compact_json: bool = False, image_workers: int = 8):
+        """
+        Args:
+            db_path: Path to media_db.json (the SQLite file lives next to it as media_db.sqlite3)
+            backend: 'json' (whole file rewritten on save) or 'sqlite' (per-item row writes)
+            save_interval: JSON only - seconds to coalesce save() calls before writing (0 = write immediately)
+            save_batch_size: JSON only - number of pending save() calls that forces a write
+            compact_json: JSON only - write without indentation
+            image_workers: Number of concurrent image downloads
+        """
         if db_path is None:
             db_path = Path(__file__).parent.parent / 'data' / 'media_db.json'
+        if backend not in self.BACKENDS:
+            print(f"[Database] Unknown backend '{backend}', falling back to json")
+            backend = 'json'
         
         self.db_path = Path(db_path)
         self.images_dir = self.db_path.parent / 'images'
+        self.backend = backend
         
         # Create directories if they don't exist
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.images_dir.mkdir(parents=True, exist_ok=True)
+
+        if backend == 'sqlite':
+            self.storage = SQLiteStorage(self.db_path.with_suffix('.sqlite3'))
+            try:
+                migrated = self.storage.migrate_from_json(self.db_path)
+                if migrated:
+                    print(f"[Database] Migrated {migrated} items from {self.db_path.name} to SQLite")
+            except Exception as e:
+                print(f"[Database] Error migrating JSON database to SQLite: {e}")
+        else:
+            self.storage = JSONStorage(self.db_path, compact=compact_json)
+
+        # Write-behind saver for the JSON backend: save() marks dirty, writes are batched
+        self._saver = None
+        if not self.storage.incremental and save_interval > 0:
+            self._saver = WriteBehindSaver(self._write_snapshot, save_interval, save_batch_size)
+            atexit.register(self.flush)
+
+        # Guards item/index mutations and snapshot serialization across threads
+        self.lock = threading.RLock()
+        # HTTP client for image downloads (requests module or a pooled Session)
+        self.http = requests
+        # Hash-sharded image files and the download queue that fills them
+        self.image_store = ImageStore(self.images_dir)
+        self.images = ImageFetcher(self.images_dir, self.http, image_workers)
         
-        self.media_items = []
+        # In-memory indexes, kept consistent by every mutating method:
+        #   _items:         normalized path -> item (insertion ordered, primary store)
+        #   _tmdb_index:    (TMDB id, type) -> items sharing that key (storage order)
+        #   _type_index:    type -> {normalized path -> item}
+        #   _episode_index: (show TMDB id, season, episode) -> episode record
+        #   _filter_index:  (filter, value) -> {normalized path -> item}, see FILTERS
+        #   _index_keys:    normalized path -> keys the item is filed under
+        #   _sorted_views:  sort key -> [(value, normalized path)] ascending, built on demand
+        #   _projections:   projection name -> {normalized path -> summary dict}, see register_projection()
+        #   search_index:   full-text index of titles, overviews, genres and cast, built by the first search()
+        self._items: Dict[str, Dict] = {}
+        self._index_keys: Dict[str, Dict] = {}
+        self._tmdb_index: Dict[Tuple[int, str], List[Dict]] = {}
+        self._type_index: Dict[str, Dict[str, Dict]] = {}
+        self._episode_index: Dict[Tuple[int, int, int], Dict] = {}
+        self._filter_index: Dict[Tuple[str, Any], Dict[str, Dict]] = {}
+        self._sorted_views: Dict[str, List[Tuple[Any, str]]] = {}
+        self._sort_ranks: Dict[str, Dict[str, int]] = {}
+        self._projection_builders: Dict[str, Callable[[Dict], Optional[Dict]]] = {}
+        self._projections: Dict[str, Dict[str, Dict]] = {}
+        self.search_index = SearchIndex()
+        self._search_ready = False
+        self._items_list: Optional[List[Dict]] = None
+        self._positions: Optional[Dict[str, int]] = None
+        # Bumped on every change to the items; HTTP ETags of catalog responses derive from it.
+        # The epoch keeps generations of different process runs apart.
+        self.generation = 0
+        self._generation_epoch = f"{int(time.time() * 1000):x}"
+
         self.load()
         self._migrate_image_paths()
+        self._migrate_image_store()
+
+    @property
+    def media_items(self) -> List[Dict]:
+        """Items in storage order (list view over the path index)."""
+        if self._items_list is None:
+            self._items_list = list(self._items.values())
+        return self._items_list
+
+    @media_items.setter
+    def media_items(self, items: List[Dict]):
+        self._rebuild_indexes(items)
+
+    def _invalidate_views(self):
+        """Drop the cached list view and positions after a structural change."""
+        self._items_list = None
+        self._positions = None
+        self._sorted_views = {}
+        self._sort_ranks = {}
+        self.generation += 1
+
+    @property
+    def etag(self) -> str:
+        """Strong validator for responses built from the current items."""
+        return f"{self._generation_epoch}-{self.generation}"
+
+    def _rebuild_indexes(self, items: List[Dict]):
+        """Rebuild all indexes from a list of items."""
+        self._items = {}
+        self._index_keys = {}
+        self._tmdb_index = {}
+        self._type_index = {}
+        self._episode_index = {}
+        self._filter_index = {}
+        self._projections = {name: {} for name in self._projection_builders}
+        self.search_index.clear()
+        self._search_ready = False
+        self._invalidate_views()
+        for item in items:
+            key = _normalize_key(item.get('path'))
+            if key in self._items:
+                self._unindex_item(key)
+            self._items[key] = item
+            self._index_item(key, item)
+
+    @staticmethod
+    def _episode_keys(item: Dict, tmdb_id: Optional[int]) -> List[Tuple[Tuple[int, int, int], Dict]]:
+        """(show id, season, episode) keys with their episode records for a TV show item."""
+        if tmdb_id is None or item.get('type') != 'tv_show':
+            return []
+        keys = []
+        for season in item.get('seasons', []) or []:
+            for ep in season.get('episodes', []) or []:
+                try:
+                    keys.append(((tmdb_id, int(season.get('season')), int(ep.get('episode'))), ep))
+                except (TypeError, ValueError):
+                    continue
+        return keys
+
+    @staticmethod
+    def _filter_keys(item: Dict) -> List[Tuple[str, Any]]:
+        """(filter, value) pairs an item is filed under in _filter_index."""
+        metadata = item.get('metadata')
+        keys = [('type', item.get('type')), ('has_metadata', bool(metadata)), ('missing', bool(item.get('missing')))]
+        for genre in (metadata or {}).get('genres') or []:
+            # Details carry {'id': 28, 'name': 'Akční'}; both the id and the folded name match
+            if isinstance(genre, dict):
+                if genre.get('id') is not None:
+                    keys.append(('genre', str(genre['id'])))
+                genre = genre.get('name')
+            if genre:
+                keys.append(('genre', str(genre).casefold()))
+        return list(dict.fromkeys(keys))
+
+    @staticmethod
+    def _search_fields(item: Dict) -> Dict[str, str]:
+        """Text of an item per SearchIndex field."""
+        metadata = item.get('metadata') or {}
+        titles = dict.fromkeys(t for t in (metadata.get('title'), metadata.get('name'), item.get('title')) if t)
+        originals = (metadata.get('original_title'), metadata.get('original_name'))
+        genres = [g.get('name') if isinstance(g, dict) else g for g in metadata.get('genres') or []]
+        people = list(metadata.get('cast') or []) + list(metadata.get('created_by') or [])
+        return {
+            'title': ' '.join(titles),
+            'original_title': ' '.join(t for t in originals if t and t not in titles),
+            'genres': ' '.join(g for g in genres if g),
+            'cast': ' '.join(p.get('name', '') if isinstance(p, dict) else str(p) for p in people),
+            'overview': metadata.get('overview') or '',
+        }
+
+    def _index_item(self, key: str, item: Dict):
+        """File an item (already stored in _items) into the secondary indexes."""
+        media_type = item.get('type')
+        tmdb_id = (item.get('metadata') or {}).get('id')
+        episodes = self._episode_keys(item, tmdb_id)
+        filters = self._filter_keys(item)
+        self._index_keys[key] = {
+            'type': media_type,
+            'tmdb': (tmdb_id, media_type) if tmdb_id is not None else None,
+            'episodes': episodes,
+            'filters': filters,
+        }
+        self._type_index.setdefault(media_type, {})[key] = item
+        for filter_key in filters:
+            self._filter_index.setdefault(filter_key, {})[key] = item
+        for name, build in self._projection_builders.items():
+            summary = build(item)
+            if summary is not None:
+                self._projections[name][key] = summary
+        if self._search_ready:
+            self.search_index.add(key, self._search_fields(item))
+        if tmdb_id is not None:
+            self._tmdb_index.setdefault((tmdb_id, media_type), []).append(item)
+        for ep_key, ep in episodes:
+            # First show in storage order wins when two folders share a TMDB id
+            self._episode_index.setdefault(ep_key, ep)
+        self._invalidate_views()
+
+    def _unindex_item(self, key: str):
+        """Remove an item from the secondary indexes using the keys it was filed under.
+
+        Items are mutated in place by callers, so the recorded keys are used
+        rather than the item's current fields.
+        """
+        keys = self._index_keys.pop(key, None)
+        if keys is None:
+            return
+        item = self._items.get(key)
+        by_type = self._type_index.get(keys['type'])
+        if by_type is not None:
+            by_type.pop(key, None)
+            if not by_type:
+                del self._type_index[keys['type']]
+        bucket = self._tmdb_index.get(keys['tmdb'])
+        if bucket is not None:
+            for idx, candidate in enumerate(bucket):
+                if candidate is item:
+                    del bucket[idx]
+                    break
+            if not bucket:
+                del self._tmdb_index[keys['tmdb']]
+        for ep_key, ep in keys['episodes']:
+            if self._episode_index.get(ep_key) is ep:
+                del self._episode_index[ep_key]
+        for filter_key in keys['filters']:
+            postings = self._filter_index.get(filter_key)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._filter_index[filter_key]
+        for projection in self._projections.values():
+            projection.pop(key, None)
+        self.search_index.remove(key)
+        self._invalidate_views()
+
+    def _replace_item(self, key: str, new: Dict):
+        """Swap the item stored under key for new, keeping its storage position."""
+        self._unindex_item(key)
+        self._items[key] = new
+        self._index_item(key, new)
 
     def load(self):
-        """Load media database from file."""
-        if self.db_path.exists():
+        """Load media database from storage."""
+        with self.lock:
             try:
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    self.media_items = json.load(f)
-                print(f"[Database] Loaded {len(self.media_items)} items from database")
+                self.media_items = self.storage.load()
+                if self._items:
+                    print(f"[Database] Loaded {len(self._items)} items from database")
             except Exception as e:
                 print(f"[Database] Error loading database: {e}")
                 self.media_items = []
-        else:
-            self.media_items = []
+
+    def _persist(self, key: str, item: Dict):
+        """Write a single item through to row-level storage (no-op for JSON)."""
+        self.generation += 1
+        if self.storage.incremental:
+            self.storage.upsert(key, item)
 
     def _migrate_image_paths(self):
         """Migrate old local_*_path fields to metadata.poster_path/backdrop_path."""
         migrated = False
-        for item in self.media_items:
+        for key, item in self._items.items():
+            if 'local_poster_path' not in item and 'local_backdrop_path' not in item:
+                continue
             if 'metadata' not in item:
                 # Item without metadata - just remove old local paths
                 if 'local_poster_path' in item:
@@ -48,6 +300,7 @@ class MediaDatabase:
                 if 'local_backdrop_path' in item:
                     del item['local_backdrop_path']
                     migrated = True
+                self._persist(key, item)
                 continue
             
             metadata = item['metadata']
@@ -75,55 +328,341 @@ class MediaDatabase:
                     migrated = True
                 del item['local_backdrop_path']
                 migrated = True
+
+            self._persist(key, item)
         
         if migrated:
             print(f"[Database] Migrated image paths to metadata format")
             self.save()
+
+    def _migrate_image_store(self):
+        """Move flat legacy image files into the hash-sharded store and update their references."""
+        moved = 0
+        with self.lock:
+            for key, item in self._items.items():
+                changed = False
+                for target, field, _image_type in self._image_fields(item):
+                    ref = ImageStore.legacy_reference(target[field])
+                    if ref is None:
+                        continue
+                    if self.image_store.adopt(target[field], ref):
+                        moved += 1
+                    target[field] = ref
+                    changed = True
+                if changed:
+                    self._persist(key, item)
+        if moved:
+            print(f"[Database] Moved {moved} images into the sharded image store")
+            self.save()
     
     def save(self):
-        """Save media database to file."""
+        """
+        Save media database to storage.
+
+        SQLite commits the rows written since the last save. JSON marks the
+        database dirty and lets the write-behind saver coalesce the write;
+        use flush() when the data must be on disk before returning.
+        """
+        if self._saver is not None:
+            self._saver.mark_dirty()
+            return
         try:
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.media_items, f, indent=2, ensure_ascii=False)
-            print(f"[Database] Saved {len(self.media_items)} items to database")
+            if self.storage.incremental:
+                self.storage.commit()
+                print(f"[Database] Saved {len(self._items)} items to database")
+            else:
+                self._write_snapshot()
         except Exception as e:
             print(f"[Database] Error saving database: {e}")
 
+    def _write_snapshot(self):
+        """Serialize all items under the lock, then write them atomically (JSON backend)."""
+        with self.lock:
+            text = self.storage.dumps(self.media_items)
+            count = len(self._items)
+        self.storage.write(text)
+        print(f"[Database] Saved {count} items to database")
+
+    def flush(self):
+        """Write any pending changes to storage immediately."""
+        if self._saver is not None:
+            self._saver.flush()
+        else:
+            self.save()
+
+    def close(self):
+        """Finish queued image downloads, persist pending changes and release storage handles."""
+        self.images.shutdown(wait=True)
+        if self._saver is not None:
+            self._saver.stop()
+        else:
+            self.save()
+        self.storage.close()
+
     def get_all_items(self) -> List[Dict]:
         """Get all media items from database."""
         return self.media_items.copy()
 
     def find_by_path(self, path: str) -> Optional[Dict]:
         """Find media item by file path."""
-        normalized_path = os.path.normpath(path)
-        for item in self.media_items:
-            if os.path.normpath(item.get('path', '')) == normalized_path:
-                return item
-        return None
+        return self._items.get(_normalize_key(path))
+
+    def find_by_tmdb_id(self, tmdb_id: int, media_type: str = None) -> Optional[Dict]:
+        """
+        Find the first media item (in storage order) with the given TMDB id.
+
+        Args:
+            tmdb_id: TMDB id from item metadata
+            media_type: 'movie' or 'tv_show'; if None, items of any type match
+
+        Returns:
+            Matching item or None
+        """
+        candidates = []
+        for t in ([media_type] if media_type else ['movie', 'tv_show']):
+            candidates.extend(self._tmdb_index.get((tmdb_id, t), ()))
+        if len(candidates) < 2:
+            return candidates[0] if candidates else None
+        # A replaced item is re-appended to its bucket, so order by storage position
+        return min(candidates, key=self.get_internal_id)
+
+    def find_episode(self, tmdb_show_id: int, season_number: int, episode_number: int) -> Optional[Dict]:
+        """Find a local episode record by show TMDB id, season and episode number."""
+        return self._episode_index.get((tmdb_show_id, int(season_number), int(episode_number)))
+
+    def get_items_by_type(self, media_type: str) -> List[Dict]:
+        """Get all items of a given type ('movie' or 'tv_show') in storage order."""
+        return list(self._type_index.get(media_type, {}).values())
+
+    def count(self, media_type: str = None) -> int:
+        """Number of items in database, optionally only of one type."""
+        if media_type is None:
+            return len(self._items)
+        return len(self._type_index.get(media_type, {}))
+
+    def get_internal_id(self, item: Dict) -> Optional[int]:
+        """Internal ID (position in storage order) of an item, as used by the API."""
+        key = _normalize_key(item.get('path'))
+        if self._items.get(key) is not item:
+            return None
+        if self._positions is None:
+            self._positions = {k: idx for idx, k in enumerate(self._items)}
+        return self._positions.get(key)
+
+    def register_projection(self, name: str, build: Callable[[Dict], Optional[Dict]]):
+        """
+        Keep a materialized summary of every item, e.g. the entry a list endpoint returns.
+
+        `build(item)` returns the summary dict (None = item not part of the
+        projection). Summaries are computed for all items now and refreshed
+        whenever an item is added, updated or removed, so readers never
+        rebuild them. Treat returned summaries as read-only.
+        """
+        with self.lock:
+            self._projection_builders[name] = build
+            projection = {}
+            for key, item in self._items.items():
+                summary = build(item)
+                if summary is not None:
+                    projection[key] = summary
+            self._projections[name] = projection
+
+    def projection(self, name: str, item: Dict) -> Optional[Dict]:
+        """Materialized summary of an item in a registered projection."""
+        return self._projections[name].get(_normalize_key(item.get('path')))
+
+    @staticmethod
+    def _sort_value(item: Dict, sort: str) -> Any:
+        """Value an item is ordered by for a sort key (see SORT_KEYS)."""
+        metadata = item.get('metadata') or {}
+        if sort == 'title':
+            return (metadata.get('title') or metadata.get('name') or item.get('title') or '').casefold()
+        if sort == 'year':
+            year = (metadata.get('release_date') or metadata.get('first_air_date') or '')[:4] or str(item.get('year') or '')
+            return int(year) if year.isdigit() else 0
+        if sort == 'rating':
+            return float(metadata.get('vote_average') or 0)
+        if sort == 'added':
+            return int(item.get('added_at') or 0)
+        raise ValueError(f"Unknown sort key '{sort}'")
+
+    def _sorted_view(self, sort: Optional[str]) -> List[Tuple[Any, str]]:
+        """(value, path key) of all items in ascending order; storage order when sort is None.
+
+        Built on first use and kept until the next change to the items.
+        """
+        name = sort or 'position'
+        view = self._sorted_views.get(name)
+        if view is None:
+            if sort is None:
+                view = [(idx, key) for idx, key in enumerate(self._items)]
+            else:
+                view = sorted((self._sort_value(item, sort), key) for key, item in self._items.items())
+            self._sorted_views[name] = view
+        return view
+
+    def _sort_rank(self, sort: Optional[str]) -> Dict[str, int]:
+        name = sort or 'position'
+        ranks = self._sort_ranks.get(name)
+        if ranks is None:
+            ranks = self._sort_ranks[name] = {key: idx for idx, (_value, key) in enumerate(self._sorted_view(sort))}
+        return ranks
+
+    def _candidates(self, filters: Dict[str, Iterable]) -> Optional[Dict[str, Dict]]:
+        """
+        Items matching all filters, intersected from _filter_index postings.
+
+        Each filter maps to the accepted values (any of them matches). Returns
+        None when there are no filters (all items).
+        """
+        result = None
+        groups = []
+        for name, values in filters.items():
+            if name not in self.FILTERS:
+                raise ValueError(f"Unknown filter '{name}'")
+            postings = [self._filter_index.get((name, value), {}) for value in values]
+            groups.append(postings[0] if len(postings) == 1 else
+                          {key: item for p in postings for key, item in p.items()})
+        # Smallest posting list first keeps the intersection cheap
+        for postings in sorted(groups, key=len):
+            if result is None:
+                result = postings
+            else:
+                result = {key: item for key, item in result.items() if key in postings}
+            if not result:
+                break
+        return result
+
+    def query(self, filters: Dict[str, Iterable] = None, sort: Optional[str] = None, descending: bool = False,
+              offset: int = 0, limit: Optional[int] = None, after: Optional[Tuple] = None,
+              match=None) -> Tuple[List[Dict], int, Optional[Tuple]]:
+        """
+        One page of items using the filter index and sorted views.
+
+        Args:
+            filters: {filter name: accepted values}, see FILTERS (genre values are folded names or TMDB ids)
+            sort: One of SORT_KEYS, or None for storage order (internal_id order)
+            descending: Reverse the sort order
+            offset: Matching items to skip (after the cursor, if any)
+            limit: Page size (None = all remaining)
+            after: Cursor returned for the previous page; the page starts after that item
+            match: Optional predicate applied to candidate items (not index-backed, counted in a full pass)
+
+        Returns:
+            (items, total matching items, cursor of the last item if more follow)
+        """
+        with self.lock:
+            candidates = self._candidates(filters or {})
+            order = self._sorted_view(sort)
+            check = candidates
+            if candidates is not None and len(candidates) * 8 < len(order):
+                # Few matches: order just those by rank instead of walking the whole view
+                ranks = self._sort_rank(sort)
+                order = [order[idx] for idx in sorted(ranks[key] for key in candidates)]
+                check = None
+
+            if after is None:
+                start = 0
+            else:
+                after = tuple(after)
+                if sort is None and after[1] in self._items:
+                    # Storage order: resume after the item's current position
+                    after = (self._sort_rank(None)[after[1]], after[1])
+                try:
+                    start = bisect.bisect_right(order, after) if not descending else bisect.bisect_left(order, after)
+                except TypeError:
+                    raise ValueError('Cursor does not match the sort order')
+            if descending:
+                indices = range((len(order) if after is None else start) - 1, -1, -1)
+            else:
+                indices = range(start, len(order))
+
+            total = len(self._items) if candidates is None else len(candidates)
+            page, skipped, last, more = [], 0, None, False
+            for idx in indices:
+                value, key = order[idx]
+                if check is not None and key not in check:
+                    continue
+                item = self._items[key]
+                if match is not None and not match(item):
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                if limit is not None and len(page) >= limit:
+                    more = True
+                    break
+                page.append(item)
+                last = (value, key)
+            if match is not None:
+                total = sum(1 for item in (self._items if candidates is None else candidates).values()
+                            if match(item))
+        return page, total, last if more else None
+
+    def search(self, query: str, limit: int = 10, media_type: str = None,
+               require_metadata: bool = False) -> List[Tuple[Dict, float]]:
+        """
+        Full-text search over titles, original titles, overviews, genres and cast.
+
+        Matching ignores case and diacritics, and the last query word also
+        matches as a prefix. Returns (item, score) pairs, best match first.
+        """
+        with self.lock:
+            if not self._search_ready:
+                started = time.time()
+                for key, item in self._items.items():
+                    self.search_index.add(key, self._search_fields(item))
+                self._search_ready = True
+                print(f"[Database] Built search index of {len(self.search_index)} items in {time.time() - started:.1f}s")
+            by_type = self._type_index.get(media_type, {}) if media_type is not None else None
+            with_metadata = self._filter_index.get(('has_metadata', True), {}) if require_metadata else None
+
+            def accept(key: str) -> bool:
+                return (by_type is None or key in by_type) and (with_metadata is None or key in with_metadata)
+
+            return [(self._items[key], score) for key, score in self.search_index.search(query, limit, accept)]
 
     def add_or_update(self, item: Dict):
         """Add new item or update existing one."""
-        existing = self.find_by_path(item['path'])
-        if existing:
-            # Update existing item
-            index = self.media_items.index(existing)
-            self.media_items[index] = item
-            print(f"[Database] Updated item: {item.get('title', 'Unknown')}")
-        else:
-            # Add new item
-            self.media_items.append(item)
-            print(f"[Database] Added item: {item.get('title', 'Unknown')}")
+        key = _normalize_key(item['path'])
+        with self.lock:
+            existing = self._items.get(key)
+            # First time the path entered the library (kept across rescans that rebuild the item)
+            added_at = existing.get('added_at') if existing is not None else int(time.time())
+            if added_at is not None:
+                item.setdefault('added_at', added_at)
+            if existing is not None:
+                # Update existing item in place (keeps its position in storage order)
+                self._replace_item(key, item)
+                print(f"[Database] Updated item: {item.get('title', 'Unknown')}")
+            else:
+                # Add new item
+                self._items[key] = item
+                self._index_item(key, item)
+                print(f"[Database] Added item: {item.get('title', 'Unknown')}")
+            self._persist(key, item)
 
     def remove(self, path: str):
         """Remove item by path."""
-        item = self.find_by_path(path)
-        if item:
-            self.media_items.remove(item)
-            print(f"[Database] Removed item: {item.get('title', 'Unknown')}")
-            return True
-        return False
+        key = _normalize_key(path)
+        with self.lock:
+            item = self._items.get(key)
+            if item is None:
+                return False
+            self._unindex_item(key)
+            del self._items[key]
+            if self.storage.incremental:
+                self.storage.delete(key)
+        print(f"[Database] Removed item: {item.get('title', 'Unknown')}")
+        return True
+
+    def set_http_session(self, session):
+        """Use a shared (pooled, retrying) requests.Session for image downloads."""
+        self.http = session
+        self.images.http = session
 
-    def download_image(self, url: str, tmdb_id: int, image_type: str) -> Optional[str]:
+    def download_image(self, url: str, tmdb_id: int, image_type: str, wait: bool = True,
+                       on_failure=None) -> Optional[str]:
         """
         Download image from TMDB and save locally.
         
@@ -131,6 +670,8 @@ class MediaDatabase:
             url: TMDB image path (e.g., '/abc123.jpg')
             tmdb_id: TMDB ID for organizing images
             image_type: 'poster' or 'backdrop'
+            wait: False = queue the download and return the expected filename right away
+            on_failure: Called (on a download thread) if a queued download fails
         
         Returns:
             Filename (not full path) of downloaded image, or None if failed
@@ -138,41 +679,65 @@ class MediaDatabase:
         if not url:
             return None
 
-        try:
-            # TMDB image base URL
-            base_url = "https://image.tmdb.org/t/p/"
-            # Use w500 for posters, w1280 for backdrops
-            size = "w500" if image_type == "poster" else "w1280"
-            full_url = f"{base_url}{size}{url}"
-
-            # Create filename from TMDB ID and original filename
-            filename = f"{tmdb_id}_{image_type}_{os.path.basename(url)}"
-            local_path = self.images_dir / filename
-
-            # Download if not already cached
-            if not local_path.exists():
-                print(f"[Database] Downloading {image_type}: {full_url}")
-                response = requests.get(full_url, timeout=10)
-                response.raise_for_status()
-                
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
-                print(f"[Database] Saved {image_type} to: {local_path}")
-            else:
-                print(f"[Database] Using cached {image_type}: {local_path}")
+        # TMDB image base URL (w500 for posters, w1280 for backdrops)
+        base_url = "https://image.tmdb.org/t/p/"
+        full_url = f"{base_url}{IMAGE_SIZES[image_type]}{url}"
 
+        return self._fetch_image(full_url, self.image_filename(url, tmdb_id, image_type), wait, on_failure)
+
+    @staticmethod
+    def image_filename(url: str, tmdb_id: int, image_type: str) -> str:
+        """Local path of a poster/backdrop in the image store (shared by all items using it)."""
+        return ImageStore.reference(url, image_type)
+
+    @staticmethod
+    def still_filename(still_path: str, tmdb_show_id: int, season_number: int, episode_number: int) -> str:
+        """Local path of an episode still in the image store."""
+        return ImageStore.reference(still_path, 'still')
+
+    def _fetch_image(self, full_url: str, filename: str, wait: bool, on_failure) -> Optional[str]:
+        """Queue a download on the image fetcher; optionally wait for it."""
+        try:
+            future = self.images.fetch(full_url, filename, None if wait else on_failure)
             # Return just the filename, not the full path
-            return filename
+            return future.result() if wait else filename
         except Exception as e:
-            print(f"[Database] Error downloading image {url}: {e}")
+            print(f"[Database] Error downloading image {full_url}: {e}")
             return None
 
-    def remove_old_images(self, item: Dict):
+    def restore_image_path(self, item: Dict, target: Dict, field: str, filename: str, original: Optional[str]):
         """
-        Remove old images for an item before downloading new ones.
-        
+        Undo a local image path recorded for a download that then failed.
+
+        `target` is the dict holding the path (item metadata or an episode);
+        the TMDB path is put back (or the field removed) so a later run can
+        retry the download.
+        """
+        with self.lock:
+            if target.get(field) != filename:
+                return
+            if original:
+                target[field] = original
+            else:
+                del target[field]
+            if self._items.get(_normalize_key(item.get('path'))) is item:
+                self.add_or_update(item)
+        self.save()
+
+    def remove_old_images(self, item: Dict) -> List[str]:
+        """
+        Forget the images of an item before its metadata is replaced.
+
+        Deletes files behind legacy local_*_path keys and drops the keys.
+        Store images may be shared with other items, so they are not deleted
+        here: pass the returned references to release_images() once the item
+        has been updated.
+
         Args:
             item: Media item dict with potentially old image paths (filenames)
+
+        Returns:
+            Store references the item used
         """
         for key in ['local_poster_path', 'local_backdrop_path']:
             if key in item and item[key]:
@@ -193,13 +758,83 @@ class MediaDatabase:
                     print(f"[Database] Error deleting old image: {e}")
                 # Remove the reference
                 del item[key]
+        return [target[field] for target, field, _image_type in self._image_fields(item)]
+
+    def release_images(self, refs: List[str]) -> int:
+        """Delete the given store images that no item references any more. Returns the number deleted."""
+        with self.lock:
+            referenced = self.image_references()
+        deleted = 0
+        for ref in set(refs) - referenced.keys():
+            if self.images.pending_for(ref):
+                continue
+            try:
+                self.image_store.path(ref).unlink()
+                deleted += 1
+                print(f"[Database] Deleted unreferenced image: {ref}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[Database] Error deleting old image: {e}")
+        return deleted
 
-    def enrich_with_images(self, item: Dict) -> Dict:
+    @staticmethod
+    def _image_fields(item: Dict) -> List[Tuple[Dict, str, str]]:
+        """(dict, field, image type) of every local image path recorded on an item."""
+        fields = []
+        metadata = item.get('metadata') or {}
+        for field, image_type in (('poster_path', 'poster'), ('backdrop_path', 'backdrop')):
+            if ImageStore.is_reference(metadata.get(field)):
+                fields.append((metadata, field, image_type))
+        for season in item.get('seasons', []) or []:
+            for ep in season.get('episodes', []) or []:
+                if ImageStore.is_reference(ep.get('still_path')):
+                    fields.append((ep, 'still_path', 'still'))
+        return fields
+
+    def image_references(self) -> Dict[str, Dict]:
+        """
+        Reference index of the image store, built from the items.
+
+        Maps each local image path to its type and the number of places
+        (item metadata and episodes) that refer to it.
+        """
+        refs: Dict[str, Dict] = {}
+        with self.lock:
+            for item in self._items.values():
+                for target, field, image_type in self._image_fields(item):
+                    entry = refs.get(target[field])
+                    if entry is None:
+                        refs[target[field]] = {'type': image_type, 'refs': 1}
+                    else:
+                        entry['refs'] += 1
+        return refs
+
+    def collect_images(self, dry_run: bool = False, grace: float = 3600) -> Dict:
+        """
+        Garbage-collect the image store: delete files no item refers to.
+
+        Files newer than `grace` seconds and downloads in flight are kept.
+        """
+        return self.image_store.collect(set(self.image_references()), self.images.pending_for,
+                                        grace=grace, dry_run=dry_run)
+
+    def image_report(self) -> Dict:
+        """Disk use of the image store per image type, with reference counts."""
+        refs = self.image_references()
+        report = self.image_store.report({ref: entry['type'] for ref, entry in refs.items()})
+        report['shared'] = sum(1 for entry in refs.values() if entry['refs'] > 1)
+        report['downloads'] = self.images.stats()
+        return report
+
+    def enrich_with_images(self, item: Dict, wait: bool = True) -> Dict:
         """
         Download and cache images for media item with TMDB metadata.
         
         Args:
             item: Media item dict with 'metadata' containing TMDB data
+            wait: False = record the expected local filenames and download in the
+                  background (a failed download restores the TMDB path)
         
         Returns:
             Updated item with local image paths stored directly in metadata
@@ -213,25 +848,27 @@ class MediaDatabase:
         if not tmdb_id:
             return item
 
-        # Download poster - replace TMDB path with local filename in metadata
-        poster_path = metadata.get('poster_path')
-        if poster_path and poster_path.startswith('/'):
-            # It's a TMDB path, download and replace
-            local_poster = self.download_image(poster_path, tmdb_id, 'poster')
-            if local_poster:
-                metadata['poster_path'] = local_poster
-
-        # Download backdrop - replace TMDB path with local filename in metadata
-        backdrop_path = metadata.get('backdrop_path')
-        if backdrop_path and backdrop_path.startswith('/'):
+        # Download poster and backdrop - replace TMDB paths with local filenames in metadata
+        for field, image_type in (('poster_path', 'poster'), ('backdrop_path', 'backdrop')):
+            tmdb_path = metadata.get(field)
+            if not tmdb_path or not tmdb_path.startswith('/'):
+                continue
             # It's a TMDB path, download and replace
-            local_backdrop = self.download_image(backdrop_path, tmdb_id, 'backdrop')
-            if local_backdrop:
-                metadata['backdrop_path'] = local_backdrop
+            if wait:
+                local_path = self.download_image(tmdb_path, tmdb_id, image_type)
+                if local_path:
+                    metadata[field] = local_path
+                continue
+            # Recorded before queueing, so a fast failure finds it to restore
+            filename = metadata[field] = self.image_filename(tmdb_path, tmdb_id, image_type)
+            self.download_image(tmdb_path, tmdb_id, image_type, wait=False,
+                                on_failure=lambda f=field, n=filename, o=tmdb_path:
+                                self.restore_image_path(item, metadata, f, n, o))
 
         return item
 
-    def download_episode_still(self, still_path: str, tmdb_show_id: int, season_number: int, episode_number: int) -> Optional[str]:
+    def download_episode_still(self, still_path: str, tmdb_show_id: int, season_number: int, episode_number: int,
+                               wait: bool = True, on_failure=None) -> Optional[str]:
         """
         Download and save a TV episode still image locally.
 
@@ -240,34 +877,18 @@ class MediaDatabase:
             tmdb_show_id: TMDB show ID
             season_number: Season number
             episode_number: Episode number
+            wait: False = queue the download and return the expected filename right away
+            on_failure: Called (on a download thread) if a queued download fails
 
         Returns:
             Filename of downloaded image in local images dir or None if fails
         """
         if not still_path:
             return None
-        try:
-            base_url = "https://image.tmdb.org/t/p/"
-            size = "w342"
-            full_url = f"{base_url}{size}{still_path}"
-
-            filename = f"{tmdb_show_id}_S{int(season_number):02d}E{int(episode_number):02d}_still_{os.path.basename(still_path)}"
-            local_path = self.images_dir / filename
-
-            if not local_path.exists():
-                print(f"[Database] Downloading episode still: {full_url}")
-                response = requests.get(full_url, timeout=10)
-                response.raise_for_status()
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
-                print(f"[Database] Saved episode still to: {local_path}")
-            else:
-                print(f"[Database] Using cached episode still: {local_path}")
-
-            return filename
-        except Exception as e:
-            print(f"[Database] Error downloading episode still {still_path}: {e}")
-            return None
+        base_url = "https://image.tmdb.org/t/p/"
+        full_url = f"{base_url}{IMAGE_SIZES['still']}{still_path}"
+        filename = self.still_filename(still_path, tmdb_show_id, season_number, episode_number)
+        return self._fetch_image(full_url, filename, wait, on_failure)
 
     def _download_images(self, item: Dict) -> Dict:
         """
@@ -286,11 +907,7 @@ class MediaDatabase:
         Returns:
             List of items that are not in database
         """
-        new_items = []
-        for item in scanned_items:
-            if not self.find_by_path(item['path']):
-                new_items.append(item)
-        return new_items
+        return [item for item in scanned_items if _normalize_key(item['path']) not in self._items]
 
     def mark_missing_files(self, scanned_paths: List[str]):
         """
@@ -299,18 +916,22 @@ class MediaDatabase:
         Args:
             scanned_paths: List of file paths from current scan
         """
-        normalized_scanned = [os.path.normpath(p) for p in scanned_paths]
-        
-        for item in self.media_items:
-            item_path = os.path.normpath(item.get('path', ''))
-            if item_path not in normalized_scanned:
-                item['missing'] = True
-                print(f"[Database] Marked as missing: {item.get('title', 'Unknown')}")
-            else:
-                # Remove missing flag if file is found again
-                if 'missing' in item:
-                    del item['missing']
-                    print(f"[Database] File found again: {item.get('title', 'Unknown')}")
+        normalized_scanned = {_normalize_key(p) for p in scanned_paths}
+
+        with self.lock:
+            for item_path, item in self._items.items():
+                if item_path not in normalized_scanned:
+                    item['missing'] = True
+                    self._replace_item(item_path, item)
+                    self._persist(item_path, item)
+                    print(f"[Database] Marked as missing: {item.get('title', 'Unknown')}")
+                else:
+                    # Remove missing flag if file is found again
+                    if 'missing' in item:
+                        del item['missing']
+                        self._replace_item(item_path, item)
+                        self._persist(item_path, item)
+                        print(f"[Database] File found again: {item.get('title', 'Unknown')}")
 
     def clear_all(self) -> bool:
         """
@@ -320,7 +941,8 @@ class MediaDatabase:
             True if successful, False otherwise
         """
         try:
-            # Delete all images
+            # Delete all images (after downloads in flight have landed)
+            self.images.wait_all()
             if self.images_dir.exists():
                 import shutil
                 shutil.rmtree(self.images_dir)
@@ -328,8 +950,10 @@ class MediaDatabase:
                 print("[Database] Deleted all images")
             
             # Clear database
-            self.media_items = []
-            self.save()
+            with self.lock:
+                self.media_items = []
+                self.storage.clear()
+            self.flush()
             print("[Database] Database cleared")
             return True
         except Exception as e:
@@ -344,17 +968,14 @@ class MediaDatabase:
             Number of items removed
         """
         removed_count = 0
-        items_to_keep = []
         
-        for item in self.media_items:
+        for item in list(self.media_items):
             path = item.get('path')
-            if path and os.path.exists(path):
-                items_to_keep.append(item)
-            else:
+            if not path or not os.path.exists(path):
                 print(f"[Database] Removing missing file: {item.get('title', 'Unknown')} - {path}")
+                self.remove(path)
                 removed_count += 1
         
-        self.media_items = items_to_keep
         if removed_count > 0:
             self.save()
         
@@ -0,0 +1,112 @@
+"""In-process LRU cache with TTL, single-flight loading and stale-while-revalidate."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Flight:
+    """A load in progress that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MemoryCache:
+    """
+    Thread-safe bounded LRU cache for slow lookups (e.g. live TMDB calls).
+
+    - Fresh entries (younger than `ttl`) are returned directly.
+    - Stale entries (younger than `ttl + stale_ttl`) are returned immediately
+      while one background thread refreshes them.
+    - Concurrent misses for the same key share a single loader call.
+    - Falsy loader results (failed lookups) are returned but not cached.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 600, stale_ttl: float = 3600):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (value, stored_at)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return cached value for key, calling loader on a miss (at most once per key at a time)."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._flights:
+                        self._flights[key] = _Flight()
+                        threading.Thread(target=self._load, args=(key, loader), daemon=True).start()
+                    return value
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+                self.coalesced += 1
+
+        if owner:
+            self._load(key, loader)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]):
+        """Run loader for key, store the result and release waiting callers."""
+        flight = self._flights[key]
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+        with self._lock:
+            if flight.error is None and flight.value:
+                self._entries[key] = (flight.value, time.time())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._flights.pop(key, None)
+        flight.done.set()
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] = None):
+        """Drop entries whose key matches predicate (all entries if None)."""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+            }
@@ -28,7 +28,8 @@ class ProgressTracker:
             'current': 0,
             'total': 0,
             'current_item': '',
-            'message': ''
+            'message': '',
+            'roots': {}
         }
         self._lock = threading.Lock()
     
@@ -41,7 +42,8 @@ class ProgressTracker:
                 'current': 0,
                 'total': total,
                 'current_item': '',
-                'message': message
+                'message': message,
+                'roots': {}
             }
     
     def update(self, current: int = None, current_item: str = None, message: str = None, total: int = None):
@@ -63,6 +65,23 @@ class ProgressTracker:
             if current_item is not None:
                 self._progress['current_item'] = current_item
     
+    def add_total(self, count: int):
+        """Grow the total as more work is discovered."""
+        with self._lock:
+            self._progress['total'] += count
+    
+    def set_root(self, root: str, **fields):
+        """Update the per-root state of a scan (status, subtrees, done, items)."""
+        with self._lock:
+            self._progress['roots'].setdefault(root, {}).update(fields)
+    
+    def root_subtree_done(self, root: str, items: int):
+        """Count one finished subtree of a root and the items it contained."""
+        with self._lock:
+            state = self._progress['roots'].setdefault(root, {})
+            state['done'] = state.get('done', 0) + 1
+            state['items'] = state.get('items', 0) + items
+    
     def finish(self, message: str = 'Dokončeno'):
         """Mark progress as finished."""
         with self._lock:
@@ -73,7 +92,9 @@ class ProgressTracker:
     def get_progress(self) -> Dict:
         """Get current progress snapshot."""
         with self._lock:
-            return self._progress.copy()
+            snapshot = self._progress.copy()
+            snapshot['roots'] = {root: dict(state) for root, state in self._progress['roots'].items()}
+            return snapshot
     
     def reset(self):
         """Reset progress to initial state."""
@@ -84,5 +105,6 @@ class ProgressTracker:
                 'current': 0,
                 'total': 0,
                 'current_item': '',
-                'message': ''
+                'message': '',
+                'roots': {}
             }
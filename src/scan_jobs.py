@@ -0,0 +1,197 @@
+"""Background runner for library scans (on-demand and periodic)."""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from src.scanner import ScanCancelled
+
+
+class ScanJob:
+    """One scan run and its outcome."""
+
+    def __init__(self, policy: str, trigger: str, relist: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.policy = policy
+        self.trigger = trigger  # 'manual' or 'scheduled'
+        self.relist = relist
+        self.status = 'queued'  # queued -> running -> completed | failed | cancelled
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ('queued', 'running')
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'policy': self.policy,
+            'trigger': self.trigger,
+            'status': self.status,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class ScanJobRunner:
+    """
+    Runs scans one at a time in a worker thread.
+
+    submit() never starts a second scan while one is queued or running; it
+    returns the active job instead, so callers can coalesce into it or
+    reject the request. With a positive interval a scan is submitted
+    `interval` seconds after the previous one finished.
+    """
+
+    # Finished jobs kept for the status endpoint
+    HISTORY_SIZE = 20
+
+    def __init__(self, run_scan: Callable[[ScanJob], Dict], interval: float = 0,
+                 scheduled_policy: Callable[[], str] = None):
+        """
+        Args:
+            run_scan: Executes a job and returns its summary (raises ScanCancelled on cancel)
+            interval: Seconds between periodic scans (0 = no periodic scans)
+            scheduled_policy: Callable returning the policy for periodic scans
+        """
+        self.run_scan = run_scan
+        self.interval = interval
+        self.scheduled_policy = scheduled_policy or (lambda: None)
+        self._jobs: 'OrderedDict[str, ScanJob]' = OrderedDict()
+        self._active: Optional[ScanJob] = None
+        self._last_finished = time.monotonic()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='scan-jobs', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Cancel the active job and stop the worker."""
+        with self._cond:
+            self._stopping = True
+            if self._active is not None:
+                self._active.cancel_event.set()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def set_interval(self, interval: float):
+        """Change the periodic scan interval (0 disables it)."""
+        with self._cond:
+            self.interval = interval
+            self._cond.notify_all()
+
+    def submit(self, policy: str, trigger: str = 'manual', relist: bool = False) -> Tuple[ScanJob, bool]:
+        """
+        Queue a scan.
+
+        Returns:
+            (job, created): the new job, or the active job with created=False
+            when the request was coalesced. If the active job has a different
+            policy it is returned with created=False as well and the caller
+            should treat the request as rejected (check job.policy).
+        """
+        with self._cond:
+            if self._active is not None and self._active.active:
+                return self._active, False
+            job = ScanJob(policy, trigger, relist)
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.HISTORY_SIZE:
+                self._jobs.popitem(last=False)
+            self._cond.notify_all()
+        print(f"[Scan Jobs] Queued {trigger} scan {job.id} (policy {policy})")
+        return job, True
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[ScanJob]:
+        """Request cancellation of a queued or running job. Returns the job or None if unknown."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == 'queued':
+                job.status = 'cancelled'
+                job.finished = time.time()
+                if self._active is job:
+                    self._active = None
+            elif job.status == 'running':
+                job.cancel_event.set()
+            return job
+
+    def list_jobs(self):
+        """Jobs, newest first."""
+        return [job.to_dict() for job in reversed(list(self._jobs.values()))]
+
+    @property
+    def active_job(self) -> Optional[ScanJob]:
+        job = self._active
+        return job if job is not None and job.active else None
+
+    def next_scheduled_in(self) -> Optional[float]:
+        """Seconds until the next periodic scan (None if disabled or a scan is active)."""
+        if not self.interval or self.interval <= 0 or self.active_job:
+            return None
+        return max(0.0, self._last_finished + self.interval - time.monotonic())
+
+    def _run(self):
+        """Worker loop: run queued jobs and submit periodic scans when due."""
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._active is not None and self._active.status == 'queued':
+                        break
+                    due = self.next_scheduled_in()
+                    if due == 0:
+                        break
+                    self._cond.wait(due)
+                if self._stopping:
+                    return
+                job = self._active if self._active is not None and self._active.status == 'queued' else None
+                if job is not None:
+                    # Claimed under the lock so cancel() sees either queued or running
+                    job.status = 'running'
+                    job.started = time.time()
+            if job is None:
+                self.submit(self.scheduled_policy(), trigger='scheduled')
+                continue
+            self._execute(job)
+
+    def _execute(self, job: ScanJob):
+        print(f"[Scan Jobs] Running scan {job.id}")
+        try:
+            job.result = self.run_scan(job)
+            job.status = 'completed'
+        except ScanCancelled:
+            job.status = 'cancelled'
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = 'failed'
+        job.finished = time.time()
+        with self._cond:
+            self._last_finished = time.monotonic()
+            if self._active is job:
+                self._active = None
+        print(f"[Scan Jobs] Scan {job.id} {job.status}")
@@ -0,0 +1,78 @@
+"""Persisted state of the previous scan, used for incremental rescans."""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.storage import JSONStorage
+
+
+class ScanManifest:
+    """
+    Directory listings and item signatures from the last completed scan.
+
+    `dirs` maps a directory path to its listing:
+        {'mtime': float | None, 'dirs': [names], 'files': {name: [size, mtime]}}
+    (only video files are recorded). A listing is reused without touching the
+    directory again while the directory mtime is unchanged.
+
+    `items` maps a media item path to a signature of its files' (size, mtime)
+    pairs, so changed movies/shows can be told apart from unchanged ones.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: JSON file to persist to (None = in-memory only)
+        """
+        self.path = Path(path) if path else None
+        self.dirs: Dict[str, Dict] = {}
+        self.items: Dict[str, str] = {}
+        self.load()
+
+    def load(self):
+        """Load the manifest file; a missing or unreadable file means an empty manifest."""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.VERSION:
+                print(f"[Scanner] Ignoring scan manifest with unknown version: {self.path}")
+                return
+            self.dirs = data.get('dirs') or {}
+            self.items = data.get('items') or {}
+        except Exception as e:
+            print(f"[Scanner] Error loading scan manifest: {e}")
+
+    def save(self):
+        """Atomically write the manifest file."""
+        if not self.path:
+            return
+        data = {'version': self.VERSION, 'dirs': self.dirs, 'items': self.items}
+        try:
+            JSONStorage(self.path, compact=True).save_all(data)
+        except Exception as e:
+            print(f"[Scanner] Error saving scan manifest: {e}")
+
+    @staticmethod
+    def _under(path: str, roots: List[str]) -> bool:
+        return any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in roots)
+
+    def update(self, dirs: Dict[str, Dict], items: Dict[str, str], scanned_roots: List[str]):
+        """
+        Replace the state of the scanned roots with a new scan result.
+
+        Entries below roots that were not scanned (e.g. an offline share) are
+        kept so they can still be reused once the root is reachable again.
+        """
+        roots = [os.path.normpath(r) for r in scanned_roots]
+        kept_dirs = {p: d for p, d in self.dirs.items() if not self._under(os.path.normpath(p), roots)}
+        kept_items = {p: s for p, s in self.items.items() if not self._under(os.path.normpath(p), roots)}
+        kept_dirs.update(dirs)
+        kept_items.update(items)
+        self.dirs = kept_dirs
+        self.items = kept_items
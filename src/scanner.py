@@ -1,32 +1,93 @@
+import hashlib
 import os
-import re
 import sys
-from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import List, Dict, Optional, Set, Tuple
+from src.filename_parser import SEASON_DIR_PATTERN, parse_name, parse_season_dir
 from src.progress_tracker import ProgressTracker
+from src.scan_manifest import ScanManifest
+
+
+class ScanCancelled(Exception):
+    """Raised inside a scan when its cancel event is set."""
+
 
 class MediaScanner:
     """Scanner for movies and TV shows in specified folders."""
 
     VIDEO_EXTENSIONS = {'.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v'}
-    # Common folder names indicating seasons (multi-language)
-    SEASON_DIR_PATTERN = re.compile(r"^(?:s(?:eason)?\s*|sez(?:ona|óna)\s*|serie\s*|series\s*|saison\s*)(\d{1,3})$",
-                                    re.IGNORECASE)
-    # Episode filename patterns: S01E02, 1x02, s1 e2, season 1 episode 2
-    EPISODE_PATTERNS = [
-        re.compile(r"[sS](\d{1,2})[\W_]*[eE](\d{1,2})"),
-        re.compile(r"(\d{1,2})\s*[xX]\s*(\d{1,2})"),
-        re.compile(r"season\s*(\d{1,2})\D*episode\s*(\d{1,2})", re.IGNORECASE),
-        re.compile(r"\b(\d{1,2})\s*\.\s*(\d{1,2})\b")  # e.g., 1.02
-    ]
-
-    def __init__(self, folders: List[str]):
-        self.folders = []
+    # Common folder names indicating seasons (multi-language); names are parsed in src.filename_parser
+    SEASON_DIR_PATTERN = SEASON_DIR_PATTERN
+
+    # Which scanned items get TMDB work (see select_for_enrichment)
+    SCAN_POLICIES = ('new_only', 'missing_metadata', 'refresh_older_than', 'full')
+    DEFAULT_SCAN_POLICY = 'missing_metadata'
+
+    # Directories modified less than this many seconds before being listed are
+    # listed again next time (mtime granularity on network shares is coarse)
+    RACY_MTIME_WINDOW = 2.0
+
+    # On Windows os.scandir returns stat data with the listing, so subdirectory
+    # mtimes come for free; elsewhere DirEntry.stat() would be an extra syscall
+    DIRENTRY_STAT_CACHED = os.name == 'nt'
+
+    def __init__(self, folders: List[str], enrich_workers: int = 4, manifest_path: str = None,
+                 scan_workers: int = 4, max_depth: int = 0):
+        """
+        Args:
+            folders: Root folders to scan
+            enrich_workers: Number of concurrent TMDB enrichment workers (items and episodes)
+            scan_workers: Number of concurrent directory walkers (roots and their top-level subtrees)
+            manifest_path: JSON file with the previous scan state for incremental rescans
+                           (None = keep it in memory only)
+            max_depth: Deepest folder level below a root that is scanned (0 = unlimited);
+                       season folders of a show at the last level are still read
+        """
         self.progress = ProgressTracker()
+        self.manifest = ScanManifest(manifest_path)
+        # Per-scan state: fresh listings, roots that were reachable, listing counters
+        self._listings: Dict[str, Dict] = {}
+        self._scanned_roots: List[str] = []
+        self._failed_dirs: List[str] = []
+        # Subdirectory mtimes taken from the parent's DirEntry (see DIRENTRY_STAT_CACHED)
+        self._dir_mtimes: Dict[str, float] = {}
+        self._relist_all = True
+        self._listed_dirs = 0
+        self._reused_dirs = 0
+        # Guards the listing counters and failed dirs (updated from scan worker threads)
+        self._stats_lock = threading.Lock()
+        # Scan result waiting for commit_manifest()
+        self._pending_signatures: Optional[Dict[str, str]] = None
+        # Serializes update_library() runs (API scans and watcher batches)
+        self.scan_lock = threading.Lock()
+        # Cancel event of the running update_library() call
+        self._cancel: Optional[threading.Event] = None
+        self._apply_settings(folders, enrich_workers, scan_workers, max_depth)
+
+    def _apply_settings(self, folders: List[str], enrich_workers: int, scan_workers: int, max_depth: int):
+        self.enrich_workers = max(1, int(enrich_workers or 1))
+        self.scan_workers = max(1, int(scan_workers or 1))
+        self.max_depth = max(0, int(max_depth or 0))
+        normalized_folders = []
         for f in folders:
             # Normalize path based on OS
             normalized = self._normalize_path(f)
-            self.folders.append(normalized)
+            normalized_folders.append(normalized)
             print(f"[Scanner] Added folder: {normalized}")
+        self.folders = normalized_folders
+
+    def configure(self, folders: List[str], enrich_workers: int = 4, scan_workers: int = 4, max_depth: int = 0):
+        """
+        Apply changed settings (same arguments as the constructor).
+
+        Waits for a running update_library() to finish, so a scan never sees
+        settings change halfway. The scan manifest is kept; directories of
+        removed folders simply stop being listed.
+        """
+        with self.scan_lock:
+            self._apply_settings(folders, enrich_workers, scan_workers, max_depth)
 
     def _normalize_path(self, path: str) -> str:
         """Normalize path for current OS."""
@@ -45,132 +106,735 @@ class MediaScanner:
         
         return path
 
-    def scan(self) -> List[Dict]:
-        """Scan folders and return list of media items."""
-        media_items = []
-        
-        self.progress.start('scanning', len(self.folders), 'Skenování složek...')
+    def scan(self, relist: bool = True, folders: List[str] = None) -> List[Dict]:
+        """
+        Scan folders and return list of media items.
+
+        Args:
+            relist: List every directory again. If False, directories whose
+                    mtime has not changed since the last committed scan reuse
+                    their manifest listing.
+            folders: Subtrees to scan instead of the configured folders
+        """
+        folders = self.folders if folders is None else folders
+        self._listings = {}
+        self._scanned_roots = []
+        self._failed_dirs = []
+        self._dir_mtimes = {}
+        self._relist_all = relist
+        self._listed_dirs = 0
+        self._reused_dirs = 0
         
-        for idx, folder_path in enumerate(self.folders):
-            self.progress.update(current=idx, current_item=folder_path)
-            print(f"\n[Scanner] Starting scan of: {folder_path}")
-            
-            try:
-                # Verify folder exists and is accessible
-                if not os.path.exists(folder_path):
-                    print(f"[Scanner] ERROR: Folder does not exist: {folder_path}")
-                    continue
-                
-                if not os.path.isdir(folder_path):
-                    print(f"[Scanner] ERROR: Path is not a directory: {folder_path}")
-                    continue
-                
-                # Test accessibility
+        self.progress.start('scanning', len(folders), 'Skenování složek...')
+        for folder_path in folders:
+            self.progress.set_root(folder_path, status='pending')
+
+        # Roots are scanned concurrently; each root's top-level subdirectories
+        # are queued as separate tasks once its top level has been read.
+        # Results are merged in root order, then listing order, so the item
+        # order matches a sequential top-down walk.
+        root_items: Dict[int, List[Dict]] = {}
+        subtree_futures: Dict[int, List] = {}
+        pool = ThreadPoolExecutor(max_workers=self.scan_workers, thread_name_prefix='scan')
+        try:
+            root_futures = {}
+            for idx, folder_path in enumerate(folders):
+                print(f"\n[Scanner] Starting scan of: {folder_path}")
+                root_futures[pool.submit(self._scan_root_level, folder_path)] = idx
+            for future in as_completed(root_futures):
+                idx = root_futures[future]
+                folder_path = folders[idx]
                 try:
-                    contents = os.listdir(folder_path)
-                    print(f"[Scanner] Folder accessible, contains {len(contents)} items")
-                except PermissionError as e:
-                    print(f"[Scanner] ERROR: Permission denied: {e}")
-                    continue
+                    result = future.result()
+                except ScanCancelled:
+                    raise
                 except Exception as e:
-                    print(f"[Scanner] ERROR: Cannot list directory: {e}")
+                    print(f"[Scanner] ERROR scanning {folder_path}: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    result = None
+                self.progress.increment(current_item=folder_path)
+                if result is None:
+                    self.progress.set_root(folder_path, status='error')
                     continue
-                
-                # Scan the folder
-                found = self._scan_folder(folder_path)
-                print(f"[Scanner] Found {len(found)} media items in this folder")
+                root_items[idx], subdirs = result
+                self.progress.add_total(len(subdirs))
+                self.progress.set_root(folder_path, subtrees=len(subdirs), done=0, items=len(root_items[idx]))
+                subtree_futures[idx] = [pool.submit(self._scan_subtree, folder_path, d) for d in subdirs]
+
+            media_items = []
+            for idx, folder_path in enumerate(folders):
+                if idx not in root_items:
+                    continue
+                found = list(root_items[idx])
+                for future in subtree_futures[idx]:
+                    found.extend(future.result())
+                print(f"[Scanner] Found {len(found)} media items in {folder_path}")
+                self.progress.set_root(folder_path, status='done', items=len(found))
                 media_items.extend(found)
-                
-            except Exception as e:
-                print(f"[Scanner] ERROR scanning {folder_path}: {e}")
-                import traceback
-                traceback.print_exc()
+                self._scanned_roots.append(folder_path)
+        except ScanCancelled:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.progress.finish('Zrušeno')
+            raise
+        finally:
+            pool.shutdown(wait=True)
         
-        print(f"\n[Scanner] Total media items found: {len(media_items)}")
+        print(f"\n[Scanner] Total media items found: {len(media_items)} "
+              f"({self._listed_dirs} directories listed, {self._reused_dirs} unchanged)")
         self.progress.finish(f'Nalezeno {len(media_items)} položek')
         return media_items
 
+    def _scan_subtree(self, root: str, folder: str) -> List[Dict]:
+        """Walk one top-level subdirectory of a root (runs on the scan pool)."""
+        items = self._scan_folder(folder)
+        self.progress.increment(current_item=folder)
+        self.progress.root_subtree_done(root, len(items))
+        return items
+
     def _scan_folder(self, folder: str) -> List[Dict]:
         """Recursively scan a folder for media files."""
         items = []
         
         try:
             # Walk through directory tree
-            for root, dirs, files in os.walk(folder):
-                # Check if this looks like a TV show folder (has Season-like folders)
-                season_dirs = [d for d in dirs if self.SEASON_DIR_PATTERN.search(d) or re.search(r"^s\d{1,3}$", d, re.IGNORECASE)]
-                
-                if season_dirs:
-                    # This is a TV show folder
-                    print(f"[Scanner] Found TV show folder: {root}")
-                    tv_show = self._parse_tv_show(root, dirs)
-                    if tv_show:
-                        items.append(tv_show)
-                    # Don't recurse into season folders
-                    dirs[:] = []
-                else:
-                    # Detect if directory contains TV episodes by filename
-                    episode_files = []
-                    for filename in files:
-                        season_ep = self._extract_episode_info(filename)
-                        if season_ep is not None:
-                            season_num, ep_num = season_ep
-                            _, ext = os.path.splitext(filename)
-                            if ext.lower() in self.VIDEO_EXTENSIONS:
-                                episode_files.append((season_num, ep_num, filename))
-
-                    if len(episode_files) >= 2:
-                        # Heuristic: if 2+ episode files, treat as TV show folder
-                        print(f"[Scanner] Detected TV show by episode filenames: {root}")
-                        show = self._build_tv_show_from_files(root, episode_files)
-                        if show:
-                            items.append(show)
-                        # Do not descend further from here for this root
-                        dirs[:] = []
-                    else:
-                        # Look for movie files in this directory
-                        for filename in files:
-                            _, ext = os.path.splitext(filename)
-                            if ext.lower() in self.VIDEO_EXTENSIONS:
-                                file_path = os.path.join(root, filename)
-                                movie = self._parse_movie(file_path)
-                                if movie:
-                                    items.append(movie)
-                                    print(f"[Scanner] Found movie: {movie['title']}")
+            for root, dirs, files in self._walk(folder):
+                items.extend(self._scan_directory(root, dirs, files))
         
+        except ScanCancelled:
+            raise
         except Exception as e:
             print(f"[Scanner] Error walking directory {folder}: {e}")
         
         return items
 
-    def _extract_episode_info(self, filename: str) -> Optional[tuple]:
-        """Try to extract (season, episode) from a filename using common patterns."""
+    def _scan_directory(self, root: str, dirs: List[str], files: List[str]) -> List[Dict]:
+        """
+        Classify one directory of the walk and return the items found directly in it.
+
+        Clears `dirs` in place when the directory is a TV show, so the walk
+        does not descend into its seasons.
+        """
+        items = []
+        # Check if this looks like a TV show folder (has Season-like folders)
+        season_dirs = [d for d in dirs if parse_season_dir(d) is not None]
+        
+        if season_dirs:
+            # This is a TV show folder
+            print(f"[Scanner] Found TV show folder: {root}")
+            tv_show = self._parse_tv_show(root, dirs)
+            if tv_show:
+                items.append(tv_show)
+            # Don't recurse into season folders
+            dirs[:] = []
+        else:
+            # Detect if directory contains TV episodes by filename (each name is parsed once
+            # and reused for movie detection below)
+            parsed_names = {}
+            episode_files = []
+            for filename in files:
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() not in self.VIDEO_EXTENSIONS:
+                    continue
+                parsed = parsed_names[filename] = parse_name(stem, has_extension=True)
+                if parsed['episodes'] or parsed['absolute']:
+                    episode_files.append((filename, parsed))
+
+            if len(episode_files) < 2:
+                # "Show 1.01", "Show 1.02": the N.M notation only counts as episodes
+                # when several files of one title use it
+                reparsed = {}
+                for filename, parsed in parsed_names.items():
+                    if parsed['ambiguous_episode']:
+                        episode = parse_name(os.path.splitext(filename)[0], has_extension=True, episodic=True)
+                        if episode['episodes']:
+                            reparsed[filename] = episode
+                if len(reparsed) >= 2 and len({p['title'].casefold() for p in reparsed.values()}) == 1:
+                    parsed_names.update(reparsed)
+                    episode_files.extend(reparsed.items())
+
+            if len(episode_files) >= 2:
+                # Heuristic: if 2+ episode files, treat as TV show folder
+                print(f"[Scanner] Detected TV show by episode filenames: {root}")
+                show = self._build_tv_show_from_files(root, episode_files)
+                if show:
+                    items.append(show)
+                # Do not descend further from here for this root
+                dirs[:] = []
+            else:
+                # Look for movie files in this directory
+                for filename, parsed in parsed_names.items():
+                    file_path = os.path.join(root, filename)
+                    movie = self._parse_movie(file_path, parsed)
+                    if movie:
+                        items.append(movie)
+                        print(f"[Scanner] Found movie: {movie['title']}")
+        return items
+
+    def _scan_root_level(self, folder: str) -> Optional[Tuple[List[Dict], List[str]]]:
+        """
+        Check a root folder and scan its top level.
+
+        Returns:
+            (items found directly in the root, subdirectories to walk) or
+            None if the root is not accessible
+        """
+        self._check_cancelled()
+        self.progress.set_root(folder, status='scanning')
+        # The listing doubles as the existence/accessibility check (one round-trip on network shares)
+        listing = self._listdir(folder, report=True)
+        if listing is None:
+            print(f"[Scanner] ERROR: Folder is not accessible: {folder}")
+            return None
+        print(f"[Scanner] Folder accessible, contains {len(listing['dirs'])} folders "
+              f"and {len(listing['files'])} video files")
+        dirs = list(listing['dirs'])
+        items = self._scan_directory(folder, dirs, list(listing['files']))
+        depth = self._depth(folder)
+        if self.max_depth and depth >= self.max_depth:
+            return items, []
+        links = set(listing.get('links', ()))
+        return items, [os.path.join(folder, d) for d in dirs if d not in links]
+
+    def _depth(self, path: str) -> int:
+        """Depth of a path below the configured root containing it (0 = the root itself)."""
+        path = os.path.normpath(path)
+        for root in self.folders:
+            root = os.path.normpath(root)
+            if path == root:
+                return 0
+            if path.startswith(root.rstrip(os.sep) + os.sep):
+                return len(os.path.relpath(path, root).split(os.sep))
+        return 0
+
+    def _walk(self, top: str):
+        """
+        Top-down directory walk like os.walk, backed by _listdir().
+
+        Yields (dirpath, dirnames, video filenames); clearing dirnames prunes
+        the walk. Unreadable directories are skipped, and with max_depth set
+        directories deeper than max_depth below their root are not entered.
+        """
+        stack = [(top, self._depth(top))]
+        while stack:
+            self._check_cancelled()
+            path, depth = stack.pop()
+            listing = self._listdir(path)
+            if listing is None:
+                continue
+            dirs = list(listing['dirs'])
+            yield path, dirs, list(listing['files'])
+            if self.max_depth and depth >= self.max_depth:
+                continue
+            links = set(listing.get('links', ()))
+            # Reversed so directories are visited in listing order (symlinked ones are not followed)
+            stack.extend((os.path.join(path, d), depth + 1) for d in reversed(dirs) if d not in links)
+
+    def _check_cancelled(self):
+        """Raise ScanCancelled if the running scan was cancelled."""
+        if self._cancel is not None and self._cancel.is_set():
+            raise ScanCancelled()
+
+    def _listdir(self, path: str, report: bool = False) -> Optional[Dict]:
+        """
+        Listing of one directory: subdirectories and video files with (size, mtime).
+
+        Reuses the manifest listing when the directory mtime is unchanged,
+        otherwise reads the directory with os.scandir. A reused listing still
+        stats its video files, since overwriting a file in place does not
+        change the directory mtime. Returns None if the directory cannot be
+        read (`report` also logs a missing directory).
+        """
+        listing = self._listings.get(path)
+        if listing is not None:
+            return listing
+        # mtime seen by the parent's scandir, if it was free to get
+        mtime = self._dir_mtimes.pop(path, None)
+        if mtime is None:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError as e:
+                self._listing_failed(path, e, report)
+                return None
+        cached = None if self._relist_all else self.manifest.dirs.get(path)
+        if cached is not None and cached.get('mtime') == mtime:
+            with self._stats_lock:
+                self._reused_dirs += 1
+            listing = self._restat_files(path, cached)
+            self._listings[path] = listing
+            return listing
+
+        dirs, links, files = [], [], {}
         try:
-            name = os.path.splitext(filename)[0]
-            for pattern in self.EPISODE_PATTERNS:
-                m = pattern.search(name)
-                if m:
-                    s, e = m.groups()
-                    return int(s), int(e)
-        except Exception:
-            pass
-        return None
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            dirs.append(entry.name)
+                            if entry.is_symlink():
+                                links.append(entry.name)
+                            elif self.DIRENTRY_STAT_CACHED:
+                                self._dir_mtimes[entry.path] = entry.stat().st_mtime
+                        elif os.path.splitext(entry.name)[1].lower() in self.VIDEO_EXTENSIONS:
+                            st = entry.stat()
+                            files[entry.name] = [st.st_size, st.st_mtime]
+                    except OSError:
+                        continue
+        except OSError as e:
+            self._listing_failed(path, e, True)
+            return None
+
+        with self._stats_lock:
+            self._listed_dirs += 1
+        # A directory changed within the mtime granularity could change again
+        # without a visible mtime change; don't trust this listing next time
+        racy = time.time() - mtime < self.RACY_MTIME_WINDOW
+        listing = {'mtime': None if racy else mtime, 'dirs': dirs, 'files': files}
+        if links:
+            listing['links'] = links
+        self._listings[path] = listing
+        return listing
+
+    @staticmethod
+    def _restat_files(path: str, cached: Dict) -> Dict:
+        """Manifest listing with the current (size, mtime) of its video files; a copy if any changed."""
+        files = cached.get('files', {})
+        current = {}
+        for name in files:
+            try:
+                st = os.stat(os.path.join(path, name))
+            except OSError:
+                continue
+            current[name] = [st.st_size, st.st_mtime]
+        if current == files:
+            return cached
+        return {**cached, 'files': current}
+
+    def _listing_failed(self, path: str, error: OSError, report: bool):
+        if isinstance(error, FileNotFoundError):
+            if report:
+                print(f"[Scanner] Directory does not exist: {path}")
+            return
+        print(f"[Scanner] Cannot list directory {path}: {error}")
+        if not isinstance(error, NotADirectoryError):
+            # Unreadable, not gone: keep the items below it (see scan_changes)
+            with self._stats_lock:
+                self._failed_dirs.append(path)
+
+    def _item_files(self, item: Dict) -> List[str]:
+        """Video file paths belonging to a scanned item."""
+        if item.get('type') == 'tv_show':
+            # A multi-episode file backs several episode records
+            return list(dict.fromkeys(ep.get('path') for season in item.get('seasons', []) or []
+                                      for ep in season.get('episodes', []) or [] if ep.get('path')))
+        return [item['path']] if item.get('path') else []
+
+    def _item_signature(self, item: Dict) -> str:
+        """Hash of an item's file paths with their (size, mtime) from this scan's listings."""
+        parts = []
+        for file_path in sorted(self._item_files(item)):
+            folder, name = os.path.split(file_path)
+            stat = (self._listings.get(folder) or {}).get('files', {}).get(name)
+            parts.append(f"{file_path}|{stat}")
+        return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def scan_changes(self, database=None, full: bool = False, folders: List[str] = None) -> Dict:
+        """
+        Scan folders and classify the result against the previous scan.
+
+        Args:
+            database: MediaDatabase used to detect new and removed items
+            full: List every directory again instead of trusting unchanged mtimes
+            folders: Subtrees to scan instead of the configured folders
+
+        Returns:
+            {'items': all found items, 'added': [...], 'changed': [...],
+             'unchanged': count, 'removed': [paths of database items no longer found]}
+
+        Items under roots or directories that could not be read are neither
+        listed nor reported as removed. Call commit_manifest() once the delta has been
+        stored so the next scan starts from this state.
+        """
+        items = self.scan(relist=full, folders=folders)
+        added, changed, signatures = [], [], {}
+        for item in items:
+            key = os.path.normpath(item['path'])
+            signature = signatures[key] = self._item_signature(item)
+            existing = database.find_by_path(item['path']) if database else None
+            previous = self.manifest.items.get(key)
+            is_new = existing is None if database else previous is None
+            if is_new:
+                added.append(item)
+            elif previous is not None:
+                if previous != signature:
+                    changed.append(item)
+            elif sorted(map(os.path.normpath, self._item_files(existing))) != sorted(map(os.path.normpath, self._item_files(item))):
+                # No manifest entry yet (first incremental scan): compare file sets with the database
+                changed.append(item)
+
+        removed = []
+        if database:
+            roots = [os.path.normpath(r) for r in self._scanned_roots]
+            failed = [os.path.normpath(d) for d in self._failed_dirs]
+            for item in database.get_all_items():
+                key = os.path.normpath(item.get('path') or '')
+                if key not in signatures and ScanManifest._under(key, roots) and not ScanManifest._under(key, failed):
+                    removed.append(item.get('path'))
+
+        self._pending_signatures = signatures
+        unchanged = len(items) - len(added) - len(changed)
+        print(f"[Scanner] Changes: {len(added)} added, {len(changed)} changed, "
+              f"{unchanged} unchanged, {len(removed)} removed")
+        return {'items': items, 'added': added, 'changed': changed, 'unchanged': unchanged, 'removed': removed}
+
+    def commit_manifest(self):
+        """Persist listings and item signatures of the last scan_changes() call."""
+        if self._pending_signatures is None:
+            return
+        self.manifest.update(self._listings, self._pending_signatures, self._scanned_roots)
+        self.manifest.save()
+        self._pending_signatures = None
+
+    def update_library(self, database, tmdb_client=None, policy: str = None, relist: bool = False,
+                       folders: List[str] = None, cancel: threading.Event = None) -> Dict:
+        """
+        Scan, enrich and store the changes in the database.
+
+        Scans the configured folders (or only `folders`), enriches items
+        selected by the scan policy, removes items that disappeared, stores
+        new and changed items and commits the scan manifest. Runs are
+        serialized by scan_lock.
+
+        Args:
+            database: MediaDatabase to update
+            tmdb_client: TMDBClient for enrichment (skipped without an API key)
+            policy: Scan policy (see select_for_enrichment)
+            relist: List every directory again (always done for policy full)
+            folders: Subtrees to rescan (e.g. from the filesystem watcher)
+            cancel: Event that stops the run between directories and TMDB tasks;
+                    the manifest is then not committed so the next scan redoes the work
+
+        Returns:
+            Summary dict with counts ('total_found', 'new_items', 'changed_items',
+            'unchanged_items', 'removed_items', 'enriched_with_metadata')
+
+        Raises:
+            ValueError for an invalid policy, ScanCancelled if cancelled
+        """
+        policy_name, _ = self.parse_policy(policy)
+        full = policy_name == 'full'
+        with self.scan_lock:
+            self._cancel = cancel
+            try:
+                changes = self.scan_changes(database, full=full or relist, folders=folders)
+                items = changes['items']
+                delta = changes['added'] + changes['changed']
+                existing_paths = {item['path'] for item in database.get_all_items()}
+
+                # Pick items needing TMDB work from the database index, then enrich
+                # them (saved to the database as it goes)
+                selected, refresh = self.select_for_enrichment(items, database, policy)
+                if selected and tmdb_client and tmdb_client.api_key:
+                    self.enrich(selected, tmdb_client, database, refresh)
+
+                # Remove items whose files are gone
+                removed_count = 0
+                for path in changes['removed']:
+                    if database.remove(path):
+                        removed_count += 1
+                if full and folders is None:
+                    removed_count += database.remove_missing_files()
+                if removed_count:
+                    database.save()
+
+                # Store new and changed items (already merged with their stored version)
+                for item in delta:
+                    database.add_or_update(item)
+
+                self.commit_manifest()
+            finally:
+                # Final save (write through the batching saver), also after a cancel
+                self._cancel = None
+                self._pending_signatures = None
+                database.flush()
+
+        return {
+            'total_found': len(items),
+            'new_items': sum(1 for item in items if item['path'] not in existing_paths),
+            'changed_items': len(changes['changed']),
+            'unchanged_items': changes['unchanged'],
+            'removed_items': removed_count,
+            'enriched_with_metadata': sum(1 for item in selected if item.get('metadata')),
+        }
+
+    def update_items(self, database, tmdb_client=None, policy: str = None, files: List[str] = (),
+                     folders: List[str] = (), removed: List[str] = (), renamed: Dict[str, str] = None) -> Dict:
+        """
+        Apply changes of single files and folders without walking subtrees.
+
+        Used by the filesystem watcher, so one finished download in a large
+        flat folder costs one parse (and TMDB lookup) instead of a rescan of
+        the folder. The scan manifest is not touched; the next incremental
+        scan reconciles it. Runs are serialized with update_library().
+
+        Args:
+            database: MediaDatabase to update
+            tmdb_client: TMDBClient for enrichment (skipped without an API key)
+            policy: Scan policy (see select_for_enrichment)
+            files: Video files to parse as movies; files that no longer exist are removed
+            folders: Folders whose own video files are classified again (movies, or a
+                     show by episode filenames); subfolders are not read
+            removed: Deleted files or folders; items at or below them are removed
+            renamed: New path -> old path of moved files, whose stored data is carried over
+
+        Returns:
+            Summary dict like update_library()
+
+        Raises:
+            ValueError for an invalid policy
+        """
+        self.parse_policy(policy)
+        renamed = renamed or {}
+        with self.scan_lock:
+            try:
+                items, gone = [], [os.path.normpath(p) for p in removed]
+                for file_path in files:
+                    if os.path.isfile(file_path):
+                        movie = self._parse_movie(file_path)
+                        if movie:
+                            items.append(movie)
+                    else:
+                        gone.append(os.path.normpath(file_path))
+                for folder in folders:
+                    folder_items = self._classify_folder_files(folder)
+                    if folder_items is None:
+                        continue
+                    items.extend(folder_items)
+                    # Items of this folder level that are no longer found there
+                    found = {os.path.normpath(item['path']) for item in folder_items}
+                    folder = os.path.normpath(folder)
+                    for item in database.get_all_items():
+                        key = os.path.normpath(item.get('path') or '')
+                        own = key == folder if item.get('type') == 'tv_show' else os.path.dirname(key) == folder
+                        if own and key not in found:
+                            gone.append(key)
+
+                existing_paths = {item['path'] for item in database.get_all_items()}
+                for item in items:
+                    old_path = renamed.get(os.path.normpath(item['path']))
+                    previous = database.find_by_path(old_path) if old_path else None
+                    if previous is not None and database.find_by_path(item['path']) is None:
+                        # A renamed file keeps its match instead of being searched again
+                        self.merge_existing(item, previous)
+
+                selected, refresh = self.select_for_enrichment(items, database, policy)
+                if selected and tmdb_client and tmdb_client.api_key:
+                    self.enrich(selected, tmdb_client, database, refresh)
+
+                removed_count = 0
+                if gone:
+                    for item in database.get_all_items():
+                        path = item.get('path') or ''
+                        if ScanManifest._under(os.path.normpath(path), gone) and database.remove(path):
+                            removed_count += 1
+
+                for item in items:
+                    database.add_or_update(item)
+            finally:
+                database.flush()
+
+        print(f"[Scanner] Updated {len(items)} items, removed {removed_count}")
+        return {
+            'total_found': len(items),
+            'new_items': sum(1 for item in items if item['path'] not in existing_paths),
+            'changed_items': sum(1 for item in items if item['path'] in existing_paths),
+            'unchanged_items': 0,
+            'removed_items': removed_count,
+            'enriched_with_metadata': sum(1 for item in selected if item.get('metadata')),
+        }
+
+    def _classify_folder_files(self, folder: str) -> Optional[List[Dict]]:
+        """Items made of the video files directly in a folder (None if it cannot be read)."""
+        try:
+            with os.scandir(folder) as entries:
+                files = [entry.name for entry in entries if entry.is_file()]
+        except OSError as e:
+            print(f"[Scanner] Cannot list directory {folder}: {e}")
+            return None
+        # No subfolders: season folders are the watcher's business (it rescans the show)
+        return self._scan_directory(folder, [], files)
+
+    @staticmethod
+    def merge_existing(item: Dict, existing: Dict) -> Dict:
+        """
+        Carry data of the stored version of an item over to a rescanned one.
+
+        Fields the scan does not produce (metadata, metadata_updated,
+        metadata_source, ...) are copied to the item, and per-episode fields
+        to episodes matched by season and episode number. Absolute-numbered
+        episodes are matched by their absolute number and keep their mapped
+        season and episode. A manually assigned item also keeps its stored type.
+        """
+        for field, value in existing.items():
+            if field != 'seasons' and field not in item:
+                item[field] = value
+        if existing.get('metadata_source') == 'manual' and existing.get('type'):
+            item['type'] = existing['type']
+        if item.get('type') != 'tv_show':
+            return item
+        old_episodes = {}
+        old_absolute = {}
+        for season in existing.get('seasons', []) or []:
+            for ep in season.get('episodes', []) or []:
+                old_episodes[(ep.get('season'), ep.get('episode'))] = ep
+                if ep.get('absolute') is not None:
+                    old_absolute[ep['absolute']] = ep
+        remapped = False
+        for season in item.get('seasons', []) or []:
+            for ep in season.get('episodes', []) or []:
+                if ep.get('absolute') is not None:
+                    old = old_absolute.get(ep['absolute'])
+                    if old and (old.get('season'), old.get('episode')) != (ep.get('season'), ep.get('episode')):
+                        ep['season'], ep['episode'] = old.get('season'), old.get('episode')
+                        remapped = True
+                else:
+                    old = old_episodes.get((ep.get('season'), ep.get('episode')))
+                if not old:
+                    continue
+                for field, value in old.items():
+                    if field not in ep:
+                        ep[field] = value
+        if remapped:
+            MediaScanner._regroup_absolute(item)
+        return item
+
+    @staticmethod
+    def _regroup_absolute(item: Dict):
+        """Move absolute-numbered episodes into the season matching their (mapped) season number."""
+        seasons = []
+        moved = []
+        for season in item.get('seasons', []) or []:
+            episodes = season.get('episodes', []) or []
+            moved.extend(ep for ep in episodes if ep.get('absolute') is not None)
+            season['episodes'] = [ep for ep in episodes if ep.get('absolute') is None]
+            seasons.append(season)
+        for ep in moved:
+            target = next((s for s in seasons if s.get('season') == ep.get('season')), None)
+            if target is None:
+                target = {'season': ep.get('season'), 'episodes': []}
+                seasons.append(target)
+            target['episodes'].append(ep)
+        seasons = [s for s in seasons if s['episodes']]
+        for season in seasons:
+            season['episodes'].sort(key=lambda ep: ep.get('episode') or 0)
+        item['seasons'] = sorted(seasons, key=lambda s: s.get('season') or 0)
+
+    @classmethod
+    def parse_policy(cls, policy: Optional[str]) -> Tuple[str, Optional[float]]:
+        """
+        Parse a scan policy string into (name, max age in days).
+
+        Accepts 'new_only', 'missing_metadata', 'full' and
+        'refresh_older_than=<days>'. Raises ValueError for anything else.
+        """
+        name, _, arg = (policy or cls.DEFAULT_SCAN_POLICY).strip().partition('=')
+        if name not in cls.SCAN_POLICIES:
+            raise ValueError(f"Unknown scan policy '{policy}'")
+        if name == 'refresh_older_than':
+            try:
+                days = float(arg)
+            except ValueError:
+                raise ValueError('refresh_older_than requires a number of days, e.g. refresh_older_than=30')
+            if days < 0:
+                raise ValueError('refresh_older_than requires a non-negative number of days')
+            return name, days
+        if arg:
+            raise ValueError(f"Scan policy '{name}' takes no argument")
+        return name, None
+
+    @staticmethod
+    def _missing_episode_metadata(item: Dict) -> bool:
+        """True if a TV show has an episode without TMDB metadata."""
+        return any(not ep.get('metadata') for season in item.get('seasons', []) or []
+                   for ep in season.get('episodes', []) or [])
+
+    def select_for_enrichment(self, items: List[Dict], database=None,
+                              policy: str = None) -> Tuple[List[Dict], Set[str]]:
+        """
+        Merge stored data into scanned items and pick the ones that need TMDB requests.
+
+        Runs before any network work, using only the database index:
+          new_only                 - items not in the database yet
+          missing_metadata         - items without metadata and shows with
+                                     episodes lacking metadata (default)
+          refresh_older_than=<d>   - as missing_metadata, plus items whose
+                                     metadata is older than d days
+          full                     - every item
+
+        Matched items are refreshed by their stored TMDB id, never searched
+        again, so manual assignments survive any policy.
+
+        Returns:
+            (items to enrich, normalized paths of items to refresh by id)
+        """
+        name, max_age_days = self.parse_policy(policy)
+        cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+        selected, refresh = [], set()
+        for item in items:
+            existing = database.find_by_path(item['path']) if database else None
+            if existing is not None:
+                self.merge_existing(item, existing)
+            if not (item.get('metadata') or {}).get('id'):
+                if existing is None or name != 'new_only':
+                    selected.append(item)
+                continue
+            if name == 'full' or (cutoff is not None and item.get('metadata_updated', 0) < cutoff):
+                selected.append(item)
+                refresh.add(os.path.normpath(item['path']))
+            elif name != 'new_only' and item.get('type') == 'tv_show' and self._missing_episode_metadata(item):
+                selected.append(item)
+        print(f"[Scanner] Policy {name}: {len(selected)} of {len(items)} items need TMDB data "
+              f"({len(refresh)} refresh)")
+        return selected, refresh
+
+    @staticmethod
+    def _episode_entries(folder_path: str, filename: str, parsed: Dict,
+                         season_num: Optional[int] = None) -> List[Dict]:
+        """
+        Episode records for one video file (several for multi-episode files).
+
+        Absolute-numbered files ("Show - 105") in a season folder are taken
+        as episode numbers of that season. Elsewhere they are filed as season 1
+        with their number kept in 'absolute', and mapped to the real season
+        and episode once the show's TMDB seasons are known (see
+        _map_absolute_episodes).
+        """
+        path = os.path.join(folder_path, filename)
+        if parsed['episodes']:
+            # If season not in filename, fallback to folder season
+            season = parsed['season'] if parsed['season'] is not None else season_num
+            numbers = [(season, e, None) for e in parsed['episodes']]
+        elif season_num is not None:
+            numbers = [(season_num, e, None) for e in parsed['absolute']]
+        else:
+            numbers = [(1, e, e) for e in parsed['absolute']]
+        entries = []
+        for season, episode, absolute in numbers:
+            entry = {'season': season, 'episode': episode, 'path': path, 'filename': filename}
+            if absolute is not None:
+                entry['absolute'] = absolute
+            entries.append(entry)
+        return entries
 
     def _build_tv_show_from_files(self, folder_path: str, episode_files: List[tuple]) -> Optional[Dict]:
-        """Build a tv_show item from a flat folder containing episode files."""
+        """Build a tv_show item from a flat folder of (filename, parse_name() result) episode files."""
         try:
-            folder_name = os.path.basename(folder_path)
-            show_name = re.sub(r'\s*\(?\d{4}\)?$', '', folder_name).strip()
+            show_name = parse_name(os.path.basename(folder_path))['title']
 
             seasons_map: Dict[int, List[Dict]] = {}
-            for season_num, ep_num, filename in episode_files:
-                ep_list = seasons_map.setdefault(season_num, [])
-                ep_list.append({
-                    'season': season_num,
-                    'episode': ep_num,
-                    'path': os.path.join(folder_path, filename),
-                    'filename': filename
-                })
+            for filename, parsed in episode_files:
+                for entry in self._episode_entries(folder_path, filename, parsed):
+                    seasons_map.setdefault(entry['season'], []).append(entry)
 
             seasons = []
             for s in sorted(seasons_map.keys()):
@@ -189,33 +853,18 @@ class MediaScanner:
             print(f"[Scanner] Error building TV show from files in {folder_path}: {e}")
         return None
 
-    def _parse_movie(self, file_path: str) -> Optional[Dict]:
-        """Parse movie information from file path."""
+    def _parse_movie(self, file_path: str, parsed: Dict = None) -> Optional[Dict]:
+        """Parse movie information from file path (`parsed`: parse_name() result if already known)."""
         try:
             filename = os.path.basename(file_path)
-            name_without_ext = os.path.splitext(filename)[0]
-            
-            # Try to extract title and year
-            # Pattern: "Movie Name (2020)" or "Movie Name 2020"
-            year_match = re.search(r'\((\d{4})\)|\s(\d{4})(?:\s|$)', name_without_ext)
-            
-            if year_match:
-                year = year_match.group(1) or year_match.group(2)
-                # Remove year from title
-                title = re.sub(r'\s*\(?\d{4}\)?', '', name_without_ext).strip()
-            else:
-                title = name_without_ext
-                year = None
-            
-            # Clean up title (remove common artifacts)
-            title = re.sub(r'\[.*?\]', '', title)  # Remove [tags]
-            title = re.sub(r'\(.*?\)', '', title)  # Remove (tags)
-            title = re.sub(r'\s+', ' ', title).strip()  # Normalize whitespace
+            # Title, year and release tags in one pass: "Movie Name (2020)", "Movie.Name.2020.1080p.BluRay"
+            if parsed is None:
+                parsed = parse_name(os.path.splitext(filename)[0], has_extension=True)
             
             return {
                 'type': 'movie',
-                'title': title,
-                'year': year,
+                'title': parsed['title'],
+                'year': parsed['year'],
                 'path': file_path,
                 'filename': filename
             }
@@ -226,40 +875,28 @@ class MediaScanner:
     def _parse_tv_show(self, folder_path: str, subdirs: List[str]) -> Optional[Dict]:
         """Parse TV show information from folder structure."""
         try:
-            folder_name = os.path.basename(folder_path)
-            
-            # Extract show name (remove year if present)
-            show_name = re.sub(r'\s*\(?\d{4}\)?$', '', folder_name).strip()
+            # Extract show name (without year and release tags)
+            show_name = parse_name(os.path.basename(folder_path))['title']
             
             seasons = []
             
             # Find season folders (support multiple naming variants)
             for subdir in subdirs:
-                season_match = self.SEASON_DIR_PATTERN.search(subdir) or re.search(r'^s(\d{1,3})$', subdir, re.IGNORECASE)
-                if season_match:
-                    season_num = int(season_match.group(1))
+                season_num = parse_season_dir(subdir)
+                if season_num is not None:
                     season_path = os.path.join(folder_path, subdir)
                     
                     episodes = []
                     try:
-                        for filename in os.listdir(season_path):
-                            _, ext = os.path.splitext(filename)
+                        listing = self._listdir(season_path)
+                        if listing is None:
+                            raise OSError('directory not readable')
+                        for filename in listing['files']:
+                            stem, ext = os.path.splitext(filename)
                             if ext.lower() in self.VIDEO_EXTENSIONS:
-                                file_path = os.path.join(season_path, filename)
-                                
                                 # Try to extract episode info from filename
-                                ep_info = self._extract_episode_info(filename)
-                                if ep_info:
-                                    s, e = ep_info
-                                    # If season not in filename, fallback to folder season
-                                    if s is None:
-                                        s = season_num
-                                    episodes.append({
-                                        'season': s,
-                                        'episode': e,
-                                        'path': file_path,
-                                        'filename': filename
-                                    })
+                                parsed = parse_name(stem, has_extension=True, episodic=True)
+                                episodes.extend(self._episode_entries(season_path, filename, parsed, season_num))
                     except Exception as e:
                         print(f"[Scanner] Error reading season folder {season_path}: {e}")
                     
@@ -282,12 +919,34 @@ class MediaScanner:
         
         return None
 
-    def scan_with_metadata(self, tmdb_client, database=None) -> List[Dict]:
-        """Scan folders and enrich with TMDB metadata, downloading images immediately."""
+    def scan_with_metadata(self, tmdb_client, database=None, policy: str = None) -> List[Dict]:
+        """Scan folders and enrich with TMDB metadata (per scan policy), downloading images immediately."""
         print("[Scanner] Starting scan with TMDB metadata enrichment...")
         items = self.scan()
-        
-        print(f"[Scanner] Enriching {len(items)} items with TMDB data...")
+        selected, refresh = self.select_for_enrichment(items, database, policy)
+        self.enrich(selected, tmdb_client, database, refresh)
+        return items
+
+    def enrich(self, items: List[Dict], tmdb_client, database=None, refresh: Set[str] = None) -> List[Dict]:
+        """
+        Enrich scanned items with TMDB metadata using a bounded worker pool.
+
+        Items (search) run concurrently; once a TV show is matched one task
+        per season fetches the whole season from TMDB. Posters, backdrops and
+        episode stills are queued on the database's image fetcher and their
+        expected filenames recorded without waiting for the downloads. Shows with absolute-numbered
+        episodes first get a mapping task that files them under their real
+        seasons. Database writes are serialized through database.lock.
+
+        Items without metadata are searched. Items that already carry
+        metadata are only re-fetched by id if their path is in `refresh`;
+        otherwise just seasons with episodes lacking metadata are fetched.
+
+        Returns:
+            The same items list, enriched in place
+        """
+        refresh = refresh or set()
+        print(f"[Scanner] Enriching {len(items)} items with TMDB data ({self.enrich_workers} workers)...")
         # Calculate total work units: each item + each episode
         episode_count = 0
         for it in items:
@@ -296,82 +955,217 @@ class MediaScanner:
                     episode_count += len(season.get('episodes', []) or [])
         total_units = len(items) + episode_count
         self.progress.start('tmdb', total_units, 'Získávání metadat z TMDB...')
-        
-        enriched_items = []
-        for idx, item in enumerate(items):
-            # Announce current item
-            self.progress.update(current_item=item.get('title', 'Neznámý'))
-            try:
+
+        with ThreadPoolExecutor(max_workers=self.enrich_workers, thread_name_prefix='tmdb') as pool:
+            def queue_seasons(item, show_id):
+                refreshing = os.path.normpath(item['path']) in refresh
+                for season in item.get('seasons', []) or []:
+                    if show_id and database and (refreshing or any(
+                            not ep.get('metadata') for ep in season.get('episodes', []) or [])):
+                        pending[pool.submit(self._enrich_season, item, season, show_id, tmdb_client, database)] = ('season', item)
+                    else:
+                        # Unmatched show or complete season: its episodes count as done
+                        for _ in season.get('episodes', []) or []:
+                            self.progress.increment()
+
+            # future -> (kind, context); new work is queued as earlier stages finish
+            pending = {
+                pool.submit(self._enrich_item, item, tmdb_client, database,
+                            os.path.normpath(item['path']) in refresh): ('item', item)
+                for item in items
+            }
+            while pending:
+                if self._cancel is not None and self._cancel.is_set():
+                    # Drop queued tasks, let running ones finish, then stop
+                    for future in pending:
+                        future.cancel()
+                    wait(pending)
+                    self.progress.finish('Zrušeno')
+                    raise ScanCancelled()
+                done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, ctx = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"[Scanner] Error in TMDB {kind} task: {e}")
+                        result = None
+                    if kind == 'item':
+                        item = ctx
+                        if item.get('type') != 'tv_show':
+                            continue
+                        show_id = (item.get('metadata') or {}).get('id') if result else None
+                        refreshing = os.path.normpath(item['path']) in refresh
+                        if show_id and database and any(
+                                ep.get('absolute') is not None and (refreshing or not ep.get('metadata'))
+                                for season in item.get('seasons', []) or []
+                                for ep in season.get('episodes', []) or []):
+                            pending[pool.submit(self._map_absolute_episodes, item, show_id, tmdb_client, database)] = ('absolute', item)
+                        else:
+                            queue_seasons(item, show_id)
+                    elif kind == 'absolute':
+                        queue_seasons(ctx, (ctx.get('metadata') or {}).get('id'))
+
+        self.progress.finish(f'Obohaceno {len(items)} položek')
+        return items
+
+    def _enrich_item(self, item: Dict, tmdb_client, database=None, refresh: bool = False) -> bool:
+        """
+        Search TMDB for one movie/show (or re-fetch it by its stored id when
+        refresh is set), download its images and save it. Returns True if matched.
+        """
+        # Announce current item
+        self.progress.update(current_item=item.get('title', 'Neznámý'))
+        metadata = None
+        try:
+            tmdb_id = (item.get('metadata') or {}).get('id')
+            if tmdb_id and not refresh:
+                # Already matched; only missing episodes are fetched (see enrich)
+                return True
+            if tmdb_id:
                 if item['type'] == 'movie':
-                    year = int(item['year']) if item.get('year') else None
-                    metadata = tmdb_client.search_movie(item['title'], year)
-                    if metadata:
-                        item['metadata'] = metadata
-                        print(f"[Scanner] Found TMDB data for movie: {item['title']}")
-                        
-                        # Download images immediately if database provided
-                        if database:
-                            self.progress.update(message=f'Stahuji data pro: {item["title"]}')
-                            database.enrich_with_images(item)
-                            # Save to database immediately
-                            database.add_or_update(item)
-                            database.save()
-                    # Count this movie as one unit of work (metadata + images)
-                    self.progress.increment(current_item=item.get('title', 'Neznámý'))
-                            
+                    metadata = tmdb_client.get_movie_details(tmdb_id)
                 elif item['type'] == 'tv_show':
-                    metadata = tmdb_client.search_tv_show(item['title'])
-                    if metadata:
-                        item['metadata'] = metadata
-                        print(f"[Scanner] Found TMDB data for TV show: {item['title']}")
-                        
-                        # Download show poster/backdrop and save
-                        if database:
-                            self.progress.update(message=f'Stahuji data pro: {item["title"]}')
-                            database.enrich_with_images(item)
-                            database.add_or_update(item)
-                            database.save()
-                        # Count show-level enrichment as one unit
-                        self.progress.increment(current_item=item.get('title', 'Neznámý'))
-
-                        # Enrich episodes with TMDB details and still images
-                        show_id = metadata.get('id')
-                        if show_id and database:
-                            for season in item.get('seasons', []):
-                                s_no = season.get('season')
-                                for ep in season.get('episodes', []):
-                                    e_no = ep.get('episode')
-                                    if s_no is None or e_no is None:
-                                        continue
-                                    try:
-                                        label = f"{item['title']} S{int(s_no):02}E{int(e_no):02}"
-                                        self.progress.update(current_item=label, message=f'Stahuji data pro: {label}')
-                                        ep_meta = tmdb_client.get_tv_episode_details(show_id, int(s_no), int(e_no))
-                                        if ep_meta:
-                                            ep['metadata'] = ep_meta
-                                            # set human friendly name
-                                            if ep_meta.get('name'):
-                                                ep['name'] = ep_meta['name']
-                                            # download still image
-                                            still_path = ep_meta.get('still_path')
-                                            if still_path:
-                                                local_still = database.download_episode_still(still_path, show_id, int(s_no), int(e_no))
-                                                if local_still:
-                                                    ep['still_path'] = local_still
-                                        # Save progressively to avoid losing progress on long scans
-                                        database.add_or_update(item)
-                                        database.save()
-                                        # Count this episode unit
-                                        self.progress.increment(current_item=label)
-                                    except Exception as err:
-                                        print(f"[Scanner] Episode enrich failed S{s_no}E{e_no}: {err}")
-                                        # Even on failure, mark progress for this episode to avoid stalling
-                                        self.progress.increment(current_item=f"{item['title']} S{int(s_no):02}E{int(e_no):02}")
-                            
-            except Exception as e:
-                print(f"[Scanner] Error fetching TMDB data for {item.get('title')}: {e}")
-            
-            enriched_items.append(item)
-        
-        self.progress.finish(f'Obohaceno {len(items)} položek')
-        return enriched_items
+                    metadata = tmdb_client.get_tv_show_details(tmdb_id)
+            elif item['type'] == 'movie':
+                year = int(item['year']) if item.get('year') else None
+                metadata = tmdb_client.search_movie(item['title'], year)
+                if metadata is None and year and self._ends_with_year(item):
+                    # "Wonder Woman 1984.mkv": the bare number at the end may be part of the title
+                    metadata = tmdb_client.search_movie(f"{item['title']} {year}")
+            elif item['type'] == 'tv_show':
+                metadata = tmdb_client.search_tv_show(item['title'])
+            if metadata:
+                item['metadata'] = metadata
+                item['metadata_updated'] = int(time.time())
+                print(f"[Scanner] {'Refreshed' if tmdb_id else 'Found'} TMDB data for {item['type']}: {item['title']}")
+
+                # Queue image downloads if database provided (local filenames are recorded right away)
+                if database:
+                    self.progress.update(message=f'Stahuji data pro: {item["title"]}')
+                    database.enrich_with_images(item, wait=False)
+                    # Save to database immediately
+                    database.add_or_update(item)
+                    database.save()
+        finally:
+            # Count this item as one unit of work (metadata + images)
+            self.progress.increment(current_item=item.get('title', 'Neznámý'))
+        return bool(metadata or tmdb_id)
+
+    def _map_absolute_episodes(self, item: Dict, show_id: int, tmdb_client, database):
+        """
+        Map absolute episode numbers of a show to TMDB season/episode numbers.
+
+        Regular seasons (specials excluded) are laid end to end in TMDB
+        order until the highest absolute number is covered. The season
+        payloads go through the TMDB cache, so the season tasks that follow
+        reuse them instead of fetching again. Numbers beyond the last known
+        episode keep their provisional season 1 numbering.
+        """
+        episodes = [ep for season in item.get('seasons', []) or []
+                    for ep in season.get('episodes', []) or [] if ep.get('absolute') is not None]
+        highest = max(ep['absolute'] for ep in episodes)
+        season_count = (item.get('metadata') or {}).get('number_of_seasons') or 1
+        mapping = {}
+        offset = 0
+        for s_no in range(1, int(season_count) + 1):
+            if offset >= highest:
+                break
+            self._check_cancelled()
+            try:
+                season_meta = tmdb_client.get_tv_season_episodes(show_id, s_no)
+            except Exception as err:
+                print(f"[Scanner] Season fetch failed {item['title']} S{s_no:02}: {err}")
+                break
+            numbers = sorted(int(e['episode_number']) for e in season_meta or []
+                             if e.get('episode_number') is not None)
+            if not numbers:
+                break
+            for index, e_no in enumerate(numbers, 1):
+                mapping[offset + index] = (s_no, e_no)
+            offset += len(numbers)
+
+        with database.lock:
+            for ep in episodes:
+                ep['season'], ep['episode'] = mapping.get(ep['absolute'], (1, ep['absolute']))
+            self._regroup_absolute(item)
+            database.add_or_update(item)
+        mapped = sum(1 for ep in episodes if ep['absolute'] in mapping)
+        print(f"[Scanner] Mapped {mapped}/{len(episodes)} absolute episodes of {item['title']}")
+
+    @staticmethod
+    def _ends_with_year(item: Dict) -> bool:
+        """True if the item's file name ends with its bare year (not "(1984)", not followed by tags)."""
+        stem = os.path.splitext(item.get('filename') or '')[0].rstrip(' ._-')
+        return stem.endswith(str(item.get('year'))) and stem[-5:-4] not in ('(', '[')
+
+    def _enrich_season(self, item: Dict, season: Dict, show_id: int, tmdb_client, database):
+        """
+        Fetch one TMDB season payload and fan it out to the local episode records.
+
+        Episodes missing from the season payload fall back to a per-episode
+        request. Episode stills are queued for download. The show is saved
+        once per season.
+        """
+        s_no = season.get('season')
+        episodes = season.get('episodes', []) or []
+        if s_no is None:
+            for _ in episodes:
+                self.progress.increment()
+            return
+
+        label = f"{item['title']} S{int(s_no):02}"
+        self.progress.update(current_item=label, message=f'Stahuji data pro: {label}')
+        try:
+            season_meta = tmdb_client.get_tv_season_episodes(show_id, int(s_no))
+        except Exception as err:
+            print(f"[Scanner] Season fetch failed {label}: {err}")
+            season_meta = []
+        by_number = {}
+        for ep_meta in season_meta or []:
+            if ep_meta.get('episode_number') is not None:
+                by_number[int(ep_meta['episode_number'])] = ep_meta
+
+        resolved = []
+        for ep in episodes:
+            e_no = ep.get('episode')
+            ep_meta = None
+            if e_no is not None:
+                ep_label = f"{label}E{int(e_no):02}"
+                ep_meta = by_number.get(int(e_no))
+                # An absolute number that could not be mapped is not a real S01Exx; don't look it up
+                if ep_meta is None and ep.get('absolute') is None:
+                    try:
+                        ep_meta = tmdb_client.get_tv_episode_details(show_id, int(s_no), int(e_no))
+                    except Exception as err:
+                        print(f"[Scanner] Episode enrich failed S{s_no}E{e_no}: {err}")
+            else:
+                ep_label = label
+            resolved.append((ep, ep_meta))
+            self.progress.increment(current_item=ep_label)
+
+        # Episode records are part of the show item; mutate them under the database lock
+        with database.lock:
+            for ep, ep_meta in resolved:
+                if not ep_meta:
+                    continue
+                ep['metadata'] = ep_meta
+                # set human friendly name
+                if ep_meta.get('name'):
+                    ep['name'] = ep_meta['name']
+                if ep_meta.get('still_path'):
+                    self._queue_episode_still(item, ep, ep_meta['still_path'], show_id, int(s_no), database)
+            # Save progressively to avoid losing progress on long scans
+            database.add_or_update(item)
+        database.save()
+
+    @staticmethod
+    def _queue_episode_still(item: Dict, ep: Dict, still_path: str, show_id: int, season_number: int, database):
+        """Queue the still image of one episode and record its expected local filename."""
+        episode_number = int(ep.get('episode'))
+        filename = database.still_filename(still_path, show_id, season_number, episode_number)
+        previous = ep.get('still_path') if ep.get('still_path') != filename else None
+        ep['still_path'] = filename
+        database.download_episode_still(
+            still_path, show_id, season_number, episode_number, wait=False,
+            on_failure=lambda: database.restore_image_path(item, ep, 'still_path', filename, previous))
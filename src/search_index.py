@@ -0,0 +1,194 @@
+"""In-memory inverted index with BM25F ranking for searching the library."""
+
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Searchable fields and their weight in the combined term frequency
+FIELDS = ('title', 'original_title', 'genres', 'cast', 'overview')
+FIELD_WEIGHTS = (3.0, 2.0, 1.5, 1.5, 1.0)
+# BM25 parameters: term frequency saturation and field length normalization
+K1 = 1.2
+B = 0.75
+# Prefix matches score slightly below an exact word
+PREFIX_PENALTY = 0.8
+# Longest list of vocabulary words a prefix expands to
+MAX_PREFIX_TERMS = 64
+# Per-field term counts are packed into one int per posting, 8 bits each
+_TF_BITS = 8
+_TF_MAX = (1 << _TF_BITS) - 1
+
+_TOKEN_RE = re.compile(r'\w+')
+# Combining diacritical marks left over after NFKD decomposition
+_COMBINING_RE = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]+')
+# Letters NFKD does not decompose into a base letter and a diacritic
+_FOLD_TABLE = str.maketrans({'ł': 'l', 'Ł': 'l', 'đ': 'd', 'Đ': 'd', 'ø': 'o', 'Ø': 'o', 'æ': 'ae', 'Æ': 'ae',
+                             'œ': 'oe', 'Œ': 'oe', 'ı': 'i'})
+_FOLD_TABLE_RE = re.compile('[łŁđĐøØæÆœŒı]')
+
+
+def fold(text: str) -> str:
+    """Case- and diacritics-insensitive form of text ("Pelíšky" -> "pelisky")."""
+    if text.isascii():
+        return text.lower()
+    if _FOLD_TABLE_RE.search(text):
+        # translate() is slow for long strings, so only run it when needed
+        text = text.translate(_FOLD_TABLE)
+    text = unicodedata.normalize('NFKD', text)
+    return _COMBINING_RE.sub('', text).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Folded words of text."""
+    return _TOKEN_RE.findall(fold(text)) if text else []
+
+
+class SearchIndex:
+    """
+    Inverted index over the searchable fields of the library items.
+
+    Each term maps to the documents containing it, with the term count per
+    field packed into one int. Scores are BM25F: field counts are weighted
+    and length-normalized per field, summed, then saturated once per term.
+    Documents are identified by the caller's keys (normalized item paths).
+    Not thread-safe; MediaDatabase calls it under its lock.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._doc_ids: Dict[str, int] = {}
+        self._doc_keys: Dict[int, str] = {}
+        # doc id -> (terms, field lengths)
+        self._docs: Dict[int, Tuple[Tuple[str, ...], Tuple[int, ...]]] = {}
+        self._field_totals = [0] * len(FIELDS)
+        self._next_id = 0
+        self._vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, key: str, fields: Dict[str, str]):
+        """Index a document (replaces an earlier version with the same key)."""
+        self.remove(key)
+        counts: Dict[str, int] = {}
+        lengths = []
+        for idx, name in enumerate(FIELDS):
+            tokens = tokenize(fields.get(name) or '')
+            lengths.append(len(tokens))
+            shift = idx * _TF_BITS
+            for token, count in Counter(tokens).items():
+                counts[token] = counts.get(token, 0) + (min(count, _TF_MAX) << shift)
+        if not counts:
+            return
+        doc_id = self._next_id
+        self._next_id += 1
+        self._doc_ids[key] = doc_id
+        self._doc_keys[doc_id] = key
+        self._docs[doc_id] = (tuple(counts), tuple(lengths))
+        for idx, length in enumerate(lengths):
+            self._field_totals[idx] += length
+        vocabulary_size = len(self._postings)
+        postings = self._postings
+        for term, packed in counts.items():
+            postings[term][doc_id] = packed
+        if len(postings) != vocabulary_size:
+            self._vocabulary = None
+
+    def remove(self, key: str):
+        doc_id = self._doc_ids.pop(key, None)
+        if doc_id is None:
+            return
+        del self._doc_keys[doc_id]
+        terms, lengths = self._docs.pop(doc_id)
+        for idx, length in enumerate(lengths):
+            self._field_totals[idx] -= length
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+
+    def _expand(self, token: str, prefix: bool) -> List[Tuple[str, float]]:
+        """Vocabulary terms a query token matches, with their score factor."""
+        terms = [(token, 1.0)] if token in self._postings else []
+        if prefix:
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self._postings)
+            start = bisect.bisect_left(self._vocabulary, token)
+            for term in self._vocabulary[start:start + MAX_PREFIX_TERMS + 1]:
+                if not term.startswith(token):
+                    break
+                if term != token:
+                    terms.append((term, PREFIX_PENALTY))
+        return terms
+
+    def search(self, query: str, limit: int = 10, accept: Callable[[str], bool] = None,
+               prefix: bool = True) -> List[Tuple[str, float]]:
+        """
+        Best matching documents as (key, score), highest score first.
+
+        Every query word must match (the last one also as a word prefix,
+        for search-as-you-type; with prefix=True all words of 3+ letters
+        do). `accept(key)` restricts the results; if no accepted document
+        matches all words, accepted documents matching any of them are
+        ranked instead.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._docs:
+            return []
+        n_docs = len(self._docs)
+        avg_lengths = [max(total / n_docs, 1.0) for total in self._field_totals]
+        norms: Dict[int, List[float]] = {}
+
+        def field_norms(doc_id: int) -> List[float]:
+            cached = norms.get(doc_id)
+            if cached is None:
+                lengths = self._docs[doc_id][1]
+                cached = norms[doc_id] = [1 - B + B * lengths[i] / avg_lengths[i] for i in range(len(FIELDS))]
+            return cached
+
+        token_scores: List[Dict[int, float]] = []
+        for position, token in enumerate(tokens):
+            is_last = position == len(tokens) - 1
+            scores: Dict[int, float] = {}
+            for term, factor in self._expand(token, prefix and (is_last or len(token) >= 3)):
+                postings = self._postings[term]
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, packed in postings.items():
+                    doc_norms = field_norms(doc_id)
+                    tf = 0.0
+                    for idx, weight in enumerate(FIELD_WEIGHTS):
+                        count = (packed >> (idx * _TF_BITS)) & _TF_MAX
+                        if count:
+                            tf += weight * count / doc_norms[idx]
+                    score = factor * idf * tf * (K1 + 1) / (tf + K1)
+                    # A word counts once, through its best matching term
+                    if score > scores.get(doc_id, 0.0):
+                        scores[doc_id] = score
+            token_scores.append(scores)
+
+        def accepted(doc_ids) -> set:
+            if accept is None:
+                return set(doc_ids)
+            return {doc_id for doc_id in doc_ids if accept(self._doc_keys[doc_id])}
+
+        # All words must match; fall back to any word when no accepted document matches all
+        by_size = sorted(token_scores, key=len)
+        matched = accepted(set(by_size[0]).intersection(*by_size[1:])) if by_size[0] else set()
+        if not matched:
+            matched = accepted(set().union(*token_scores))
+        totals = ((sum(scores.get(doc_id, 0.0) for scores in token_scores), doc_id) for doc_id in matched)
+        best = heapq.nlargest(limit, totals)
+        return [(self._doc_keys[doc_id], score) for score, doc_id in best]
+
+    def stats(self) -> Dict:
+        return {'documents': len(self._docs), 'terms': len(self._postings),
+                'postings': sum(len(p) for p in self._postings.values())}
@@ -0,0 +1,284 @@
+"""Storage backends for MediaDatabase (JSON file or SQLite)."""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List
+
+
+class JSONStorage:
+    """Stores the whole media list in a single JSON file (rewritten on every save)."""
+
+    # Full-file backend: MediaDatabase must call save_all() to persist changes
+    incremental = False
+
+    def __init__(self, path: Path, compact: bool = False):
+        """
+        Args:
+            path: JSON file path
+            compact: Write JSON without indentation (smaller and faster to write)
+        """
+        self.path = Path(path)
+        self.compact = compact
+
+    def load(self) -> List[Dict]:
+        """Load all items from the JSON file."""
+        if not self.path.exists():
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def dumps(self, items: List[Dict]) -> str:
+        """Serialize items to JSON text."""
+        if self.compact:
+            return json.dumps(items, ensure_ascii=False, separators=(',', ':'))
+        return json.dumps(items, indent=2, ensure_ascii=False)
+
+    def write(self, text: str):
+        """
+        Atomically replace the JSON file with text.
+
+        Data goes to a temp file in the same directory which is fsynced and
+        then moved over the old file, so a crash leaves either the old or the
+        new file, never a truncated one.
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix=self.path.name + '.', suffix='.tmp', dir=str(self.path.parent))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def save_all(self, items: List[Dict]):
+        """Rewrite the JSON file with all items."""
+        self.write(self.dumps(items))
+
+    def upsert(self, key: str, item: Dict):
+        """No-op: JSON storage only persists on save_all()."""
+
+    def delete(self, key: str):
+        """No-op: JSON storage only persists on save_all()."""
+
+    def clear(self):
+        """Remove all items."""
+        self.save_all([])
+
+    def commit(self):
+        """No-op: JSON storage has no pending transaction."""
+
+    def close(self):
+        """No-op: JSON storage holds no open handles."""
+
+
+class SQLiteStorage:
+    """
+    Stores one row per media item in SQLite, so updating an item writes a single row.
+
+    Items are keyed by normalized path and kept in insertion order (rowid).
+    Metadata and seasons are stored as JSON text columns, remaining item
+    fields in the `extra` JSON column.
+    """
+
+    # Row-level backend: upsert()/delete() persist changes, commit() ends the transaction
+    incremental = True
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS items (
+            path TEXT PRIMARY KEY,
+            type TEXT,
+            title TEXT,
+            metadata TEXT,
+            seasons TEXT,
+            extra TEXT NOT NULL
+        )
+    '''
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        # Connection is shared by Flask worker threads; access is serialized by _lock
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(self.SCHEMA)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_items_type ON items(type)')
+        self._conn.commit()
+
+    @staticmethod
+    def _to_row(key: str, item: Dict) -> tuple:
+        extra = {k: v for k, v in item.items() if k not in ('metadata', 'seasons')}
+        return (
+            key,
+            item.get('type'),
+            item.get('title'),
+            json.dumps(item['metadata'], ensure_ascii=False) if 'metadata' in item else None,
+            json.dumps(item['seasons'], ensure_ascii=False) if 'seasons' in item else None,
+            json.dumps(extra, ensure_ascii=False),
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> Dict:
+        metadata, seasons, extra = row
+        item = json.loads(extra)
+        if metadata is not None:
+            item['metadata'] = json.loads(metadata)
+        if seasons is not None:
+            item['seasons'] = json.loads(seasons)
+        return item
+
+    def load(self) -> List[Dict]:
+        """Load all items in insertion order."""
+        with self._lock:
+            rows = self._conn.execute('SELECT metadata, seasons, extra FROM items ORDER BY rowid').fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def count(self) -> int:
+        """Number of stored items."""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+
+    def save_all(self, items: List[Dict], keys: List[str] = None):
+        """Replace all rows with the given items (used for migrations only)."""
+        if keys is None:
+            keys = [os.path.normpath(item.get('path') or '') for item in items]
+        with self._lock:
+            self._conn.execute('DELETE FROM items')
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO items (path, type, title, metadata, seasons, extra) VALUES (?, ?, ?, ?, ?, ?)',
+                [self._to_row(key, item) for key, item in zip(keys, items)]
+            )
+            self._conn.commit()
+
+    def upsert(self, key: str, item: Dict):
+        """Insert or update a single item row (keeps its original rowid/order)."""
+        with self._lock:
+            self._conn.execute(
+                '''INSERT INTO items (path, type, title, metadata, seasons, extra) VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(path) DO UPDATE SET
+                       type = excluded.type,
+                       title = excluded.title,
+                       metadata = excluded.metadata,
+                       seasons = excluded.seasons,
+                       extra = excluded.extra''',
+                self._to_row(key, item)
+            )
+
+    def delete(self, key: str):
+        """Delete a single item row."""
+        with self._lock:
+            self._conn.execute('DELETE FROM items WHERE path = ?', (key,))
+
+    def clear(self):
+        """Remove all items."""
+        with self._lock:
+            self._conn.execute('DELETE FROM items')
+            self._conn.commit()
+
+    def commit(self):
+        """Commit pending row changes."""
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        """Commit and close the connection."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def migrate_from_json(self, json_path: Path) -> int:
+        """
+        One-shot import of an existing media_db.json into an empty SQLite database.
+
+        The JSON file is renamed to `*.migrated` afterwards so the import
+        never runs twice.
+
+        Returns:
+            Number of imported items
+        """
+        json_path = Path(json_path)
+        if not json_path.exists() or self.count() > 0:
+            return 0
+        with open(json_path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        self.save_all(items)
+        os.replace(json_path, json_path.with_name(json_path.name + '.migrated'))
+        return len(items)
+
+
+class WriteBehindSaver:
+    """
+    Coalesces save requests into batched writes.
+
+    mark_dirty() only counts a pending change; the write function runs once
+    `batch_size` changes are pending (in the calling thread) or `interval`
+    seconds after the first pending change (in a timer thread), whichever
+    comes first. A failed write keeps the changes pending and is retried.
+    """
+
+    def __init__(self, write_fn: Callable[[], None], interval: float = 5.0, batch_size: int = 100):
+        self.write_fn = write_fn
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self._pending = 0
+        self._timer = None
+        self._lock = threading.Lock()
+        # Serializes writes so a timer flush and an explicit flush never overlap
+        self._write_lock = threading.Lock()
+
+    @property
+    def dirty(self) -> bool:
+        return self._pending > 0
+
+    def mark_dirty(self):
+        """Record one pending change and schedule or trigger a write."""
+        with self._lock:
+            self._pending += 1
+            flush_now = self._pending >= self.batch_size
+            if not flush_now:
+                self._schedule()
+        if flush_now:
+            self.flush()
+
+    def _schedule(self):
+        """Start the interval timer if not already running (caller holds _lock)."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes now (no-op if nothing is pending)."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pending = self._pending
+                self._pending = 0
+            if not pending:
+                return
+            try:
+                self.write_fn()
+            except Exception as e:
+                print(f"[Database] Error writing database, will retry: {e}")
+                with self._lock:
+                    self._pending += pending
+                    self._schedule()
+
+    def stop(self):
+        """Flush pending changes and cancel the timer."""
+        self.flush()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
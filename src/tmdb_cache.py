@@ -0,0 +1,184 @@
+"""Persistent on-disk cache for TMDB API responses."""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class TMDBCache:
+    """
+    SQLite-backed cache of TMDB JSON responses.
+
+    Entries are keyed by endpoint + params (including language), expire after a
+    per-resource TTL and are evicted least-recently-used once the cache grows
+    over `max_bytes`. Entries for /movie/<id> and /tv/<id>/... endpoints are
+    tagged with that id so they can be invalidated together.
+    """
+
+    # Time to live in seconds per resource type
+    DEFAULT_TTLS = {
+        'search': 7 * 24 * 3600,
+        'movie': 7 * 24 * 3600,
+        'tv': 7 * 24 * 3600,
+        'season': 3 * 24 * 3600,
+        'episode': 3 * 24 * 3600,
+        'genres': 30 * 24 * 3600,
+        'default': 24 * 3600,
+    }
+
+    # After eviction the cache is trimmed to this fraction of max_bytes
+    LOW_WATER = 0.9
+
+    # Access times are only refreshed when older than this (LRU order needs no finer resolution)
+    ACCESS_RESOLUTION = 3600
+    # Pending access time refreshes written in one transaction
+    ACCESS_BATCH = 100
+
+    REF_PATTERN = re.compile(r'^/(movie|tv)/(\d+)')
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024, ttls: Dict[str, int] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttls = dict(self.DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> access time not yet written, so cache hits stay read-only
+        self._accessed: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                ref TEXT,
+                resource TEXT NOT NULL,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_ref ON responses(ref)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> str:
+        """Cache key for an endpoint and its query params (api_key excluded)."""
+        clean = sorted((k, str(v)) for k, v in (params or {}).items() if k != 'api_key')
+        raw = endpoint + '?' + '&'.join(f'{k}={v}' for k, v in clean)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Return cached response or None on miss/expiry."""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT body, expires, accessed FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] < now:
+                self.misses += 1
+                return None
+            if now - row[2] > self.ACCESS_RESOLUTION and key not in self._accessed:
+                self._accessed[key] = now
+                if len(self._accessed) >= self.ACCESS_BATCH:
+                    self._write_accessed()
+                    self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, endpoint: str, params: Dict, data, resource: str = 'default'):
+        """Store a response and evict old entries if the cache is over its size cap."""
+        key = self.make_key(endpoint, params)
+        body = json.dumps(data, ensure_ascii=False)
+        size = len(body.encode('utf-8'))
+        match = self.REF_PATTERN.match(endpoint)
+        ref = f'{match.group(1)}/{match.group(2)}' if match else None
+        now = time.time()
+        ttl = self.ttls.get(resource, self.ttls['default'])
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._write_accessed()
+            old = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, endpoint, ref, resource, body, size, expires, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, endpoint, ref, resource, body, size, now + ttl, now)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _write_accessed(self):
+        """Write pending access time refreshes (caller holds lock and commits)."""
+        if self._accessed:
+            self._conn.executemany('UPDATE responses SET accessed = ? WHERE key = ?',
+                                   [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones down to the low-water mark (caller holds lock)."""
+        self._conn.execute('DELETE FROM responses WHERE expires < ?', (time.time(),))
+        target = self.max_bytes * self.LOW_WATER
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        removed = 0
+        for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY accessed').fetchall():
+            if total <= target:
+                break
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        if removed:
+            print(f"[TMDB Cache] Evicted {removed} entries")
+
+    def invalidate(self, tmdb_id: int, media_type: str = None) -> int:
+        """
+        Remove all cached responses for one TMDB id (details, seasons, episodes).
+
+        Args:
+            tmdb_id: TMDB id
+            media_type: 'movie' or 'tv'; if None both are invalidated
+
+        Returns:
+            Number of removed entries
+        """
+        refs = [f'{t}/{int(tmdb_id)}' for t in ([media_type] if media_type else ['movie', 'tv'])]
+        with self._lock:
+            placeholders = ','.join('?' * len(refs))
+            removed = self._conn.execute(f'DELETE FROM responses WHERE ref IN ({placeholders})', refs).rowcount
+            self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            self._conn.commit()
+        return removed
+
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and size information."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'size_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -1,54 +1,168 @@
 import os
+import threading
 import requests
-from tmdbv3api import TMDb, Movie, TV
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List
+from src.http_session import RateLimiter, create_session, retry_after_seconds
 
 class TMDBClient:
     """Client for TMDB API to fetch media metadata."""
 
-    def __init__(self, api_key: str, language: str = 'en-US'):
-        # Store raw values for fallback HTTP calls
+    BASE_URL = "https://api.themoviedb.org/3"
+    HEADERS = {'Accept': 'application/json'}
+    # Attempts for a request answered with 429 Too Many Requests
+    MAX_RATE_LIMITED_ATTEMPTS = 5
+    # Parallel details() calls for search(..., details=True)
+    DETAILS_WORKERS = 5
+    # Details are requested with credits so the search index can match cast names
+    DETAILS_PARAMS = {'append_to_response': 'credits'}
+    # Top-billed cast members kept in the metadata
+    CAST_LIMIT = 10
+
+    def __init__(self, api_key: str, language: str = 'en-US', cache=None,
+                 pool_size: int = 16, rate_limit: float = 40.0):
+        """
+        Args:
+            api_key: TMDB API key
+            language: Response language (e.g. 'cs-CZ')
+            cache: Optional TMDBCache for persistent response caching
+            pool_size: Keep-alive connections per host in the shared session
+            rate_limit: Max TMDB API requests per second (token bucket)
+        """
         self.api_key = api_key
         self.language = language
-        if api_key:
-            self.tmdb = TMDb()
-            self.tmdb.api_key = api_key
-            self.tmdb.language = language
-            self.movie_api = Movie()
-            self.tv_api = TV()
-        else:
-            self.tmdb = None
-            self.movie_api = None
-            self.tv_api = None
+        self.cache = cache
+        # Shared by API calls and image downloads (see MediaDatabase.set_http_session)
+        self.session = create_session(pool_size=pool_size)
+        self.rate_limiter = RateLimiter(rate=rate_limit, burst=max(1, int(rate_limit)))
+        # (media_type, language) -> {genre_id: name}
+        self._genres: Dict[tuple, Dict[int, str]] = {}
+        self._genres_lock = threading.Lock()
+
+    def _get(self, endpoint: str, params: Dict = None, resource: str = 'default') -> Dict:
+        """
+        GET a TMDB endpoint, served from the response cache when possible.
+
+        Args:
+            endpoint: Path below the API root, e.g. '/movie/603'
+            params: Extra query params (language is added automatically)
+            resource: Cache resource type used for the TTL ('search', 'movie', 'tv', 'season', ...)
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            requests.RequestException on HTTP/network errors
+        """
+        params = dict(params or {})
+        params.setdefault('language', self.language or 'en-US')
+        if self.cache:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+        for attempt in range(1, self.MAX_RATE_LIMITED_ATTEMPTS + 1):
+            self.rate_limiter.acquire()
+            resp = self.session.get(f"{self.BASE_URL}{endpoint}", params={**params, 'api_key': self.api_key},
+                                    headers=self.HEADERS, timeout=10)
+            if resp.status_code != 429 or attempt == self.MAX_RATE_LIMITED_ATTEMPTS:
+                break
+            # Throttled: hold back every worker thread, not just this one
+            delay = retry_after_seconds(resp, default=2 ** attempt)
+            print(f"[TMDB] Rate limited, pausing requests for {delay:.1f}s")
+            self.rate_limiter.pause(delay)
+        resp.raise_for_status()
+        data = resp.json() or {}
+        if self.cache:
+            self.cache.set(endpoint, params, data, resource)
+        return data
+
+    def invalidate(self, tmdb_id: int, media_type: str = None) -> int:
+        """Drop cached responses for one TMDB id ('movie'/'tv' or both). Returns removed entry count."""
+        if not self.cache:
+            return 0
+        return self.cache.invalidate(tmdb_id, media_type)
+
+    @staticmethod
+    def _names(entries, key: str = 'name') -> List[str]:
+        """Extract names from a list of TMDB objects (genres, networks, ...)."""
+        return [e.get(key) for e in entries or [] if e.get(key)]
+
+    @classmethod
+    def _cast(cls, details: Dict) -> List[str]:
+        """Names of the top-billed cast from details fetched with DETAILS_PARAMS."""
+        return cls._names(((details.get('credits') or {}).get('cast') or [])[:cls.CAST_LIMIT])
+
+    def get_genres(self, media_type: str) -> Dict[int, str]:
+        """
+        Genre id -> name table for 'movie' or 'tv' in the client language.
+
+        Loaded once per process (and cached on disk by TMDBCache); an empty
+        table is returned on errors and retried on the next call.
+        """
+        key = (media_type, self.language)
+        genres = self._genres.get(key)
+        if genres is not None:
+            return genres
+        with self._genres_lock:
+            if key not in self._genres:
+                try:
+                    data = self._get(f"/genre/{media_type}/list", resource='genres')
+                except Exception as e:
+                    print(f"Error loading {media_type} genres: {e}")
+                    return {}
+                self._genres[key] = {g['id']: g.get('name') for g in data.get('genres') or [] if g.get('id')}
+            return self._genres[key]
+
+    def _genre_names(self, genre_ids, media_type: str) -> List[str]:
+        """Map search result genre_ids to names."""
+        if not genre_ids:
+            return []
+        table = self.get_genres(media_type)
+        return [table[g] for g in genre_ids if table.get(g)]
+
+    def _fetch_details(self, endpoint_type: str, ids: List[int], resource: str) -> Dict[int, Dict]:
+        """Fetch /movie/<id> or /tv/<id> for several ids concurrently. Failed ids are skipped."""
+        def fetch(tmdb_id):
+            try:
+                return self._get(f"/{endpoint_type}/{tmdb_id}", self.DETAILS_PARAMS, resource)
+            except Exception as e:
+                print(f"Error getting {endpoint_type} details {tmdb_id}: {e}")
+                return None
+
+        if not ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.DETAILS_WORKERS, len(ids))) as pool:
+            return {tmdb_id: d for tmdb_id, d in zip(ids, pool.map(fetch, ids)) if d}
 
     def search_movie(self, title: str, year: Optional[int] = None) -> Optional[Dict]:
         """Search for movie and return metadata."""
-        if not self.movie_api:
+        if not self.api_key:
             return None
 
         try:
-            results = self.movie_api.search(title)
+            results = self._get('/search/movie', {'query': title}, 'search').get('results') or []
             if results:
                 movie = results[0]  # Take first result
-                if year and hasattr(movie, 'release_date') and movie.release_date:
+                if year and movie.get('release_date'):
                     try:
-                        movie_year = movie.release_date.year
+                        movie_year = int(movie['release_date'][:4])
                         if abs(movie_year - year) > 1:
                             return None  # Year mismatch
-                    except:
+                    except ValueError:
                         pass
-                details = self.movie_api.details(movie.id)
+                details = self._get(f"/movie/{movie['id']}", self.DETAILS_PARAMS, 'movie')
                 return {
-                    'id': movie.id,
-                    'title': movie.title,
-                    'original_title': movie.original_title,
-                    'release_date': str(movie.release_date) if movie.release_date else None,
-                    'overview': movie.overview,
-                    'poster_path': movie.poster_path,
-                    'backdrop_path': movie.backdrop_path,
-                    'genres': [g.name for g in details.genres] if hasattr(details, 'genres') else [],
-                    'runtime': details.runtime if hasattr(details, 'runtime') else None,
-                    'vote_average': movie.vote_average
+                    'id': movie['id'],
+                    'title': movie.get('title'),
+                    'original_title': movie.get('original_title'),
+                    'release_date': movie.get('release_date') or None,
+                    'overview': movie.get('overview'),
+                    'poster_path': movie.get('poster_path'),
+                    'backdrop_path': movie.get('backdrop_path'),
+                    'genres': self._names(details.get('genres')),
+                    'runtime': details.get('runtime'),
+                    'cast': self._cast(details),
+                    'vote_average': movie.get('vote_average')
                 }
         except Exception as e:
             print(f"Error searching movie {title}: {e}")
@@ -56,26 +170,28 @@ class TMDBClient:
 
     def search_tv_show(self, title: str) -> Optional[Dict]:
         """Search for TV show and return metadata."""
-        if not self.tv_api:
+        if not self.api_key:
             return None
 
         try:
-            results = self.tv_api.search(title)
+            results = self._get('/search/tv', {'query': title}, 'search').get('results') or []
             if results:
                 show = results[0]  # Take first result
-                details = self.tv_api.details(show.id)
+                details = self._get(f"/tv/{show['id']}", self.DETAILS_PARAMS, 'tv')
                 return {
-                    'id': show.id,
-                    'name': show.name,
-                    'original_name': show.original_name,
-                    'first_air_date': str(show.first_air_date) if show.first_air_date else None,
-                    'overview': show.overview,
-                    'poster_path': show.poster_path,
-                    'backdrop_path': show.backdrop_path,
-                    'genres': [g.name for g in details.genres] if hasattr(details, 'genres') else [],
-                    'number_of_seasons': details.number_of_seasons if hasattr(details, 'number_of_seasons') else None,
-                    'number_of_episodes': details.number_of_episodes if hasattr(details, 'number_of_episodes') else None,
-                    'vote_average': show.vote_average
+                    'id': show['id'],
+                    'name': show.get('name'),
+                    'original_name': show.get('original_name'),
+                    'first_air_date': show.get('first_air_date') or None,
+                    'overview': show.get('overview'),
+                    'poster_path': show.get('poster_path'),
+                    'backdrop_path': show.get('backdrop_path'),
+                    'genres': self._names(details.get('genres')),
+                    'number_of_seasons': details.get('number_of_seasons'),
+                    'number_of_episodes': details.get('number_of_episodes'),
+                    'cast': self._cast(details),
+                    'created_by': self._names(details.get('created_by')),
+                    'vote_average': show.get('vote_average')
                 }
         except Exception as e:
             print(f"Error searching TV show {title}: {e}")
@@ -83,40 +199,41 @@ class TMDBClient:
 
     def get_movie_details(self, tmdb_id: int) -> Optional[Dict]:
         """Get full movie details by TMDB ID."""
-        if not self.movie_api:
+        if not self.api_key:
             return None
 
         try:
-            details = self.movie_api.details(tmdb_id)
+            details = self._get(f"/movie/{tmdb_id}", self.DETAILS_PARAMS, 'movie')
             if not details:
                 return None
             # Some attributes may be missing depending on API/version
             return {
-                'id': details.id,
-                'title': getattr(details, 'title', None),
-                'original_title': getattr(details, 'original_title', None),
-                'overview': getattr(details, 'overview', ''),
-                'tagline': getattr(details, 'tagline', ''),
-                'poster_path': getattr(details, 'poster_path', None),
-                'backdrop_path': getattr(details, 'backdrop_path', None),
-                'release_date': str(getattr(details, 'release_date', '') or '') or None,
-                'runtime': getattr(details, 'runtime', None),
-                'vote_average': getattr(details, 'vote_average', 0),
-                'vote_count': getattr(details, 'vote_count', 0),
-                'genres': [g.name for g in getattr(details, 'genres', [])] if getattr(details, 'genres', None) else [],
-                'original_language': getattr(details, 'original_language', ''),
-                'production_countries': [c.name for c in getattr(details, 'production_countries', [])] if getattr(details, 'production_countries', None) else [],
-                'production_companies': [c.name for c in getattr(details, 'production_companies', [])] if getattr(details, 'production_companies', None) else [],
-                'spoken_languages': [l.english_name for l in getattr(details, 'spoken_languages', [])] if getattr(details, 'spoken_languages', None) else [],
-                'status': getattr(details, 'status', ''),
-                'budget': getattr(details, 'budget', 0),
-                'revenue': getattr(details, 'revenue', 0),
-                'homepage': getattr(details, 'homepage', ''),
-                'imdb_id': getattr(details, 'imdb_id', None),
-                'adult': getattr(details, 'adult', False),
-                'video': getattr(details, 'video', False),
-                'popularity': getattr(details, 'popularity', 0),
-                'origin_country': getattr(details, 'origin_country', [])
+                'id': details.get('id'),
+                'title': details.get('title'),
+                'original_title': details.get('original_title'),
+                'overview': details.get('overview', ''),
+                'tagline': details.get('tagline', ''),
+                'poster_path': details.get('poster_path'),
+                'backdrop_path': details.get('backdrop_path'),
+                'release_date': details.get('release_date') or None,
+                'runtime': details.get('runtime'),
+                'vote_average': details.get('vote_average', 0),
+                'vote_count': details.get('vote_count', 0),
+                'genres': self._names(details.get('genres')),
+                'cast': self._cast(details),
+                'original_language': details.get('original_language', ''),
+                'production_countries': self._names(details.get('production_countries')),
+                'production_companies': self._names(details.get('production_companies')),
+                'spoken_languages': self._names(details.get('spoken_languages'), 'english_name'),
+                'status': details.get('status', ''),
+                'budget': details.get('budget', 0),
+                'revenue': details.get('revenue', 0),
+                'homepage': details.get('homepage', ''),
+                'imdb_id': details.get('imdb_id'),
+                'adult': details.get('adult', False),
+                'video': details.get('video', False),
+                'popularity': details.get('popularity', 0),
+                'origin_country': details.get('origin_country', [])
             }
         except Exception as e:
             print(f"Error getting movie details {tmdb_id}: {e}")
@@ -124,122 +241,123 @@ class TMDBClient:
 
     def get_tv_show_details(self, tmdb_id: int) -> Optional[Dict]:
         """Get full TV show details by TMDB ID."""
-        if not self.tv_api:
+        if not self.api_key:
             return None
 
         try:
-            details = self.tv_api.details(tmdb_id)
+            details = self._get(f"/tv/{tmdb_id}", self.DETAILS_PARAMS, 'tv')
             if not details:
                 return None
             return {
-                'id': details.id,
-                'name': getattr(details, 'name', None),
-                'original_name': getattr(details, 'original_name', None),
-                'overview': getattr(details, 'overview', ''),
-                'tagline': getattr(details, 'tagline', ''),
-                'poster_path': getattr(details, 'poster_path', None),
-                'backdrop_path': getattr(details, 'backdrop_path', None),
-                'first_air_date': str(getattr(details, 'first_air_date', '') or '') or None,
-                'last_air_date': str(getattr(details, 'last_air_date', '') or '') or None,
-                'vote_average': getattr(details, 'vote_average', 0),
-                'vote_count': getattr(details, 'vote_count', 0),
-                'genres': [g.name for g in getattr(details, 'genres', [])] if getattr(details, 'genres', None) else [],
-                'original_language': getattr(details, 'original_language', ''),
-                'production_countries': [c.name for c in getattr(details, 'production_countries', [])] if getattr(details, 'production_countries', None) else [],
-                'production_companies': [c.name for c in getattr(details, 'production_companies', [])] if getattr(details, 'production_companies', None) else [],
-                'spoken_languages': [l.english_name for l in getattr(details, 'spoken_languages', [])] if getattr(details, 'spoken_languages', None) else [],
-                'status': getattr(details, 'status', ''),
-                'homepage': getattr(details, 'homepage', ''),
-                'adult': getattr(details, 'adult', False),
-                'popularity': getattr(details, 'popularity', 0),
-                'origin_country': getattr(details, 'origin_country', []),
-                'number_of_episodes': getattr(details, 'number_of_episodes', None),
-                'number_of_seasons': getattr(details, 'number_of_seasons', None),
-                'episode_run_time': getattr(details, 'episode_run_time', []),
-                'languages': getattr(details, 'languages', []),
-                'networks': [n.name for n in getattr(details, 'networks', [])] if getattr(details, 'networks', None) else [],
-                'created_by': [c.name for c in getattr(details, 'created_by', [])] if getattr(details, 'created_by', None) else [],
-                'last_episode_to_air': getattr(details, 'last_episode_to_air', {}).get('air_date') if getattr(details, 'last_episode_to_air', None) else None,
-                'next_episode_to_air': getattr(details, 'next_episode_to_air', {}).get('air_date') if getattr(details, 'next_episode_to_air', None) else None
+                'id': details.get('id'),
+                'name': details.get('name'),
+                'original_name': details.get('original_name'),
+                'overview': details.get('overview', ''),
+                'tagline': details.get('tagline', ''),
+                'poster_path': details.get('poster_path'),
+                'backdrop_path': details.get('backdrop_path'),
+                'first_air_date': details.get('first_air_date') or None,
+                'last_air_date': details.get('last_air_date') or None,
+                'vote_average': details.get('vote_average', 0),
+                'vote_count': details.get('vote_count', 0),
+                'genres': self._names(details.get('genres')),
+                'cast': self._cast(details),
+                'original_language': details.get('original_language', ''),
+                'production_countries': self._names(details.get('production_countries')),
+                'production_companies': self._names(details.get('production_companies')),
+                'spoken_languages': self._names(details.get('spoken_languages'), 'english_name'),
+                'status': details.get('status', ''),
+                'homepage': details.get('homepage', ''),
+                'adult': details.get('adult', False),
+                'popularity': details.get('popularity', 0),
+                'origin_country': details.get('origin_country', []),
+                'number_of_episodes': details.get('number_of_episodes'),
+                'number_of_seasons': details.get('number_of_seasons'),
+                'episode_run_time': details.get('episode_run_time', []),
+                'languages': details.get('languages', []),
+                'networks': self._names(details.get('networks')),
+                'created_by': self._names(details.get('created_by')),
+                'last_episode_to_air': (details.get('last_episode_to_air') or {}).get('air_date'),
+                'next_episode_to_air': (details.get('next_episode_to_air') or {}).get('air_date')
             }
         except Exception as e:
             print(f"Error getting TV show details {tmdb_id}: {e}")
             return None
 
-    def search_movies(self, title: str, limit: int = 5) -> List[Dict]:
-        """Search for movies and return multiple results."""
-        if not self.movie_api:
+    def search_movies(self, title: str, limit: int = 5, details: bool = False) -> List[Dict]:
+        """
+        Search for movies and return multiple results.
+
+        By default results are built from the search response alone (genres
+        via the cached genre table, no runtime). With details=True the full
+        movie details are fetched concurrently to fill genres and runtime.
+        """
+        if not self.api_key:
             return []
 
         try:
-            results = self.movie_api.search(title)
+            results = (self._get('/search/movie', {'query': title}, 'search').get('results') or [])[:limit]
+            full = self._fetch_details('movie', [m['id'] for m in results], 'movie') if details else {}
             movies = []
-            for movie in results[:limit]:
-                try:
-                    details = self.movie_api.details(movie.id)
-                    movies.append({
-                        'id': movie.id,
-                        'title': movie.title,
-                        'original_title': movie.original_title,
-                        'release_date': str(movie.release_date) if movie.release_date else None,
-                        'overview': movie.overview,
-                        'poster_path': movie.poster_path,
-                        'backdrop_path': movie.backdrop_path,
-                        'genres': [g.name for g in details.genres] if hasattr(details, 'genres') else [],
-                        'runtime': details.runtime if hasattr(details, 'runtime') else None,
-                        'vote_average': movie.vote_average
-                    })
-                except:
-                    continue
+            for movie in results:
+                extra = full.get(movie['id'])
+                movies.append({
+                    'id': movie['id'],
+                    'title': movie.get('title'),
+                    'original_title': movie.get('original_title'),
+                    'release_date': movie.get('release_date') or None,
+                    'overview': movie.get('overview'),
+                    'poster_path': movie.get('poster_path'),
+                    'backdrop_path': movie.get('backdrop_path'),
+                    'genres': self._names(extra.get('genres')) if extra else self._genre_names(movie.get('genre_ids'), 'movie'),
+                    'runtime': extra.get('runtime') if extra else None,
+                    'vote_average': movie.get('vote_average')
+                })
             return movies
         except Exception as e:
             print(f"Error searching movies {title}: {e}")
         return []
 
-    def search_tv_shows(self, title: str, limit: int = 5) -> List[Dict]:
-        """Search for TV shows and return multiple results."""
-        if not self.tv_api:
+    def search_tv_shows(self, title: str, limit: int = 5, details: bool = False) -> List[Dict]:
+        """
+        Search for TV shows and return multiple results.
+
+        Like search_movies: lightweight by default, season/episode counts
+        are only filled when details=True.
+        """
+        if not self.api_key:
             return []
 
         try:
-            results = self.tv_api.search(title)
+            results = (self._get('/search/tv', {'query': title}, 'search').get('results') or [])[:limit]
+            full = self._fetch_details('tv', [s['id'] for s in results], 'tv') if details else {}
             shows = []
-            for show in results[:limit]:
-                try:
-                    details = self.tv_api.details(show.id)
-                    shows.append({
-                        'id': show.id,
-                        'name': show.name,
-                        'original_name': show.original_name,
-                        'first_air_date': str(show.first_air_date) if show.first_air_date else None,
-                        'overview': show.overview,
-                        'poster_path': show.poster_path,
-                        'backdrop_path': show.backdrop_path,
-                        'genres': [g.name for g in details.genres] if hasattr(details, 'genres') else [],
-                        'number_of_seasons': details.number_of_seasons if hasattr(details, 'number_of_seasons') else None,
-                        'number_of_episodes': details.number_of_episodes if hasattr(details, 'number_of_episodes') else None,
-                        'vote_average': show.vote_average
-                    })
-                except:
-                    continue
+            for show in results:
+                extra = full.get(show['id'])
+                shows.append({
+                    'id': show['id'],
+                    'name': show.get('name'),
+                    'original_name': show.get('original_name'),
+                    'first_air_date': show.get('first_air_date') or None,
+                    'overview': show.get('overview'),
+                    'poster_path': show.get('poster_path'),
+                    'backdrop_path': show.get('backdrop_path'),
+                    'genres': self._names(extra.get('genres')) if extra else self._genre_names(show.get('genre_ids'), 'tv'),
+                    'number_of_seasons': extra.get('number_of_seasons') if extra else None,
+                    'number_of_episodes': extra.get('number_of_episodes') if extra else None,
+                    'vote_average': show.get('vote_average')
+                })
             return shows
         except Exception as e:
             print(f"Error searching TV shows {title}: {e}")
         return []
 
     def get_tv_episode_details(self, tmdb_id: int, season_number: int, episode_number: int) -> Optional[Dict]:
-        """Get TV episode details by show TMDB ID, season and episode number using HTTP fallback."""
+        """Get TV episode details by show TMDB ID, season and episode number."""
         if not self.api_key:
             return None
         try:
-            url = (
-                f"https://api.themoviedb.org/3/tv/{tmdb_id}"
-                f"/season/{season_number}/episode/{episode_number}"
-            )
-            params = {"api_key": self.api_key, "language": self.language or "en-US"}
-            resp = requests.get(url, params=params, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
+            data = self._get(f"/tv/{tmdb_id}/season/{season_number}/episode/{episode_number}", resource='episode')
             # Normalize subset of fields
             return {
                 'id': data.get('id'),
@@ -264,11 +382,7 @@ class TMDBClient:
         if not self.api_key:
             return []
         try:
-            url = f"https://api.themoviedb.org/3/tv/{tmdb_id}/season/{season_number}"
-            params = {"api_key": self.api_key, "language": self.language or "en-US"}
-            resp = requests.get(url, params=params, timeout=10)
-            resp.raise_for_status()
-            data = resp.json() or {}
+            data = self._get(f"/tv/{tmdb_id}/season/{season_number}", resource='season')
             episodes = data.get('episodes', []) or []
             normalized = []
             for ep in episodes:
@@ -288,4 +402,4 @@ class TMDBClient:
             return normalized
         except Exception as e:
             print(f"Error getting TV season episodes for {tmdb_id} S{season_number}: {e}")
-            return []
\ No newline at end of file
+            return []
@@ -0,0 +1,293 @@
+"""Filesystem watcher that applies changes in the scanned folders to the library."""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from src.filename_parser import parse_name
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
+except ImportError:  # watchdog is optional at runtime; the watcher is then unavailable
+    FileSystemEventHandler = object
+    Observer = PollingObserver = None
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Forwards relevant watchdog events to MediaWatcher.notify()."""
+
+    def __init__(self, watcher: 'MediaWatcher'):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type not in ('created', 'deleted', 'moved', 'modified'):
+            return
+        # Directory mtime updates accompany every change inside it; the change itself is reported separately
+        if event.is_directory and event.event_type == 'modified':
+            return
+        self.watcher.notify(event.src_path, event.is_directory)
+        dest = getattr(event, 'dest_path', None)
+        if dest:
+            self.watcher.notify(dest, event.is_directory, moved_from=event.src_path)
+
+
+class MediaWatcher:
+    """
+    Watches the scanner's folders and applies each change as narrowly as possible.
+
+    Events are collected until the folders have been quiet for `debounce`
+    seconds (at most `max_delay` after the first event), so a finished
+    torrent or a copied season is handled as one batch. Changes inside a show
+    folder rescan that show, a new folder is scanned with its subtree, and a
+    movie file is parsed and enriched on its own; deleted and renamed paths
+    are removed from the database directly (see _resolve_target). Nothing
+    rescans the folder around a changed file, which in a flat movie root
+    would be the whole root.
+
+    Native OS notifications are used where available; `polling=True` (or a
+    root on a network path) uses watchdog's PollingObserver instead.
+    """
+
+    def __init__(self, scanner, database, tmdb_client=None, policy: Callable[[], str] = None,
+                 debounce: float = 5.0, max_delay: float = 60.0, polling: bool = False,
+                 poll_interval: float = 30.0):
+        """
+        Args:
+            scanner: MediaScanner whose folders are watched
+            database: MediaDatabase to update
+            tmdb_client: TMDBClient used to enrich new items
+            policy: Callable returning the scan policy for a batch (default missing_metadata)
+            debounce: Quiet period in seconds before a batch is processed
+            max_delay: Longest time a batch waits while events keep arriving
+            polling: Always use the polling observer
+            poll_interval: Polling observer interval in seconds
+        """
+        self.scanner = scanner
+        self.database = database
+        self.tmdb_client = tmdb_client
+        self.policy = policy or (lambda: scanner.DEFAULT_SCAN_POLICY)
+        self.debounce = max(0.1, debounce)
+        self.max_delay = max(self.debounce, max_delay)
+        self.polling = polling
+        self.poll_interval = poll_interval
+        self.roots = [os.path.normpath(f) for f in scanner.folders]
+        self._observers = []
+        self._pending: Dict[str, bool] = {}  # path -> is_directory
+        self._renames: Dict[str, str] = {}  # new path -> old path of moved files
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.last_batch: Optional[Dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @staticmethod
+    def _is_network_path(path: str) -> bool:
+        return path.startswith('\\\\') or path.startswith('//')
+
+    def start(self) -> bool:
+        """Start observers and the batch worker. Returns False if watchdog is unavailable."""
+        if Observer is None:
+            print("[Watcher] watchdog is not installed, filesystem watching disabled")
+            return False
+        if self.running:
+            return True
+        self._stopping = False
+        handler = _EventHandler(self)
+        for root in self.roots:
+            if not os.path.isdir(root):
+                print(f"[Watcher] Folder not available, not watching: {root}")
+                continue
+            observer = None
+            if not self.polling and not self._is_network_path(root):
+                try:
+                    observer = Observer()
+                    observer.schedule(handler, root, recursive=True)
+                    observer.start()
+                except Exception as e:
+                    print(f"[Watcher] Native watching failed for {root} ({e}), falling back to polling")
+                    observer = None
+            if observer is None:
+                observer = PollingObserver(timeout=self.poll_interval)
+                observer.schedule(handler, root, recursive=True)
+                observer.start()
+            self._observers.append(observer)
+            print(f"[Watcher] Watching {root} ({'polling' if isinstance(observer, PollingObserver) else 'native'})")
+        self._thread = threading.Thread(target=self._run, name='media-watcher', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop observers and the worker (a batch in progress is finished first)."""
+        for observer in self._observers:
+            observer.stop()
+        for observer in self._observers:
+            observer.join(timeout=5)
+        self._observers = []
+        with self._cond:
+            self._stopping = True
+            self._pending.clear()
+            self._renames.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+    def notify(self, path: str, is_directory: bool = False, moved_from: str = None):
+        """Record a changed path, `moved_from` for the new name of a moved file (called from observer threads)."""
+        if not is_directory and os.path.splitext(path)[1].lower() not in self.scanner.VIDEO_EXTENSIONS:
+            return
+        now = time.monotonic()
+        with self._cond:
+            if not self._pending:
+                self._first_event = now
+            key = os.path.normpath(path)
+            self._pending[key] = self._pending.get(key, False) or is_directory
+            if moved_from and not is_directory:
+                self._renames[key] = os.path.normpath(moved_from)
+            self._last_event = now
+            self._cond.notify_all()
+
+    def _run(self):
+        """Batch worker: wait for a quiet period, then process the collected paths."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                while self._pending and not self._stopping:
+                    now = time.monotonic()
+                    wait = min(self._last_event + self.debounce, self._first_event + self.max_delay) - now
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopping:
+                    return
+                batch, self._pending = self._pending, {}
+                renames, self._renames = self._renames, {}
+            try:
+                self._process(batch, renames)
+            except Exception as e:
+                print(f"[Watcher] Error applying changes: {e}")
+                import traceback
+                traceback.print_exc()
+
+    def _root_for(self, path: str) -> Optional[str]:
+        for root in self.roots:
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    def _is_season_dir(self, name: str) -> bool:
+        return bool(self.scanner.SEASON_DIR_PATTERN.search(name))
+
+    def _show_folder(self, folder: str, root: str) -> Optional[str]:
+        """Outermost existing show folder in the database containing folder (or folder itself)."""
+        show = None
+        current = folder
+        while True:
+            item = self.database.find_by_path(current)
+            if item is not None and item.get('type') == 'tv_show' and os.path.isdir(current):
+                show = current
+            if current == root or os.path.dirname(current) == current:
+                return show
+            current = os.path.dirname(current)
+
+    def _resolve_target(self, path: str, is_directory: bool) -> Optional[Tuple[str, str]]:
+        """
+        How to apply a changed path: (kind, path), or None if it is outside the watched roots.
+
+        Kinds:
+            'show'    rescan a show folder (its season folders, nothing deeper)
+            'tree'    scan a new folder with its subtree
+            'folder'  classify the video files directly in a folder again
+            'file'    parse one video file as a movie
+            'removed' remove the items at or below a deleted path
+        """
+        root = self._root_for(path)
+        if root is None:
+            return None
+        if not os.path.isdir(root):
+            return None  # whole root unavailable (e.g. unmounted share); leave the library alone
+        folder = path if is_directory else os.path.dirname(path)
+        # Anything inside a known show folder belongs to that show item
+        show = self._show_folder(folder, root)
+        if show is not None:
+            return 'show', show
+        if not (os.path.isdir(path) if is_directory else os.path.isfile(path)):
+            return 'removed', path
+        if folder != root and self._is_season_dir(os.path.basename(folder)):
+            # Season of a show that is not in the library yet (e.g. still being copied)
+            return 'show', os.path.dirname(folder)
+        if is_directory:
+            return 'tree', path
+        parsed = parse_name(os.path.splitext(os.path.basename(path))[0], has_extension=True)
+        if parsed['episodes'] or parsed['absolute'] or parsed['ambiguous_episode']:
+            # Episode files turn a folder into a show once there are several of them
+            return 'folder', folder
+        return 'file', path
+
+    @staticmethod
+    def _outermost(paths: Set[str]) -> List[str]:
+        """Drop paths nested inside another path of the set."""
+        result = []
+        for path in sorted(paths):
+            if not any(path.startswith(p.rstrip(os.sep) + os.sep) for p in result):
+                result.append(path)
+        return result
+
+    @staticmethod
+    def _under(path: str, folders: List[str]) -> bool:
+        return any(path == f or path.startswith(f.rstrip(os.sep) + os.sep) for f in folders)
+
+    def _process(self, batch: Dict[str, bool], renames: Dict[str, str] = None):
+        """Apply a batch of changed paths to the library."""
+        targets: Dict[str, Set[str]] = {'show': set(), 'tree': set(), 'folder': set(), 'file': set(), 'removed': set()}
+        for path, is_directory in batch.items():
+            target = self._resolve_target(path, is_directory)
+            if target is not None:
+                targets[target[0]].add(target[1])
+        subtrees = self._outermost(targets['show'] | targets['tree'])
+        folders = [f for f in sorted(targets['folder']) if not self._under(f, subtrees)]
+        files = [f for f in sorted(targets['file'])
+                 if not self._under(f, subtrees) and os.path.dirname(f) not in targets['folder']]
+        removed = self._outermost(targets['removed'])
+        if not (subtrees or folders or files or removed):
+            return
+        print(f"[Watcher] {len(batch)} changed paths: rescanning {len(subtrees)} folders, "
+              f"{len(folders)} folder levels, {len(files)} files, {len(removed)} removed")
+        policy = self.policy()
+        summary = {'new_items': 0, 'changed_items': 0, 'removed_items': 0}
+        if subtrees:
+            result = self.scanner.update_library(self.database, self.tmdb_client, policy, folders=subtrees)
+            summary = {key: summary[key] + result[key] for key in summary}
+        if folders or files or removed:
+            result = self.scanner.update_items(self.database, self.tmdb_client, policy, files=files,
+                                               folders=folders, removed=removed, renamed=renames)
+            summary = {key: summary[key] + result[key] for key in summary}
+        self.batches += 1
+        self.last_batch = dict(summary, folders=subtrees + folders, files=files, removed=removed,
+                               finished=time.time())
+        print(f"[Watcher] Added {summary['new_items']}, changed {summary['changed_items']}, "
+              f"removed {summary['removed_items']}")
+
+    def status(self) -> Dict:
+        """Watcher state for the API."""
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            'running': self.running,
+            'roots': self.roots,
+            'polling': self.polling,
+            'pending_paths': pending,
+            'batches': self.batches,
+            'last_batch': self.last_batch,
+        }
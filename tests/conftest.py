@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# Modules import each other as src.<module>, relative to the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def database(tmp_path):
+    from src.media_database import MediaDatabase
+    db = MediaDatabase(str(tmp_path / 'media_database.json'))
+    yield db
+    db.close()
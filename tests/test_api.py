@@ -0,0 +1,67 @@
+import pytest
+
+from src.api import CustomAPI
+
+
+def movie(path, tmdb_id, title):
+    return {'path': path, 'name': title, 'type': 'movie',
+            'metadata': {'id': tmdb_id, 'title': title, 'release_date': '2001-01-01'}}
+
+
+@pytest.fixture
+def api(database):
+    database.add_or_update(movie('/media/a.mkv', 1, 'Alpha'))
+    return CustomAPI(database=database)
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
+
+
+def test_matching_etag_returns_304(client):
+    first = client.get('/api/movies')
+    assert first.status_code == 200
+    assert first.headers['ETag']
+
+    second = client.get('/api/movies', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == first.headers['ETag']
+
+
+def test_change_invalidates_etag_and_cached_body(api, client):
+    first = client.get('/api/movies')
+    api.database.add_or_update(movie('/media/b.mkv', 2, 'Beta'))
+
+    second = client.get('/api/movies', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert len(second.get_json()) == 2
+
+
+def test_body_built_during_a_change_is_not_cached(api, client):
+    first = client.get('/api/movies')
+    generation = api.database.generation
+    api.database.add_or_update(movie('/media/b.mkv', 2, 'Beta'))
+
+    # A request that read the old generation must not serve or store into the newer cache
+    with api.app.test_request_context('/api/movies'):
+        key = ('/api/movies', ())
+        assert api._cached_body(key, api.database.generation) is None
+        assert api._cached_body(key, generation) is None
+        api._store_body(key, generation, api.app.make_response(first.data))
+    assert api._response_cache_generation == api.database.generation
+    assert key not in api._response_cache
+
+    assert len(client.get('/api/movies').get_json()) == 2
+
+
+def test_search_endpoint(client):
+    response = client.get('/api/search?query=alp&type=movie')
+    assert response.status_code == 200
+    assert [(r['id'], r['title']) for r in response.get_json()] == [(1, 'Alpha')]
+    assert client.get('/api/search?query=alpha&type=tv').get_json() == []
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?query=alpha&type=episode').status_code == 400
+    assert client.get('/api/search?query=alpha&limit=0').status_code == 400
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from src.filename_parser import MAX_EPISODE_RANGE, _episode_range, parse_name, parse_season_dir
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'benchmarks', 'filename_corpus.json')
+
+with open(CORPUS, 'r', encoding='utf-8') as f:
+    CASES = json.load(f)
+
+
+@pytest.mark.parametrize('case', CASES, ids=[case['name'] for case in CASES])
+def test_corpus(case):
+    result = parse_name(case['name'], **case.get('context', {}))
+    for field, expected in case['expected'].items():
+        assert result[field] == expected, field
+
+
+@pytest.mark.parametrize('first, more, expected', [
+    (1, 'E02', [1, 2]),
+    (1, '-E03', [1, 2, 3]),
+    (2, '-03', [2, 3]),
+    (1, 'E02E03', [1, 2, 3]),
+    # Not ascending or too long: only the first number is kept
+    (5, 'E03', [5]),
+    (1, '-1999', [1]),
+    (1, f'-{1 + MAX_EPISODE_RANGE}', list(range(1, 2 + MAX_EPISODE_RANGE))),
+])
+def test_episode_range(first, more, expected):
+    assert _episode_range(first, more) == expected
+
+
+@pytest.mark.parametrize('name, season, episodes', [
+    ('Show.S01E01E02.1080p', 1, [1, 2]),
+    ('Show S01E01-E03', 1, [1, 2, 3]),
+    ('Show 1x02-03', 1, [2, 3]),
+    ('Show.S02E05', 2, [5]),
+])
+def test_multi_episode(name, season, episodes):
+    result = parse_name(name, has_extension=True)
+    assert (result['season'], result['episodes']) == (season, episodes)
+    assert result['episode'] == episodes[0]
+
+
+def test_absolute_numbers():
+    result = parse_name('[Group] Show - 105 [1080p]', has_extension=True)
+    assert result['title'] == 'Show'
+    assert result['absolute'] == [105]
+    assert result['episodes'] == []
+
+
+def test_dot_notation_needs_episodic_context():
+    assert parse_name('Show Name 1.02', has_extension=True)['episodes'] == []
+    assert parse_name('Show Name 1.02', has_extension=True)['ambiguous_episode']
+    assert parse_name('Show Name 1.02', has_extension=True, episodic=True)['episodes'] == [2]
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Season 1', 1),
+    ('S02', 2),
+    ('Extras', None),
+])
+def test_season_dir(name, expected):
+    assert parse_season_dir(name) == expected
@@ -0,0 +1,62 @@
+import pytest
+
+from src.filename_parser import parse_name
+from src.scanner import MediaScanner
+
+
+class FakeTMDB:
+    """Season episode lists by season number, like get_tv_season_episodes() returns them."""
+
+    def __init__(self, seasons):
+        self.seasons = seasons
+        self.requested = []
+
+    def get_tv_season_episodes(self, show_id, season_number):
+        self.requested.append(season_number)
+        return [{'episode_number': number} for number in self.seasons.get(season_number, [])]
+
+
+@pytest.fixture
+def scanner():
+    return MediaScanner([])
+
+
+def show_with_files(scanner, folder, filenames, number_of_seasons):
+    files = [(name, parse_name(name.rsplit('.', 1)[0], has_extension=True)) for name in filenames]
+    show = scanner._build_tv_show_from_files(folder, files)
+    show['metadata'] = {'id': 1, 'number_of_seasons': number_of_seasons}
+    return show
+
+
+def episodes(show):
+    return [(ep['season'], ep['episode'], ep.get('absolute')) for season in show['seasons']
+            for ep in season['episodes']]
+
+
+def test_multi_episode_file_backs_several_episodes(scanner):
+    show = show_with_files(scanner, '/media/Show', ['Show S01E01E02.mkv', 'Show S01E03.mkv'], 1)
+    assert episodes(show) == [(1, 1, None), (1, 2, None), (1, 3, None)]
+    assert scanner._item_files(show) == ['/media/Show/Show S01E01E02.mkv', '/media/Show/Show S01E03.mkv']
+
+
+def test_absolute_episodes_are_mapped_to_tmdb_seasons(scanner, database):
+    show = show_with_files(scanner, '/media/Show', ['Show - 12.mkv', 'Show - 13.mkv', 'Show - 30.mkv'], 2)
+    assert episodes(show) == [(1, 12, 12), (1, 13, 13), (1, 30, 30)]
+    tmdb = FakeTMDB({1: range(1, 13), 2: range(1, 13)})
+
+    scanner._map_absolute_episodes(show, 1, tmdb, database)
+
+    # 12 episodes in season 1: 13 is S02E01; 30 is past the last known episode and keeps its number
+    assert episodes(show) == [(1, 12, 12), (1, 30, 30), (2, 1, 13)]
+    assert tmdb.requested == [1, 2]
+    assert database.find_by_path('/media/Show') is show
+
+
+def test_absolute_mapping_stops_once_covered(scanner, database):
+    show = show_with_files(scanner, '/media/Show', ['Show - 01.mkv', 'Show - 02.mkv'], 5)
+    tmdb = FakeTMDB({1: range(1, 11)})
+
+    scanner._map_absolute_episodes(show, 1, tmdb, database)
+
+    assert episodes(show) == [(1, 1, 1), (1, 2, 2)]
+    assert tmdb.requested == [1]
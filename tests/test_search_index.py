@@ -0,0 +1,81 @@
+import pytest
+
+from src.search_index import SearchIndex, fold, tokenize
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add('tv', {'title': 'Keanu Wick'})
+    index.add('m1', {'title': 'Keanu Matrix'})
+    index.add('m2', {'title': 'Wick Story'})
+    return index
+
+
+def keys(results):
+    return [key for key, _score in results]
+
+
+def test_fold_ignores_case_and_diacritics():
+    assert fold('Pelíšky') == 'pelisky'
+    assert fold('Łódź ØRESUND') == 'lodz oresund'
+    assert tokenize('Pelíšky (1999)') == ['pelisky', '1999']
+
+
+def test_all_words_must_match(index):
+    assert keys(index.search('keanu wick')) == ['tv']
+
+
+def test_any_word_fallback_without_full_match(index):
+    assert sorted(keys(index.search('keanu story'))) == ['m1', 'm2', 'tv']
+
+
+def test_accept_applies_before_fallback(index):
+    # Only 'tv' matches both words; with it filtered out, accepted partial matches are ranked
+    results = index.search('keanu wick', accept=lambda key: key.startswith('m'))
+    assert sorted(keys(results)) == ['m1', 'm2']
+
+
+def test_accept_keeps_full_matches(index):
+    index.add('m3', {'title': 'Keanu Wick Returns'})
+    results = index.search('keanu wick', accept=lambda key: key.startswith('m'))
+    assert keys(results) == ['m3']
+
+
+def test_prefix_matches_rank_below_exact_words(index):
+    index.add('m3', {'title': 'Matrixes'})
+    assert keys(index.search('matrix')) == ['m1', 'm3']
+    assert sorted(keys(index.search('matr'))) == ['m1', 'm3']
+    assert keys(index.search('matrix', prefix=False)) == ['m1']
+
+
+def test_title_outweighs_overview():
+    index = SearchIndex()
+    index.add('overview', {'title': 'Other', 'overview': 'a story about a heist'})
+    index.add('title', {'title': 'Heist'})
+    assert keys(index.search('heist')) == ['title', 'overview']
+
+
+def test_remove_and_replace(index):
+    index.remove('m1')
+    assert keys(index.search('matrix')) == []
+    index.add('m2', {'title': 'Matrix Story'})
+    assert keys(index.search('matrix')) == ['m2']
+    assert len(index) == 2
+
+
+def test_limit(index):
+    assert len(index.search('keanu story', limit=2)) == 2
+
+
+def test_database_search_filters_by_type(database):
+    database.add_or_update({'path': '/media/Wick', 'type': 'tv_show', 'title': 'Keanu Wick'})
+    database.add_or_update({'path': '/media/matrix.mkv', 'type': 'movie', 'title': 'Keanu Matrix'})
+    database.add_or_update({'path': '/media/story.mkv', 'type': 'movie', 'title': 'Wick Story',
+                            'metadata': {'id': 3, 'title': 'Wick Story'}})
+
+    assert [item['path'] for item, _ in database.search('keanu wick')] == ['/media/Wick']
+    movies = [item['path'] for item, _ in database.search('keanu wick', media_type='movie')]
+    assert sorted(movies) == ['/media/matrix.mkv', '/media/story.mkv']
+    matched = [item['path'] for item, _ in database.search('keanu wick', require_metadata=True)]
+    assert matched == ['/media/story.mkv']